@@ -1,11 +1,14 @@
-import httpx
 from bs4 import BeautifulSoup
 from typing import Dict, List
 import re
 from collections import Counter
 import math
 
+from app.analyzers.page import FetchedPage, fetch_page, parse_content_dom
+from app.analyzers.registry import register_analyzer
 
+
+@register_analyzer("content_analysis", "Content", weight=0.17, inputs=["content_dom"])
 class ContentAnalyzer:
     """Analyze website content quality with advanced metrics"""
     
@@ -19,22 +22,19 @@ class ContentAnalyzer:
         'media_ratio': {'min': 0.001, 'max': 0.01}  # images per word
     }
     
-    async def analyze(self, url: str) -> Dict:
+    async def analyze(self, url: str, page: FetchedPage = None, content_dom: BeautifulSoup = None) -> Dict:
         """Perform comprehensive content analysis"""
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
-                html = response.text
-            
-            soup = BeautifulSoup(html, 'html.parser')
+            # Page without non-content elements
+            if content_dom is None:
+                if page is None:
+                    page = await fetch_page(url)
+                content_dom = parse_content_dom(url, page)
+            soup = content_dom
             
             issues = []
             recommendations = []
             
-            # Remove non-content elements
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
-            
             # Analyze different content aspects
             text_score, text_data = self._analyze_text_content(soup, issues, recommendations)
             readability_score, readability_data = self._analyze_readability(soup, text_data, issues, recommendations)
@@ -94,6 +94,7 @@ class ContentAnalyzer:
         except Exception as e:
             return {
                 "score": 0,
+                "error": str(e),
                 "grade": "F",
                 "word_count": 0,
                 "readability_score": 0,
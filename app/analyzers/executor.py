@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+import asyncio
+import inspect
+
+from app.core.config import settings
+from app.analyzers.registry import AnalyzerSpec, STAGES, required_stages, select_analyzers
+from app.utils.budget import Budget
+
+
+# Parsing and scoring hold the GIL, so the CPU pool mainly keeps them off the event loop;
+# blocking sockets get their own pool so a slow handshake never delays a parse
+_pools = {
+    "cpu": ThreadPoolExecutor(max_workers=settings.ANALYZER_CPU_WORKERS, thread_name_prefix="analyzer-cpu"),
+    "io": ThreadPoolExecutor(max_workers=settings.ANALYZER_IO_WORKERS, thread_name_prefix="analyzer-io"),
+}
+
+# run_step(name, call) awaits call() and returns its result, or the exception it failed with
+RunStep = Callable[[str, Callable[[], Awaitable]], Awaitable[Any]]
+
+
+async def _run_once(name: str, call: Callable[[], Awaitable]):
+    try:
+        return await call()
+    except Exception as e:
+        return e
+
+
+async def run_analyzers(
+    url: str,
+    names: Optional[Iterable[str]] = None,
+    extra_stages: Iterable[str] = (),
+    run_step: Optional[RunStep] = None,
+    overrides: Optional[Dict[str, Callable]] = None,
+    budget: Optional[Budget] = None
+) -> Tuple[Dict[str, Dict], Dict[str, Any]]:
+    """
+    Run the selected analyzers (the default ones unless named) on a URL. Every stage they
+    need is produced once and concurrently with unrelated stages; each analyzer starts as
+    soon as its own inputs are ready. `run_step` wraps every stage and analyzer call (e.g.
+    retries); `overrides` replaces stage producers by name (e.g. a truncated page fetch).
+    No step outlives the `budget` (by default MAX_ANALYSIS_TIME_SECONDS from now): one
+    still running at the deadline fails, and stages declaring "budget" receive it.
+
+    Returns: (results by section, stage values). A failed analyzer, or one whose input
+    failed, gets its fallback result; a failed stage's value is its exception.
+    """
+    specs = select_analyzers(names)
+    overrides = overrides or {}
+    budget = budget or Budget(settings.MAX_ANALYSIS_TIME_SECONDS)
+    loop = asyncio.get_running_loop()
+    stages: Dict[str, asyncio.Future] = {"budget": loop.create_future()}
+    stages["budget"].set_result(budget)
+
+    async def step(name: str, call: Callable[[], Awaitable]):
+        async def bounded():
+            try:
+                return await asyncio.wait_for(call(), timeout=budget.remaining())
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{name} did not finish within the analysis time budget")
+        return await (run_step or _run_once)(name, bounded)
+
+    async def produce(name: str):
+        stage = STAGES[name]
+        producer = overrides.get(name, stage.produce)
+        inputs = {dependency: await stages[dependency] for dependency in stage.inputs}
+        failed = next((value for value in inputs.values() if isinstance(value, Exception)), None)
+        if failed is not None:
+            return failed
+
+        async def call():
+            if inspect.iscoroutinefunction(producer):
+                return await producer(url, **inputs)
+            return await loop.run_in_executor(_pools[stage.executor], partial(producer, url, **inputs))
+        return await step(stage.name, call)
+
+    async def analyze(spec: AnalyzerSpec) -> Dict:
+        inputs = {name: await stages[name] for name in spec.inputs}
+        failed = next((value for value in inputs.values() if isinstance(value, Exception)), None)
+        if failed is None:
+            result = await step(spec.name, lambda: spec.cls().analyze(url, **inputs))
+            if not isinstance(result, Exception):
+                return result
+            failed = result
+        print(f"⚠️  {spec.name} analyzer error for {url}: {failed}")
+        return spec.fallback(failed)
+
+    # Dependencies come first, so every stage task exists before anything awaits it
+    for name in required_stages(specs, extra_stages):
+        if name not in stages:
+            stages[name] = asyncio.create_task(produce(name))
+
+    try:
+        results = await asyncio.gather(*[analyze(spec) for spec in specs])
+        values = {name: await task for name, task in stages.items()}
+    finally:
+        for task in stages.values():
+            task.cancel()
+
+    return dict(zip((spec.section for spec in specs), results)), values
+
+
+def weighted_overall_score(results: Dict[str, Dict], weights: Optional[Dict[str, float]] = None) -> float:
+    """
+    Weighted average of the analyzer scores present in `results` (registry weights unless
+    given), renormalized so a subset of analyzers still scores out of 100. Non-default
+    analyzers are reported alongside and do not move the score.
+    """
+    weights = weights or {spec.section: spec.weight for spec in select_analyzers()}
+    used = {section: weights[section] for section in results if section in weights}
+    total = sum(used.values())
+    if not total:
+        return 0
+    return sum(results[section].get("score", 0) * weight for section, weight in used.items()) / total
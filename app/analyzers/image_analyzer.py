@@ -1,10 +1,12 @@
-import httpx
 from bs4 import BeautifulSoup
 from typing import Dict, List
 from urllib.parse import urljoin
-import asyncio
 
+from app.analyzers.page import FetchedPage, MAX_IMAGE_PROBES, fetch_page, parse_dom, probe_subresources
+from app.analyzers.registry import register_analyzer
 
+
+@register_analyzer("image_analysis", "Image", weight=0.10, inputs=["dom", "subresources"])
 class ImageAnalyzer:
     """Analyze images for optimization opportunities"""
     
@@ -21,14 +23,17 @@ class ImageAnalyzer:
     MODERN_FORMATS = ['webp', 'avif']
     LEGACY_FORMATS = ['jpg', 'jpeg', 'png', 'gif']
     
-    async def analyze(self, url: str, soup: BeautifulSoup = None) -> Dict:
+    async def analyze(self, url: str, page: FetchedPage = None, dom: BeautifulSoup = None,
+                      subresources: Dict[str, Dict] = None) -> Dict:
         """Perform comprehensive image analysis"""
         try:
-            if not soup:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.get(url)
-                    html = response.text
-                soup = BeautifulSoup(html, 'html.parser')
+            if dom is None:
+                if page is None:
+                    page = await fetch_page(url)
+                dom = parse_dom(url, page)
+            if subresources is None:
+                subresources = await probe_subresources(url, dom)
+            soup = dom
             
             issues = []
             recommendations = []
@@ -45,7 +50,7 @@ class ImageAnalyzer:
                 }
             
             # Analyze images
-            image_data = await self._analyze_images(images, url, issues, recommendations)
+            image_data = self._analyze_images(images, url, subresources, issues, recommendations)
             
             # Calculate scores
             size_score = self._score_image_sizes(image_data, issues, recommendations)
@@ -101,13 +106,15 @@ class ImageAnalyzer:
         except Exception as e:
             return {
                 "score": 0,
+                "error": str(e),
                 "grade": "F",
                 "total_images": 0,
                 "issues": [f"Failed to analyze images: {str(e)}"],
                 "recommendations": ["Ensure website is accessible and try again"]
             }
     
-    async def _analyze_images(self, images: List, base_url: str, issues: List, recommendations: List) -> Dict:
+    def _analyze_images(self, images: List, base_url: str, subresources: Dict[str, Dict],
+                        issues: List, recommendations: List) -> Dict:
         """Analyze individual images"""
         image_details = []
         total_size = 0
@@ -117,20 +124,11 @@ class ImageAnalyzer:
         lazy_loaded_count = 0
         missing_alt_count = 0
         
-        # Limit to first 20 images for performance
-        images_to_check = images[:20]
+        # Only the first images are probed, for performance
+        images_to_check = images[:MAX_IMAGE_PROBES]
         
-        # Analyze images concurrently
-        tasks = []
         for img in images_to_check:
-            tasks.append(self._get_image_info(img, base_url))
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for img, result in zip(images_to_check, results):
-            if isinstance(result, Exception):
-                continue
-            
+            result = self._get_image_info(img, base_url, subresources)
             if result:
                 image_details.append(result)
                 total_size += result['size_kb']
@@ -164,55 +162,47 @@ class ImageAnalyzer:
             'total_analyzed': len(image_details)
         }
     
-    async def _get_image_info(self, img, base_url: str) -> Dict:
-        """Get information about a single image"""
-        try:
-            src = img.get('src')
-            if not src:
-                return None
-            
-            # Skip data URLs and SVGs
-            if src.startswith('data:') or src.endswith('.svg'):
-                return None
-            
-            # Build full URL
-            img_url = urljoin(base_url, src)
-            
-            # Get image size
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.head(img_url, follow_redirects=True)
-                size_bytes = int(response.headers.get('content-length', 0))
-                size_kb = size_bytes / 1024
-                
-                # Detect format from URL or content-type
-                content_type = response.headers.get('content-type', '').lower()
-                format_from_url = src.split('.')[-1].lower().split('?')[0]
-                
-                if 'webp' in content_type or format_from_url == 'webp':
-                    img_format = 'webp'
-                elif 'avif' in content_type or format_from_url == 'avif':
-                    img_format = 'avif'
-                elif 'jpeg' in content_type or 'jpg' in content_type or format_from_url in ['jpg', 'jpeg']:
-                    img_format = 'jpeg'
-                elif 'png' in content_type or format_from_url == 'png':
-                    img_format = 'png'
-                elif 'gif' in content_type or format_from_url == 'gif':
-                    img_format = 'gif'
-                else:
-                    img_format = 'unknown'
-                
-                return {
-                    'url': img_url,
-                    'size_kb': round(size_kb, 2),
-                    'format': img_format,
-                    'is_responsive': bool(img.get('srcset') or img.get('sizes')),
-                    'is_lazy_loaded': img.get('loading') == 'lazy',
-                    'has_alt': bool(img.get('alt')),
-                    'width': img.get('width'),
-                    'height': img.get('height')
-                }
-        except:
+    def _get_image_info(self, img, base_url: str, subresources: Dict[str, Dict]) -> Dict:
+        """Information about a single image, from its probe"""
+        src = img.get('src')
+        if not src:
+            return None
+        
+        # Data URLs, SVGs and images that could not be probed have no probe
+        img_url = urljoin(base_url, src)
+        probe = subresources.get(img_url)
+        if probe is None:
             return None
+        
+        size_kb = probe['size_bytes'] / 1024
+        
+        # Detect format from URL or content-type
+        content_type = probe['content_type']
+        format_from_url = src.split('.')[-1].lower().split('?')[0]
+        
+        if 'webp' in content_type or format_from_url == 'webp':
+            img_format = 'webp'
+        elif 'avif' in content_type or format_from_url == 'avif':
+            img_format = 'avif'
+        elif 'jpeg' in content_type or 'jpg' in content_type or format_from_url in ['jpg', 'jpeg']:
+            img_format = 'jpeg'
+        elif 'png' in content_type or format_from_url == 'png':
+            img_format = 'png'
+        elif 'gif' in content_type or format_from_url == 'gif':
+            img_format = 'gif'
+        else:
+            img_format = 'unknown'
+        
+        return {
+            'url': img_url,
+            'size_kb': round(size_kb, 2),
+            'format': img_format,
+            'is_responsive': bool(img.get('srcset') or img.get('sizes')),
+            'is_lazy_loaded': img.get('loading') == 'lazy',
+            'has_alt': bool(img.get('alt')),
+            'width': img.get('width'),
+            'height': img.get('height')
+        }
     
     def _score_image_sizes(self, image_data: Dict, issues: List, recommendations: List) -> float:
         """Score based on image sizes"""
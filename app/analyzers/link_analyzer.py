@@ -0,0 +1,95 @@
+from bs4 import BeautifulSoup
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from app.analyzers.page import FetchedPage, fetch_page, parse_dom, probe_count
+from app.analyzers.registry import register_analyzer, register_stage
+from app.utils.budget import Budget
+
+
+async def _check_link(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, link: str) -> Dict:
+    async with semaphore:
+        try:
+            response = await client.head(link, follow_redirects=True)
+            # Some servers do not answer HEAD; ask for the page itself
+            if response.status_code in (405, 501):
+                response = await client.get(link, follow_redirects=True)
+            return {"status": response.status_code}
+        except Exception as e:
+            return {"status": None, "error": type(e).__name__}
+
+
+@register_stage("links", inputs=["dom", "budget"])
+async def check_links(url: str, dom: BeautifulSoup, budget: Optional[Budget] = None) -> Dict[str, Dict]:
+    """
+    Status of the first LINK_CHECK_MAX_LINKS http(s) links on the page (fewer when the
+    budget runs low), by absolute URL
+    """
+    links = []
+    for anchor in dom.find_all('a', href=True):
+        link = urljoin(url, anchor['href']).split('#')[0]
+        if urlparse(link).scheme in ('http', 'https'):
+            links.append(link)
+    links = list(dict.fromkeys(links))[:probe_count(budget, settings.LINK_CHECK_MAX_LINKS, "link")]
+
+    timeout = budget.timeout(settings.LINK_CHECK_TIMEOUT_SECONDS) if budget else settings.LINK_CHECK_TIMEOUT_SECONDS
+    semaphore = asyncio.Semaphore(settings.LINK_CHECK_CONCURRENCY)
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        statuses = await asyncio.gather(*[_check_link(client, semaphore, link) for link in links])
+    return dict(zip(links, statuses))
+
+
+@register_analyzer("links_analysis", "Links", weight=0.0, inputs=["links"], default=False)
+class LinkAnalyzer:
+    """Broken link check (deep profile); reported alongside the overall score, not in it"""
+
+    async def analyze(self, url: str, page: FetchedPage = None, links: Optional[Dict[str, Dict]] = None) -> Dict:
+        """Score the share of working links"""
+        try:
+            if links is None:
+                if page is None:
+                    page = await fetch_page(url)
+                links = await check_links(url, parse_dom(url, page))
+
+            host = urlparse(url).netloc
+            broken: List[Dict] = []
+            unreachable: List[Dict] = []
+            for link, result in links.items():
+                entry = {"url": link, "internal": urlparse(link).netloc == host, **result}
+                if result["status"] is None:
+                    unreachable.append(entry)
+                elif result["status"] >= 400:
+                    broken.append(entry)
+
+            issues = []
+            recommendations = []
+            if broken:
+                internal = sum(1 for entry in broken if entry["internal"])
+                issues.append(f"{len(broken)} broken links ({internal} internal)")
+                recommendations.append("Fix or remove links that return error responses")
+            if unreachable:
+                issues.append(f"{len(unreachable)} links could not be reached")
+                recommendations.append("Check links to hosts that time out or refuse connections")
+
+            checked = len(links)
+            score = 100 if not checked else 100 * (checked - len(broken) - len(unreachable)) / checked
+            return {
+                "score": round(score, 1),
+                "checked_links": checked,
+                "broken_links": broken,
+                "unreachable_links": unreachable,
+                "issues": issues,
+                "recommendations": recommendations
+            }
+
+        except Exception as e:
+            return {
+                "score": 0,
+                "error": str(e),
+                "issues": ["Link check failed"],
+                "recommendations": []
+            }
@@ -0,0 +1,180 @@
+import asyncio
+import socket
+import ssl
+import time
+from typing import Dict, Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from bs4 import BeautifulSoup
+
+from app.core.config import settings
+from app.analyzers.registry import register_stage
+from app.utils.budget import Budget
+from app.utils.fingerprint import content_fingerprint
+
+
+# Elements that are not page content (removed for text and content analysis)
+NON_CONTENT_TAGS = ["script", "style", "nav", "footer", "header"]
+
+# Images probed for size and format
+MAX_IMAGE_PROBES = 20
+
+
+class FetchedPage:
+    """A page fetched once and shared by the analyzers of a site"""
+
+    def __init__(self, url: str, html: str, headers, final_url: str, load_time: float, truncated: bool = False):
+        self.url = url
+        self.html = html
+        self.headers = headers
+        self.final_url = final_url
+        self.load_time = load_time
+        # Only the start of the body was read (quick profile)
+        self.truncated = truncated
+
+
+def text_without(soup: BeautifulSoup, excluded) -> str:
+    """
+    The tree's text as get_text() returns it once the excluded elements are removed,
+    without modifying the (shared) tree
+    """
+    excluded = set(excluded)
+    return "".join(
+        string for string in soup.strings
+        if not any(parent.name in excluded for parent in string.parents)
+    )
+
+
+@register_stage("budget")
+async def analysis_budget(url: str) -> Budget:
+    """Time budget of the analysis; run_analyzers supplies its caller's"""
+    return Budget(settings.MAX_ANALYSIS_TIME_SECONDS)
+
+
+def probe_count(budget: Optional[Budget], limit: int, what: str) -> int:
+    """How many probes to make: fewer once the budget runs low"""
+    if budget is None or budget.allows(settings.BUDGET_LOW_SECONDS) or limit <= settings.BUDGET_REDUCED_PROBES:
+        return limit
+    budget.degrade(f"fewer {what} probes")
+    return settings.BUDGET_REDUCED_PROBES
+
+
+@register_stage("page", inputs=["budget"])
+async def fetch_page(url: str, budget: Optional[Budget] = None) -> FetchedPage:
+    """GET a page (following redirects) and time the full response"""
+    timeout = budget.timeout(settings.BUDGET_FETCH_TIMEOUT_SECONDS) if budget else settings.BUDGET_FETCH_TIMEOUT_SECONDS
+    start_time = time.time()
+    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        response = await client.get(url)
+        html = response.text
+    return FetchedPage(url, html, response.headers, str(response.url), time.time() - start_time)
+
+
+async def fetch_page_head(url: str, max_bytes: int, timeout: float, budget: Optional[Budget] = None) -> FetchedPage:
+    """
+    Headers and at most the first `max_bytes` of a page. Reading stops at the deadline
+    with whatever arrived; it fails only if no body arrived by then.
+    """
+    if budget is not None:
+        timeout = budget.timeout(timeout)
+    start_time = time.time()
+    response = None
+    body = bytearray()
+    truncated = False
+    try:
+        async with asyncio.timeout(timeout):
+            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+                async with client.stream("GET", url) as response:
+                    async for chunk in response.aiter_bytes():
+                        body.extend(chunk)
+                        if len(body) >= max_bytes:
+                            truncated = True
+                            break
+    except (TimeoutError, httpx.TimeoutException):
+        if response is None or not body:
+            raise
+        truncated = True
+
+    html = bytes(body[:max_bytes]).decode(response.encoding or "utf-8", errors="replace")
+    return FetchedPage(url, html, response.headers, str(response.url), time.time() - start_time, truncated)
+
+
+@register_stage("dom", inputs=["page"], executor="cpu")
+def parse_dom(url: str, page: FetchedPage) -> BeautifulSoup:
+    """Parsed page, shared read-only by every analyzer that declares "dom" """
+    return BeautifulSoup(page.html, 'html.parser')
+
+
+@register_stage("content_dom", inputs=["page"], executor="cpu")
+def parse_content_dom(url: str, page: FetchedPage) -> BeautifulSoup:
+    """Parsed page without scripts, styles and page chrome (navigation, header, footer)"""
+    soup = BeautifulSoup(page.html, 'html.parser')
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+    return soup
+
+
+@register_stage("fingerprint", inputs=["page"], executor="cpu")
+def page_fingerprint(url: str, page: FetchedPage) -> str:
+    return content_fingerprint(page.html)
+
+
+@register_stage("tls", inputs=["budget"], executor="io")
+def probe_tls(url: str, budget: Optional[Budget] = None, timeout: Optional[float] = None) -> Dict:
+    """
+    TLS handshake with the site's host on port 443: protocol, cipher and certificate
+    expiry. Never raises; "failure" and "ssl_error" describe a failed handshake.
+    """
+    timeout = timeout or settings.BUDGET_PROBE_TIMEOUT_SECONDS
+    if budget is not None:
+        timeout = budget.timeout(timeout)
+    hostname = urlparse(url).netloc
+    tls = {"valid": False, "protocol": None, "cipher": None, "not_after": None}
+    try:
+        context = ssl.create_default_context()
+        with socket.create_connection((hostname, 443), timeout=timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+                cert = ssock.getpeercert()
+                tls["valid"] = True
+                tls["protocol"] = ssock.version()
+                tls["cipher"] = ssock.cipher()[0]
+                tls["not_after"] = cert.get('notAfter')
+    except ssl.SSLError as e:
+        tls["failure"] = str(e)
+        tls["ssl_error"] = True
+    except Exception as e:
+        tls["failure"] = str(e)
+    return tls
+
+
+async def _probe_image(client: httpx.AsyncClient, img_url: str):
+    try:
+        response = await client.head(img_url, follow_redirects=True)
+        return {
+            "size_bytes": int(response.headers.get('content-length', 0)),
+            "content_type": response.headers.get('content-type', '').lower()
+        }
+    except Exception:
+        return None
+
+
+@register_stage("subresources", inputs=["dom", "budget"])
+async def probe_subresources(url: str, dom: BeautifulSoup, budget: Optional[Budget] = None) -> Dict[str, Dict]:
+    """
+    HEAD requests for the first MAX_IMAGE_PROBES images (fewer when the budget runs low)
+    for their size and content type, keyed by absolute URL. Images that could not be
+    probed are absent.
+    """
+    timeout = budget.timeout(settings.BUDGET_PROBE_TIMEOUT_SECONDS) if budget else settings.BUDGET_PROBE_TIMEOUT_SECONDS
+    sources = []
+    for img in dom.find_all('img')[:probe_count(budget, MAX_IMAGE_PROBES, "image")]:
+        src = img.get('src')
+        # Skip data URLs and SVGs
+        if src and not src.startswith('data:') and not src.endswith('.svg'):
+            sources.append(urljoin(url, src))
+
+    sources = list(dict.fromkeys(sources))
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        probes = await asyncio.gather(*[_probe_image(client, source) for source in sources])
+    return {source: probe for source, probe in zip(sources, probes) if probe is not None}
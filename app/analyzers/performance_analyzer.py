@@ -1,10 +1,12 @@
-import httpx
-import time
 from typing import Dict, List, Tuple
 from bs4 import BeautifulSoup
 import re
 
+from app.analyzers.page import FetchedPage, fetch_page, parse_dom
+from app.analyzers.registry import register_analyzer
 
+
+@register_analyzer("performance_analysis", "Performance", weight=0.20, inputs=["page", "dom"])
 class PerformanceAnalyzer:
     """Analyze website performance with industry-standard metrics"""
     
@@ -18,22 +20,21 @@ class PerformanceAnalyzer:
         'cls': {'excellent': 0.1, 'good': 0.25, 'poor': 0.5}
     }
     
-    async def analyze(self, url: str) -> Dict:
+    async def analyze(self, url: str, page: FetchedPage = None, dom: BeautifulSoup = None) -> Dict:
         """Perform comprehensive performance analysis"""
         try:
             issues = []
             recommendations = []
             metrics = {}
             
-            # Measure initial connection and load time
-            start_time = time.time()
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
-                html = response.text
-                headers = response.headers
-            load_time = time.time() - start_time
+            # Measure initial connection and load time (a shared page carries its own timing)
+            if page is None:
+                page = await fetch_page(url)
+            html = page.html
+            headers = page.headers
+            load_time = page.load_time
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = dom if dom is not None else parse_dom(url, page)
             
             # Calculate page size
             page_size_kb = len(html.encode('utf-8')) / 1024
@@ -106,6 +107,7 @@ class PerformanceAnalyzer:
         except Exception as e:
             return {
                 "score": 0,
+                "error": str(e),
                 "grade": "F",
                 "load_time": 0,
                 "page_size": 0,
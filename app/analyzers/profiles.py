@@ -0,0 +1,81 @@
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.analyzers.page import fetch_page_head, probe_tls
+from app.analyzers.registry import select_analyzers
+
+
+class Profile:
+    """
+    How much work an analysis does: the analyzers it runs, stage producers it swaps
+    (e.g. a truncated fetch) and whether AI insights and the PDF report are generated
+    """
+
+    def __init__(self, name: str, analyzers: Optional[List[str]] = None, extra_analyzers: Iterable[str] = (),
+                 reports: bool = True, overrides: Optional[Callable[[], Dict[str, Callable]]] = None):
+        self.name = name
+        self.analyzers = analyzers
+        self.extra_analyzers = list(extra_analyzers)
+        self.reports = reports
+        self._overrides = overrides
+        # Scores from swapped (e.g. truncated) inputs are not ranked against full runs
+        self.comparable = overrides is None
+
+    def analyzer_names(self, selected: Optional[List[str]] = None) -> Optional[List[str]]:
+        """
+        Analyzers to run: the request's selection, else the profile's (None = defaults).
+        The quota is charged by profile, so a selection may only narrow the profile's
+        analyzers; raises ValueError for analyzers outside it (or unknown).
+        """
+        if selected is not None:
+            allowed = {spec.section for spec in select_analyzers(self.analyzer_names())}
+            outside = [spec.key for spec in select_analyzers(selected) if spec.section not in allowed]
+            if outside:
+                raise ValueError(
+                    f"Analyzers not in the {self.name} profile: {', '.join(outside)}. "
+                    f"Choose a profile that includes them"
+                )
+            return selected
+        if self.analyzers is None and not self.extra_analyzers:
+            return None
+        base = self.analyzers if self.analyzers is not None else [spec.key for spec in select_analyzers()]
+        return base + self.extra_analyzers
+
+    def stage_overrides(self) -> Dict[str, Callable]:
+        return self._overrides() if self._overrides else {}
+
+
+def _quick_overrides() -> Dict[str, Callable]:
+    timeout = settings.PROFILE_QUICK_TIMEOUT_SECONDS
+    return {
+        "page": partial(fetch_page_head, max_bytes=settings.PROFILE_QUICK_MAX_KB * 1024, timeout=timeout),
+        "tls": partial(probe_tls, timeout=timeout)
+    }
+
+
+PROFILES = {
+    # Headers and the start of the page: what needs no full download or subresources
+    "quick": Profile("quick", analyzers=["seo", "security"], reports=False, overrides=_quick_overrides),
+    "standard": Profile("standard"),
+    # Standard plus the opt-in checks that crawl further (broken links) or load the page in
+    # a headless browser (rendered timings)
+    "deep": Profile("deep", extra_analyzers=["links", "rendered"]),
+}
+
+
+def get_profile(name: str) -> Profile:
+    """Profile by name; raises ValueError for unknown profiles"""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown profile: {name}. Choose one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+def profile_cost(name: str) -> int:
+    """Quota units an analysis with this profile consumes"""
+    costs = {
+        "quick": settings.PROFILE_COST_QUICK,
+        "standard": settings.PROFILE_COST_STANDARD,
+        "deep": settings.PROFILE_COST_DEEP
+    }
+    return costs.get(name, settings.PROFILE_COST_STANDARD)
@@ -0,0 +1,150 @@
+"""
+Analyzer registry.
+
+Analyzers declare the inputs they need (fetched page, parsed DOM, TLS handshake, image
+probes, headless-browser timings, ...). Each input is a stage, produced once per analysis
+and shared by every analyzer that declares it. Built-in stages live in app.analyzers.page
+and next to the opt-in analyzers that use them; plugins listed in ANALYZER_PLUGINS
+register more stages and analyzers the same way.
+"""
+import importlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+# Where a stage runs: on the event loop (async producers), on the CPU pool (parsing and
+# other pure computation) or on the blocking I/O pool (synchronous sockets)
+EXECUTORS = ("loop", "cpu", "io")
+
+BUILTIN_MODULES = [
+    "app.analyzers.page",
+    "app.analyzers.ux_analyzer",
+    "app.analyzers.seo_analyzer",
+    "app.analyzers.performance_analyzer",
+    "app.analyzers.content_analyzer",
+    "app.analyzers.security_analyzer",
+    "app.analyzers.image_analyzer",
+    "app.analyzers.link_analyzer",
+    "app.analyzers.rendered_analyzer",
+]
+
+
+class Stage:
+    """An input shared by analyzers, computed from the URL and other stages"""
+
+    def __init__(self, name: str, produce: Callable, inputs: Tuple[str, ...], executor: str):
+        self.name = name
+        self.produce = produce
+        self.inputs = inputs
+        self.executor = executor
+
+
+class AnalyzerSpec:
+    """
+    A registered analyzer: result section, display name, overall-score weight and inputs.
+    Non-default analyzers only run when selected (e.g. by the deep profile).
+    """
+
+    def __init__(self, section: str, key: str, name: str, weight: float, cls, inputs: Tuple[str, ...],
+                 default: bool = True):
+        self.section = section
+        self.key = key
+        self.name = name
+        self.weight = weight
+        self.cls = cls
+        self.inputs = inputs
+        self.default = default
+
+    def fallback(self, error) -> Dict:
+        """Result recorded when the analyzer (or one of its inputs) failed"""
+        return {"score": 0, "error": str(error), "issues": ["Analysis failed"], "recommendations": []}
+
+
+STAGES: Dict[str, Stage] = {}
+ANALYZERS: Dict[str, AnalyzerSpec] = {}
+_loaded = False
+
+
+def register_stage(name: str, inputs: Iterable[str] = (), executor: str = "loop"):
+    """
+    Register a stage producer, called as produce(url, **inputs). Async producers run on
+    the event loop; synchronous ones on the "cpu" or "io" pool.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor for stage {name}: {executor}")
+
+    def decorator(produce: Callable) -> Callable:
+        STAGES[name] = Stage(name, produce, tuple(inputs), executor)
+        return produce
+    return decorator
+
+
+def register_analyzer(section: str, name: str, weight: float, inputs: Iterable[str], default: bool = True):
+    """Register an analyzer class; analyze(url, **inputs) receives the declared stages"""
+    def decorator(cls):
+        ANALYZERS[section] = AnalyzerSpec(
+            section, section.removesuffix("_analysis"), name, weight, cls, tuple(inputs), default
+        )
+        return cls
+    return decorator
+
+
+def load_analyzers():
+    """Import the built-in analyzers and configured plugins (once)"""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    plugins = [module.strip() for module in settings.ANALYZER_PLUGINS.split(",") if module.strip()]
+    for module in BUILTIN_MODULES + plugins:
+        importlib.import_module(module)
+
+
+def analyzer_sections() -> List[str]:
+    """Result sections of every registered analyzer, in registration order"""
+    load_analyzers()
+    return list(ANALYZERS)
+
+
+def select_analyzers(names: Optional[Iterable[str]] = None) -> List[AnalyzerSpec]:
+    """
+    Analyzers to run, by key ("seo") or section ("seo_analysis"); the default ones when
+    names is None. Raises ValueError for unknown names.
+    """
+    load_analyzers()
+    if names is None:
+        return [spec for spec in ANALYZERS.values() if spec.default]
+
+    by_name = {**{spec.key: spec for spec in ANALYZERS.values()}, **ANALYZERS}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown analyzers: {', '.join(unknown)}")
+    selected = {by_name[name].section for name in names}
+    return [spec for section, spec in ANALYZERS.items() if section in selected]
+
+
+def required_stages(specs: Iterable[AnalyzerSpec], extra: Iterable[str] = ()) -> List[str]:
+    """Stages the analyzers (and extra requested stages) depend on, dependencies first"""
+    order: List[str] = []
+    visiting = set()
+
+    def visit(name: str):
+        if name in order:
+            return
+        if name not in STAGES:
+            raise ValueError(f"Unknown analyzer input: {name}")
+        if name in visiting:
+            raise ValueError(f"Analyzer inputs form a cycle at: {name}")
+        visiting.add(name)
+        for dependency in STAGES[name].inputs:
+            visit(dependency)
+        visiting.discard(name)
+        order.append(name)
+
+    for spec in specs:
+        for name in spec.inputs:
+            visit(name)
+    for name in extra:
+        visit(name)
+    return order
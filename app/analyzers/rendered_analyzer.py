@@ -0,0 +1,117 @@
+from typing import Dict, Optional
+import asyncio
+import time
+
+from playwright.sync_api import sync_playwright
+
+from app.core.config import settings
+from app.analyzers.registry import register_analyzer, register_stage
+from app.utils.budget import Budget
+
+
+# Navigation and paint timings (milliseconds from navigation start) and loaded resources
+_TIMINGS_SCRIPT = """() => {
+    const navigation = performance.getEntriesByType('navigation')[0];
+    const paint = performance.getEntriesByName('first-contentful-paint')[0];
+    const resources = performance.getEntriesByType('resource');
+    return {
+        dom_content_loaded_ms: navigation ? navigation.domContentLoadedEventEnd : null,
+        load_ms: navigation ? navigation.loadEventEnd : null,
+        first_contentful_paint_ms: paint ? paint.startTime : null,
+        requests: resources.length + 1,
+        transfer_bytes: resources.reduce((total, r) => total + (r.transferSize || 0), 0)
+            + (navigation ? navigation.transferSize : 0)
+    };
+}"""
+
+
+@register_stage("rendered", inputs=["budget"], executor="io")
+def render_page(url: str, budget: Optional[Budget] = None) -> Dict:
+    """
+    Load the page in headless Chromium (Playwright) and read its navigation and paint
+    timings, request count and the size of the rendered HTML. Only produced when a
+    selected analyzer declares it (deep profile). The browser is not started with less
+    than RENDERED_MIN_SECONDS left, and every browser step is bounded by the time left
+    (Playwright reads a zero timeout as no timeout).
+    """
+    timeout = budget.timeout(settings.RENDERED_TIMEOUT_SECONDS) if budget else settings.RENDERED_TIMEOUT_SECONDS
+    if timeout < settings.RENDERED_MIN_SECONDS:
+        if budget is not None:
+            budget.degrade("no headless-browser render")
+        raise TimeoutError("Not enough analysis time left to render the page")
+
+    deadline = time.monotonic() + timeout
+
+    def time_left_ms() -> float:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError("Rendering did not finish within its time limit")
+        return max(1.0, left * 1000)
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(timeout=time_left_ms())
+        try:
+            page = browser.new_page()
+            page.set_default_timeout(time_left_ms())
+            page.goto(url, wait_until="load", timeout=time_left_ms())
+            metrics = page.evaluate(_TIMINGS_SCRIPT)
+            metrics["html_bytes"] = len(page.content().encode("utf-8"))
+            metrics["final_url"] = page.url
+        finally:
+            browser.close()
+    return metrics
+
+
+@register_analyzer("rendered_analysis", "Rendering", weight=0.0, inputs=["rendered"], default=False)
+class RenderedAnalyzer:
+    """Browser-measured load timings (deep profile); reported alongside the overall score, not in it"""
+
+    async def analyze(self, url: str, rendered: Optional[Dict] = None) -> Dict:
+        """Score first contentful paint, load time and request count"""
+        try:
+            if rendered is None:
+                rendered = await asyncio.to_thread(render_page, url)
+
+            issues = []
+            recommendations = []
+            score = 100
+
+            paint = rendered.get("first_contentful_paint_ms")
+            if paint is not None and paint > 3000:
+                score -= 35
+                issues.append(f"Slow first contentful paint ({paint / 1000:.1f}s)")
+                recommendations.append("Reduce render-blocking scripts and styles")
+            elif paint is not None and paint > 1800:
+                score -= 15
+                issues.append(f"First contentful paint could be faster ({paint / 1000:.1f}s)")
+                recommendations.append("Inline critical CSS and defer non-critical scripts")
+
+            load = rendered.get("load_ms")
+            if load is not None and load > 5000:
+                score -= 35
+                issues.append(f"Slow full page load ({load / 1000:.1f}s)")
+                recommendations.append("Lazy-load below-the-fold images and third-party widgets")
+            elif load is not None and load > 3000:
+                score -= 15
+                issues.append(f"Full page load could be faster ({load / 1000:.1f}s)")
+                recommendations.append("Compress and cache static assets")
+
+            if rendered.get("requests", 0) > 100:
+                score -= 15
+                issues.append(f"Many requests while loading ({rendered['requests']})")
+                recommendations.append("Bundle scripts and styles and drop unused third-party tags")
+
+            return {
+                "score": max(0, score),
+                "metrics": rendered,
+                "issues": issues,
+                "recommendations": recommendations
+            }
+
+        except Exception as e:
+            return {
+                "score": 0,
+                "error": str(e),
+                "issues": ["Rendered page analysis failed"],
+                "recommendations": []
+            }
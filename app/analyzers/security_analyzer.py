@@ -1,12 +1,15 @@
-import httpx
 from bs4 import BeautifulSoup
+from datetime import datetime
 from typing import Dict, List
 from urllib.parse import urlparse, urljoin
-import ssl
-import socket
+import asyncio
 import re
 
+from app.analyzers.page import FetchedPage, fetch_page, parse_dom, probe_tls
+from app.analyzers.registry import register_analyzer
 
+
+@register_analyzer("security_analysis", "Security", weight=0.15, inputs=["page", "dom", "tls"])
 class SecurityAnalyzer:
     """Analyze website security with comprehensive checks"""
     
@@ -44,16 +47,18 @@ class SecurityAnalyzer:
         }
     }
     
-    async def analyze(self, url: str) -> Dict:
+    async def analyze(self, url: str, page: FetchedPage = None, dom: BeautifulSoup = None,
+                      tls: Dict = None) -> Dict:
         """Perform comprehensive security analysis"""
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
-                html = response.text
-                headers = response.headers
-                final_url = str(response.url)
+            if page is None:
+                page = await fetch_page(url)
+            if tls is None:
+                tls = await asyncio.get_running_loop().run_in_executor(None, probe_tls, url)
+            headers = page.headers
+            final_url = page.final_url
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = dom if dom is not None else parse_dom(url, page)
             parsed_url = urlparse(url)
             
             issues = []
@@ -62,7 +67,7 @@ class SecurityAnalyzer:
             # Analyze all security components
             https_score, https_data = self._analyze_https(parsed_url, issues, recommendations)
             headers_score, headers_data = self._analyze_security_headers(headers, issues, recommendations)
-            ssl_score, ssl_data = await self._analyze_ssl_tls(parsed_url.netloc, issues, recommendations)
+            ssl_score, ssl_data = self._analyze_ssl_tls(tls, issues, recommendations)
             content_score, content_data = self._analyze_content_security(soup, url, issues, recommendations)
             cookies_score, cookies_data = self._analyze_cookies(headers, issues, recommendations)
             
@@ -113,6 +118,7 @@ class SecurityAnalyzer:
         except Exception as e:
             return {
                 "score": 0,
+                "error": str(e),
                 "grade": "F",
                 "security_level": "Unknown",
                 "uses_https": False,
@@ -166,68 +172,52 @@ class SecurityAnalyzer:
             'total_headers': len(self.SECURITY_HEADERS)
         }
     
-    async def _analyze_ssl_tls(self, hostname: str, issues: List, recommendations: List) -> tuple:
-        """Analyze SSL/TLS configuration"""
+    def _analyze_ssl_tls(self, tls: Dict, issues: List, recommendations: List) -> tuple:
+        """Analyze SSL/TLS configuration from the handshake probe"""
         score = 100
         ssl_data = {
-            'valid': False,
+            'valid': tls['valid'],
             'grade': 'Unknown',
-            'protocol': None,
-            'cipher': None
+            'protocol': tls['protocol'],
+            'cipher': tls['cipher']
         }
         
-        try:
-            # Create SSL context
-            context = ssl.create_default_context()
-            
-            # Connect and get certificate
-            with socket.create_connection((hostname, 443), timeout=10) as sock:
-                with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                    cert = ssock.getpeercert()
-                    ssl_data['valid'] = True
-                    ssl_data['protocol'] = ssock.version()
-                    ssl_data['cipher'] = ssock.cipher()[0]
-                    
-                    # Check protocol version
-                    if ssl_data['protocol'] in ['TLSv1.3', 'TLSv1.2']:
-                        ssl_data['grade'] = 'A'
-                    elif ssl_data['protocol'] == 'TLSv1.1':
-                        ssl_data['grade'] = 'B'
-                        issues.append("Using TLSv1.1 - Upgrade to TLS 1.2 or 1.3")
-                        recommendations.append("Upgrade to TLS 1.2 or 1.3 for better security")
-                        score = 80
-                    else:
-                        ssl_data['grade'] = 'C'
-                        issues.append(f"Using outdated protocol: {ssl_data['protocol']}")
-                        recommendations.append("Upgrade SSL/TLS to version 1.2 or higher")
-                        score = 60
-                    
-                    # Check certificate expiry
-                    import datetime
-                    from datetime import datetime as dt
-                    
-                    not_after = cert.get('notAfter')
-                    if not_after:
-                        expiry_date = dt.strptime(not_after, '%b %d %H:%M:%S %Y %Z')
-                        days_until_expiry = (expiry_date - dt.now()).days
-                        
-                        if days_until_expiry < 0:
-                            issues.append("Critical: SSL certificate has expired!")
-                            recommendations.append("Renew SSL certificate immediately")
-                            score = 0
-                        elif days_until_expiry < 30:
-                            issues.append(f"SSL certificate expires in {days_until_expiry} days")
-                            recommendations.append("Renew SSL certificate soon")
-                            score = min(score, 70)
-        
-        except ssl.SSLError as e:
-            issues.append(f"SSL Error: {str(e)}")
+        if tls.get('ssl_error'):
+            issues.append(f"SSL Error: {tls['failure']}")
             recommendations.append("Fix SSL/TLS configuration issues")
-            score = 30
-        except Exception as e:
+            return 30, ssl_data
+        if tls.get('failure'):
             # If HTTPS not available, score is 0
-            if "443" in str(e):
+            return (0 if "443" in tls['failure'] else score), ssl_data
+        
+        # Check protocol version
+        if ssl_data['protocol'] in ['TLSv1.3', 'TLSv1.2']:
+            ssl_data['grade'] = 'A'
+        elif ssl_data['protocol'] == 'TLSv1.1':
+            ssl_data['grade'] = 'B'
+            issues.append("Using TLSv1.1 - Upgrade to TLS 1.2 or 1.3")
+            recommendations.append("Upgrade to TLS 1.2 or 1.3 for better security")
+            score = 80
+        else:
+            ssl_data['grade'] = 'C'
+            issues.append(f"Using outdated protocol: {ssl_data['protocol']}")
+            recommendations.append("Upgrade SSL/TLS to version 1.2 or higher")
+            score = 60
+        
+        # Check certificate expiry
+        not_after = tls.get('not_after')
+        if not_after:
+            expiry_date = datetime.strptime(not_after, '%b %d %H:%M:%S %Y %Z')
+            days_until_expiry = (expiry_date - datetime.now()).days
+            
+            if days_until_expiry < 0:
+                issues.append("Critical: SSL certificate has expired!")
+                recommendations.append("Renew SSL certificate immediately")
                 score = 0
+            elif days_until_expiry < 30:
+                issues.append(f"SSL certificate expires in {days_until_expiry} days")
+                recommendations.append("Renew SSL certificate soon")
+                score = min(score, 70)
         
         return score, ssl_data
     
@@ -1,11 +1,17 @@
-import httpx
 from bs4 import BeautifulSoup
 from typing import Dict, List
 from urllib.parse import urlparse, urljoin
 import re
 from collections import Counter
 
+from app.analyzers.page import FetchedPage, fetch_page, parse_dom, text_without
+from app.analyzers.registry import register_analyzer
 
+# Elements left out of the page text used for keywords and word counts
+NON_TEXT_TAGS = ["script", "style", "nav", "footer"]
+
+
+@register_analyzer("seo_analysis", "SEO", weight=0.20, inputs=["page", "dom"])
 class SEOAnalyzer:
     """Analyze website SEO with comprehensive checks"""
     
@@ -19,15 +25,14 @@ class SEOAnalyzer:
         'external_links': {'max': 50}
     }
     
-    async def analyze(self, url: str) -> Dict:
+    async def analyze(self, url: str, page: FetchedPage = None, dom: BeautifulSoup = None) -> Dict:
         """Perform comprehensive SEO analysis"""
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
-                html = response.text
-                final_url = str(response.url)
+            if page is None:
+                page = await fetch_page(url)
+            final_url = page.final_url
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = dom if dom is not None else parse_dom(url, page)
             
             issues = []
             recommendations = []
@@ -102,6 +107,7 @@ class SEOAnalyzer:
         except Exception as e:
             return {
                 "score": 0,
+                "error": str(e),
                 "grade": "F",
                 "meta_title": None,
                 "meta_description": None,
@@ -224,11 +230,8 @@ class SEOAnalyzer:
     
     def _analyze_content(self, soup: BeautifulSoup, issues: List, recommendations: List) -> tuple:
         """Analyze content quality and keyword usage"""
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer"]):
-            script.decompose()
-        
-        text = soup.get_text()
+        # Page text without script, style and navigation elements
+        text = text_without(soup, NON_TEXT_TAGS)
         lines = (line.strip() for line in text.splitlines())
         chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
         text = ' '.join(chunk for chunk in chunks if chunk)
@@ -439,11 +442,8 @@ class SEOAnalyzer:
     
     def _extract_keywords(self, soup: BeautifulSoup, title: str) -> List[str]:
         """Extract primary keywords"""
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer"]):
-            script.decompose()
-        
-        text = soup.get_text().lower()
+        # Page text without script, style and navigation elements
+        text = text_without(soup, NON_TEXT_TAGS).lower()
         title_lower = title.lower() if title else ""
         
         # Common stop words
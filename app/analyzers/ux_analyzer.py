@@ -1,9 +1,12 @@
-import httpx
 from bs4 import BeautifulSoup
 from typing import Dict, List
 import re
 
+from app.analyzers.page import FetchedPage, fetch_page, parse_dom
+from app.analyzers.registry import register_analyzer
 
+
+@register_analyzer("ux_analysis", "UX", weight=0.18, inputs=["dom"])
 class UXAnalyzer:
     """Analyze website UX/UI with comprehensive accessibility and usability checks"""
     
@@ -16,14 +19,14 @@ class UXAnalyzer:
         'touch_target': {'min': 44}  # pixels
     }
     
-    async def analyze(self, url: str) -> Dict:
+    async def analyze(self, url: str, page: FetchedPage = None, dom: BeautifulSoup = None) -> Dict:
         """Perform comprehensive UX analysis"""
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
-                html = response.text
-            
-            soup = BeautifulSoup(html, 'html.parser')
+            if dom is None:
+                if page is None:
+                    page = await fetch_page(url)
+                dom = parse_dom(url, page)
+            soup = dom
             
             issues = []
             recommendations = []
@@ -86,6 +89,7 @@ class UXAnalyzer:
         except Exception as e:
             return {
                 "score": 0,
+                "error": str(e),
                 "grade": "F",
                 "mobile_friendly": False,
                 "accessibility_score": 0,
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Optional
 from datetime import datetime
 from bson import ObjectId
@@ -6,15 +8,28 @@ from bson import ObjectId
 from app.schemas.analysis import AnalysisCreate, AnalysisResponse, AnalysisDetail, ChatRequest, ChatResponse
 from app.core.security import get_current_user
 from app.core.database import get_database
-from app.services.analysis_service import perform_website_analysis
+from app.services.analysis_service import perform_website_analysis, update_analysis_status
+from app.services.stats_service import UserStatsService
+from app.services.job_scheduler import analysis_scheduler
+from app.services.analysis_store import AnalysisStore, SECTIONS, ANALYZER_SECTIONS
+from app.services.chat_context_service import ChatContextService
+from app.services.share_service import ShareService
+from app.services.percentile_service import PercentileService
 from app.services.ai_service import AIService
-from app.utils.rate_limiter import check_rate_limit
+from app.analyzers.registry import analyzer_sections, select_analyzers
+from app.analyzers.profiles import PROFILES, get_profile, profile_cost
+from app.core.config import settings
+from app.utils.rate_limiter import check_rate_limit, limiter
+from app.utils.sse import sse_event
+from app.utils.urls import normalize_domain
 
 router = APIRouter()
 
 
 @router.post("/analyze", response_model=AnalysisResponse)
+@limiter.limit(settings.RATE_LIMIT_ANALYZE)
 async def create_analysis(
+    request: Request,
     analysis_data: AnalysisCreate,
     background_tasks: BackgroundTasks,
     current_user: Optional[dict] = Depends(get_current_user)
@@ -27,7 +42,16 @@ async def create_analysis(
     plan = current_user.get("plan", "free") if current_user else "free"
     
     try:
-        await check_rate_limit(user_id, plan, db)
+        profile = get_profile(analysis_data.profile)
+        select_analyzers(profile.analyzer_names(analysis_data.analyzers))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        await check_rate_limit(user_id, plan, db, profile=profile.name)
     except HTTPException as e:
         raise e
     
@@ -35,28 +59,34 @@ async def create_analysis(
     analysis_dict = {
         "user_id": user_id,
         "website_url": str(analysis_data.website_url),
+        "domain": normalize_domain(str(analysis_data.website_url)),
+        "plan": plan,
+        "profile": profile.name,
         "status": "pending",
         "created_at": datetime.utcnow()
     }
     
     result = await db.analyses.insert_one(analysis_dict)
     analysis_id = str(result.inserted_id)
+    await UserStatsService.record_created(db, user_id, analysis_dict["created_at"])
     
-    # Run analysis immediately (not in background for now)
-    # This ensures it completes without needing Celery
+    # Run analysis immediately (not in background for now), once the scheduler gives it
+    # a slot by plan. This ensures it completes without needing Celery
     try:
         print(f"🔍 Starting analysis for {analysis_data.website_url}")
-        await perform_website_analysis(analysis_id, str(analysis_data.website_url))
+        await analysis_scheduler.run(plan, user_id, lambda: perform_website_analysis(
+            analysis_id,
+            str(analysis_data.website_url),
+            analyzers=analysis_data.analyzers,
+            profile=profile.name
+        ))
         print(f"✅ Analysis completed for {analysis_id}")
     except Exception as e:
         print(f"❌ Analysis error: {e}")
         import traceback
         traceback.print_exc()
         # Update status to failed
-        await db.analyses.update_one(
-            {"_id": ObjectId(analysis_id)},
-            {"$set": {"status": "failed", "error_message": str(e)}}
-        )
+        await update_analysis_status(analysis_id, "failed", {"error_message": str(e)})
     
     return AnalysisResponse(
         id=analysis_id,
@@ -68,13 +98,33 @@ async def create_analysis(
     )
 
 
+@router.get("/analyzers")
+async def list_analyzers():
+    """Registered analyzers: key to select them with, weight in the overall score and inputs"""
+    return [
+        {"key": spec.key, "section": spec.section, "name": spec.name, "weight": spec.weight,
+         "inputs": list(spec.inputs), "default": spec.default}
+        for spec in select_analyzers(analyzer_sections())
+    ]
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Analysis profiles: analyzers run, whether AI insights and the PDF are generated, and quota cost"""
+    return [
+        {"name": profile.name, "analyzers": profile.analyzer_names() or [spec.key for spec in select_analyzers()],
+         "reports": profile.reports, "cost": profile_cost(profile.name)}
+        for profile in PROFILES.values()
+    ]
+
+
 @router.get("/{analysis_id}", response_model=AnalysisDetail)
 async def get_analysis(analysis_id: str):
     """Get analysis details"""
     db = get_database()
     
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await AnalysisStore.get(db, analysis_id, SECTIONS)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -87,6 +137,16 @@ async def get_analysis(analysis_id: str):
             detail="Analysis not found"
         )
     
+    percentiles = None
+    if analysis["status"] == "completed":
+        percentiles = await PercentileService.percentiles(
+            db,
+            analysis.get("overall_score"),
+            analysis.get("scores") or AnalysisStore.header_fields(analysis)["scores"],
+            analysis.get("domain"),
+            analysis.get("plan")
+        )
+    
     return AnalysisDetail(
         id=str(analysis["_id"]),
         website_url=analysis["website_url"],
@@ -103,23 +163,25 @@ async def get_analysis(analysis_id: str):
         action_plan=analysis.get("action_plan"),
         screenshot_url=analysis.get("screenshot_url"),
         pdf_url=analysis.get("pdf_url"),
+        percentiles=percentiles,
+        profile=analysis.get("profile", "standard"),
+        analyzers=analysis.get("analyzers"),
+        degraded=analysis.get("degraded"),
+        additional_analyses={
+            section: analysis[section]
+            for section in ANALYZER_SECTIONS
+            if section not in AnalysisDetail.model_fields and section in analysis
+        } or None,
         created_at=analysis["created_at"],
         completed_at=analysis.get("completed_at")
     )
 
 
-@router.post("/{analysis_id}/chat", response_model=ChatResponse)
-async def chat_about_analysis(
-    analysis_id: str,
-    chat_request: ChatRequest,
-    current_user: Optional[dict] = Depends(get_current_user)
-):
-    """Ask questions about the analysis"""
-    db = get_database()
-    
-    # Get analysis
+async def _load_chat(db, analysis_id: str):
+    """Prepared context and unsummarized history for a chat turn"""
+    # Get the prepared chat context (built from the analysis on first use)
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        context = await ChatContextService.get_context(db, analysis_id)
     except Exception as e:
         print(f"❌ Error finding analysis: {e}")
         raise HTTPException(
@@ -127,44 +189,33 @@ async def chat_about_analysis(
             detail="Invalid analysis ID"
         )
     
-    if not analysis:
+    if not context:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Analysis not found"
         )
     
-    if analysis["status"] != "completed":
+    if context["status"] != "completed":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Analysis not completed yet"
         )
     
-    # Get chat history
+    # Get chat history not yet folded into the conversation summary
     try:
-        chat_history = await db.chat_messages.find(
-            {"analysis_id": analysis_id}
-        ).sort("created_at", 1).to_list(length=50)
+        chat_history = await ChatContextService.recent_messages(db, analysis_id, context)
     except Exception as e:
         print(f"⚠️ Error loading chat history: {e}")
         chat_history = []
     
-    # Generate AI response with error handling
-    try:
-        ai_service = AIService()
-        response = await ai_service.chat_about_analysis(
-            analysis,
-            chat_request.message,
-            chat_history
-        )
-    except Exception as e:
-        print(f"❌ Error generating AI response: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        # Provide a helpful fallback response
-        response = f"""I apologize, but I'm currently experiencing high demand and couldn't generate a detailed response. However, I can provide some general guidance:
+    return context, chat_history
+
+
+def _chat_fallback_response(analysis: dict, message: str) -> str:
+    """Helpful answer built from the scores alone when the AI call fails"""
+    return f"""I apologize, but I'm currently experiencing high demand and couldn't generate a detailed response. However, I can provide some general guidance:
 
-**Based on your question:** "{chat_request.message}"
+**Based on your question:** "{message}"
 
 **Quick Tips:**
 - Review the detailed analysis sections above for specific issues and recommendations
@@ -181,14 +232,16 @@ async def chat_about_analysis(
 - Images: {analysis.get('image_analysis', {}).get('score', 'N/A')}/100
 
 Please try asking your question again in a moment, or review the detailed analysis sections for more information."""
-    
-    # Save messages
+
+
+async def _save_chat_turn(db, analysis_id: str, current_user: Optional[dict], message: str, response: str):
+    """Persist the question and the answer"""
     try:
         user_message = {
             "analysis_id": analysis_id,
             "user_id": current_user.get("user_id") if current_user else None,
             "role": "user",
-            "message": chat_request.message,
+            "message": message,
             "created_at": datetime.utcnow()
         }
         
@@ -200,11 +253,50 @@ Please try asking your question again in a moment, or review the detailed analys
             "created_at": datetime.utcnow()
         }
         
-        await db.chat_messages.insert_one(user_message)
-        await db.chat_messages.insert_one(assistant_message)
+        # Both messages in one write, straight away: the next turn reads them back
+        await db.chat_messages.insert_many([user_message, assistant_message])
     except Exception as e:
         print(f"⚠️ Error saving chat messages: {e}")
         # Continue anyway - we still want to return the response
+
+
+@router.post("/{analysis_id}/chat", response_model=ChatResponse)
+@limiter.limit(settings.RATE_LIMIT_CHAT)
+async def chat_about_analysis(
+    request: Request,
+    analysis_id: str,
+    chat_request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """Ask questions about the analysis"""
+    db = get_database()
+    context, chat_history = await _load_chat(db, analysis_id)
+    analysis = ChatContextService.score_view(context)
+    
+    # Generate AI response with error handling
+    try:
+        ai_service = AIService()
+        response = await ai_service.chat_about_analysis(
+            analysis,
+            chat_request.message,
+            chat_history,
+            context=context["context"],
+            conversation_summary=context.get("summary")
+        )
+    except Exception as e:
+        print(f"❌ Error generating AI response: {e}")
+        import traceback
+        traceback.print_exc()
+        
+        # Provide a helpful fallback response
+        response = _chat_fallback_response(analysis, chat_request.message)
+    
+    await _save_chat_turn(db, analysis_id, current_user, chat_request.message, response)
+    
+    # Two more messages were just added; summarize older turns off the request path
+    if ChatContextService.should_fold(len(chat_history) + 2):
+        background_tasks.add_task(ChatContextService.fold_history, db, analysis_id)
     
     return ChatResponse(
         role="assistant",
@@ -213,13 +305,71 @@ Please try asking your question again in a moment, or review the detailed analys
     )
 
 
+@router.post("/{analysis_id}/chat/stream")
+@limiter.limit(settings.RATE_LIMIT_CHAT)
+async def stream_chat_about_analysis(
+    request: Request,
+    analysis_id: str,
+    chat_request: ChatRequest,
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """
+    Ask questions about the analysis, streaming the answer as Server-Sent Events
+    
+    Events: `token` ({"text"}) as the model produces text, then `done`
+    ({"message", "created_at"}) once the full answer has been saved.
+    """
+    db = get_database()
+    context, chat_history = await _load_chat(db, analysis_id)
+    analysis = ChatContextService.score_view(context)
+    
+    ai_service = AIService()
+    prompt = ai_service.build_chat_prompt(
+        context["context"], chat_request.message, chat_history, context.get("summary")
+    )
+    
+    async def event_stream():
+        parts = []
+        try:
+            async for text in ai_service.stream_chat(prompt):
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        except Exception as e:
+            print(f"❌ Error streaming AI response: {e}")
+            if not parts:
+                # Nothing sent yet - answer with the fallback instead
+                fallback = _chat_fallback_response(analysis, chat_request.message)
+                parts.append(fallback)
+                yield sse_event("token", {"text": fallback})
+            else:
+                yield sse_event("error", {"detail": "Response was interrupted"})
+        
+        response = "".join(parts)
+        await _save_chat_turn(db, analysis_id, current_user, chat_request.message, response)
+        yield sse_event("done", {"message": response, "created_at": datetime.utcnow()})
+    
+    # Summarize older turns once the stream has finished
+    fold = None
+    if ChatContextService.should_fold(len(chat_history) + 2):
+        fold = BackgroundTask(ChatContextService.fold_history, db, analysis_id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=fold
+    )
+
+
 @router.get("/{analysis_id}/pdf")
-async def download_pdf(analysis_id: str):
+@limiter.limit(settings.RATE_LIMIT_PDF)
+async def download_pdf(request: Request, analysis_id: str):
     """Download PDF report"""
     db = get_database()
     
+    # Header only - sections are loaded below if the PDF still has to be generated
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await AnalysisStore.get(db, analysis_id)
     except Exception as e:
         print(f"❌ Error finding analysis: {e}")
         raise HTTPException(
@@ -248,6 +398,10 @@ async def download_pdf(analysis_id: str):
         try:
             from app.services.pdf_service import PDFService
             pdf_service = PDFService()
+            analysis = await AnalysisStore.get(db, analysis_id, [
+                "ux_analysis", "seo_analysis", "performance_analysis", "content_analysis",
+                "ai_summary", "priority_recommendations"
+            ])
             
             # Prepare data for PDF
             pdf_data = {
@@ -259,7 +413,14 @@ async def download_pdf(analysis_id: str):
                 'performance_analysis': analysis.get('performance_analysis', {}),
                 'content_analysis': analysis.get('content_analysis', {}),
                 'ai_summary': analysis.get('ai_summary', 'No summary available'),
-                'priority_recommendations': analysis.get('priority_recommendations', [])
+                'priority_recommendations': analysis.get('priority_recommendations', []),
+                'percentiles': await PercentileService.percentiles(
+                    db,
+                    analysis.get('overall_score'),
+                    analysis.get('scores') or AnalysisStore.header_fields(analysis)["scores"],
+                    analysis.get('domain'),
+                    analysis.get('plan')
+                )
             }
             
             # Generate PDF
@@ -272,6 +433,7 @@ async def download_pdf(analysis_id: str):
                 {"_id": ObjectId(analysis_id)},
                 {"$set": {"pdf_url": pdf_url}}
             )
+            await ShareService.purge(db, analysis_id=analysis_id)
             
             print(f"✅ PDF generated successfully: {pdf_url}")
             
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, HTTPException, status, Depends
+import asyncio
 from datetime import datetime, timedelta
 from bson import ObjectId
 
 from app.schemas.user import UserCreate, UserLogin, UserResponse
 from app.schemas.auth import Token, TokenRefresh
+from app.core.config import settings
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
+    login_semaphore,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -33,7 +36,7 @@ async def register(user_data: UserCreate):
         # Create user
         user_dict = {
             "email": user_data.email,
-            "hashed_password": get_password_hash(user_data.password),
+            "hashed_password": await get_password_hash_async(user_data.password),
             "full_name": user_data.full_name,
             "plan": "basic",  # Default plan
             "is_active": True,
@@ -42,7 +45,7 @@ async def register(user_data: UserCreate):
             "updated_at": datetime.utcnow(),
             "analyses_count": 0,
             "monthly_analyses_count": 0,
-            "monthly_reset_date": datetime.utcnow() + timedelta(days=30)
+            "monthly_reset_date": datetime.utcnow() + timedelta(days=settings.RATE_LIMIT_WINDOW_DAYS)
         }
         
         result = await db.users.insert_one(user_dict)
@@ -71,12 +74,22 @@ async def register(user_data: UserCreate):
 @router.post("/login", response_model=Token)
 async def login(credentials: UserLogin):
     """Login user"""
+    # Bound concurrent password checks; shed load instead of queueing forever
+    try:
+        await asyncio.wait_for(login_semaphore.acquire(), timeout=settings.LOGIN_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress. Please try again.",
+            headers={"Retry-After": "1"}
+        )
+    
     try:
         db = get_database()
         
         # Find user
         user = await db.users.find_one({"email": credentials.email})
-        if not user or not verify_password(credentials.password, user["hashed_password"]):
+        if not user or not await verify_password_async(credentials.password, user["hashed_password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
@@ -111,6 +124,8 @@ async def login(credentials: UserLogin):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Login failed: {str(e)}"
         )
+    finally:
+        login_semaphore.release()
 
 
 @router.post("/refresh", response_model=Token)
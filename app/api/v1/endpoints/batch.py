@@ -0,0 +1,291 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import timedelta
+from bson import ObjectId
+import asyncio
+import csv
+import io
+
+from app.schemas.batch import BatchCreateRequest, BatchResponse
+from app.services.batch_service import BatchService, parse_urls, read_csv_urls
+from app.services.analysis_store import ANALYZER_SECTIONS
+from app.core.database import get_database
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.utils.pagination import fetch_page
+from app.utils.rate_limiter import check_rate_limit, limiter
+from app.utils.sse import sse_event
+
+router = APIRouter()
+
+BATCH_PROJECTION = {
+    "user_id": 1,
+    "status": 1,
+    "total": 1,
+    "completed": 1,
+    "failed": 1,
+    "throughput": 1,
+    "error_message": 1,
+    "created_at": 1,
+    "started_at": 1,
+    "completed_at": 1
+}
+
+# How far before the newest sent completion the stream re-reads
+STREAM_LOOKBACK = timedelta(seconds=30)
+
+# Per-URL fields of a batch (header only, never the result sections)
+ITEM_PROJECTION = {
+    "website_url": 1,
+    "status": 1,
+    "overall_score": 1,
+    "scores": 1,
+    "pdf_url": 1,
+    "error_message": 1,
+    "completed_at": 1
+}
+
+
+async def _get_owned_batch(db, batch_id: str, current_user: dict, projection: dict) -> dict:
+    """Batch of the current user, or 404"""
+    batch = None
+    if ObjectId.is_valid(batch_id):
+        batch = await db.analysis_batches.find_one({"_id": ObjectId(batch_id)}, projection)
+
+    if not batch or batch.get("user_id") != current_user["user_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    return batch
+
+
+def _item_payload(analysis: dict) -> dict:
+    analysis["analysis_id"] = str(analysis.pop("_id"))
+    return analysis
+
+
+async def _start_batch(values: List[str], current_user: dict) -> BatchResponse:
+    """Validate the URLs, charge them against the plan quota and start the batch"""
+    urls, rejected = parse_urls(values)
+
+    if not urls:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least 1 valid URL is required"
+        )
+
+    if len(urls) > settings.BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {settings.BATCH_MAX_URLS} URLs allowed per batch"
+        )
+
+    db = get_database()
+    plan = current_user.get("plan", "free")
+    # Every URL is one analysis against the monthly quota
+    await check_rate_limit(current_user["user_id"], plan, db, cost=len(urls))
+
+    try:
+        batch_id = await BatchService().create_batch(urls, current_user["user_id"], plan)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create batch: {str(e)}"
+        )
+
+    return BatchResponse(
+        batch_id=batch_id,
+        status="processing",
+        total=len(urls),
+        rejected=rejected,
+        message=f"Batch started. Analyzing {len(urls)} websites..."
+    )
+
+
+@router.post("/", response_model=BatchResponse)
+@limiter.limit(settings.RATE_LIMIT_COMPARISON)
+async def create_batch(
+    request: Request,
+    batch_request: BatchCreateRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Analyze a list of websites as one batch
+
+    - **urls**: Website URLs (duplicates are ignored, invalid ones are returned as rejected)
+    """
+    return await _start_batch(batch_request.urls, current_user)
+
+
+@router.post("/upload", response_model=BatchResponse)
+@limiter.limit(settings.RATE_LIMIT_COMPARISON)
+async def upload_batch(
+    request: Request,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Analyze the websites of a CSV file as one batch
+
+    - **file**: CSV with a `url` column, or with the URLs in the first column
+    """
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV file must be UTF-8 encoded"
+        )
+
+    return await _start_batch(read_csv_urls(text), current_user)
+
+
+@router.get("/")
+async def list_batches(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Batches of the current user, newest first
+
+    - **cursor**: Continuation token from the previous page (X-Next-Cursor)
+    - **limit**: Page size (1-100)
+    """
+    db = get_database()
+    batches, next_cursor = await fetch_page(
+        db.analysis_batches, {"user_id": current_user["user_id"]}, cursor, limit, projection=BATCH_PROJECTION
+    )
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    for batch in batches:
+        batch["_id"] = str(batch["_id"])
+    return {"batches": batches, "next_cursor": next_cursor}
+
+
+@router.get("/{batch_id}")
+async def get_batch(batch_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Batch progress and throughput
+
+    - **batch_id**: The batch ID
+    """
+    db = get_database()
+    batch = await _get_owned_batch(db, batch_id, current_user, BATCH_PROJECTION)
+    batch["_id"] = str(batch["_id"])
+    return batch
+
+
+@router.get("/{batch_id}/stream")
+async def stream_batch(batch_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Stream per-URL results as they finish (Server-Sent Events).
+
+    Events: `url` for each finished analysis, `progress` with the batch counters,
+    `done` when the batch is finished.
+    """
+    db = get_database()
+    await _get_owned_batch(db, batch_id, current_user, {"user_id": 1})
+
+    async def event_stream():
+        last_completed_at = None
+        sent_ids = set()
+        while True:
+            # Read the batch first: once finished, every analysis is already visible below
+            batch = await db.analysis_batches.find_one({"_id": ObjectId(batch_id)}, BATCH_PROJECTION)
+            if batch is None:
+                yield sse_event("error", {"detail": "Batch not found"})
+                return
+
+            # completed_at is stamped before the write lands, so look back a little and
+            # skip the analyses already sent
+            query = {"batch_id": batch_id, "completed_at": {"$ne": None}}
+            if last_completed_at:
+                query["completed_at"] = {"$gte": last_completed_at - STREAM_LOOKBACK}
+            finished = await db.analyses.find(query, ITEM_PROJECTION).sort("completed_at", 1).to_list(length=None)
+
+            sent = False
+            for analysis in finished:
+                if analysis["_id"] in sent_ids:
+                    continue
+                sent_ids.add(analysis["_id"])
+                last_completed_at = max(last_completed_at or analysis["completed_at"], analysis["completed_at"])
+                sent = True
+                yield sse_event("url", _item_payload(analysis))
+
+            if sent or batch["status"] in ("completed", "failed"):
+                yield sse_event("progress", {
+                    key: batch.get(key) for key in ("status", "total", "completed", "failed", "throughput")
+                })
+
+            if batch["status"] in ("completed", "failed"):
+                yield sse_event("done", {"status": batch["status"], "error": batch.get("error_message")})
+                return
+
+            await asyncio.sleep(settings.BATCH_STREAM_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{batch_id}/results")
+async def download_batch_results(
+    batch_id: str,
+    format: str = Query("csv", pattern="^(csv|json)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Download the scores of every URL in the batch, in submission order
+
+    - **format**: `csv` (one row per URL) or `json` (rows plus averages)
+    """
+    db = get_database()
+    batch = await _get_owned_batch(db, batch_id, current_user, BATCH_PROJECTION)
+    cursor = db.analyses.find({"batch_id": batch_id}, ITEM_PROJECTION).sort("_id", 1)
+
+    if format == "json":
+        items = [_item_payload(analysis) async for analysis in cursor]
+        averages = {}
+        for metric in ["overall_score"] + ANALYZER_SECTIONS:
+            values = [
+                item.get("overall_score") if metric == "overall_score" else (item.get("scores") or {}).get(metric)
+                for item in items if item["status"] == "completed"
+            ]
+            values = [value for value in values if isinstance(value, (int, float))]
+            averages[metric] = round(sum(values) / len(values), 2) if values else None
+
+        batch["_id"] = str(batch["_id"])
+        return {"batch": batch, "averages": averages, "results": items}
+
+    async def rows():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["url", "status", "overall_score"] + ANALYZER_SECTIONS + ["error"])
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate(0)
+
+        async for analysis in cursor:
+            scores = analysis.get("scores") or {}
+            writer.writerow(
+                [analysis["website_url"], analysis["status"], analysis.get("overall_score", "")]
+                + [scores.get(section, "") for section in ANALYZER_SECTIONS]
+                + [analysis.get("error_message", "")]
+            )
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=batch_{batch_id}.csv"}
+    )
@@ -0,0 +1,212 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from bson import ObjectId
+import asyncio
+
+from app.schemas.benchmark import BenchmarkCreateRequest, BenchmarkResponse
+from app.services.benchmark_service import BenchmarkService
+from app.core.database import get_database
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.utils.pagination import fetch_page
+from app.utils.rate_limiter import check_rate_limit, limiter
+from app.utils.sse import sse_event
+
+router = APIRouter()
+
+# Benchmark fields returned to clients (never the full competitor list)
+BENCHMARK_PROJECTION = {
+    "user_id": 1,
+    "your_url": 1,
+    "status": 1,
+    "total": 1,
+    "completed": 1,
+    "failed": 1,
+    "summary": 1,
+    "insights": 1,
+    "leaderboard": 1,
+    "error_message": 1,
+    "created_at": 1,
+    "completed_at": 1
+}
+
+SITE_PROJECTION = {
+    "url": 1,
+    "is_yours": 1,
+    "status": 1,
+    "overall_score": 1,
+    "scores": 1,
+    "confidence": 1,
+    "analysis_id": 1,
+    "error": 1,
+    "ranks": 1,
+    "percentiles": 1,
+    "created_at": 1
+}
+
+
+async def _get_owned_benchmark(db, benchmark_id: str, current_user: dict, projection: dict) -> dict:
+    """Benchmark of the current user, or 404"""
+    benchmark = None
+    if ObjectId.is_valid(benchmark_id):
+        benchmark = await db.benchmarks.find_one({"_id": ObjectId(benchmark_id)}, projection)
+
+    if not benchmark or benchmark.get("user_id") != current_user["user_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Benchmark not found"
+        )
+    return benchmark
+
+
+def _site_payload(site: dict) -> dict:
+    site["_id"] = str(site["_id"])
+    return site
+
+
+@router.post("/", response_model=BenchmarkResponse)
+@limiter.limit(settings.RATE_LIMIT_COMPARISON)
+async def create_benchmark(
+    request: Request,
+    benchmark_request: BenchmarkCreateRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Benchmark your website against a large set of competitors
+
+    - **your_url**: Your website URL
+    - **competitor_urls**: Competitor URLs (duplicates are ignored)
+    """
+    your_url = str(benchmark_request.your_url)
+    competitor_urls = list(dict.fromkeys(
+        str(url) for url in benchmark_request.competitor_urls if str(url) != your_url
+    ))
+
+    if not competitor_urls:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least 1 competitor URL is required"
+        )
+
+    if len(competitor_urls) > settings.BENCHMARK_MAX_COMPETITORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {settings.BENCHMARK_MAX_COMPETITORS} competitors allowed"
+        )
+
+    db = get_database()
+    plan = current_user.get("plan", "free")
+    # Every benchmarked site (yours included) is one analysis against the plan quota
+    await check_rate_limit(current_user["user_id"], plan, db, cost=len(competitor_urls) + 1)
+
+    try:
+        benchmark_id = await BenchmarkService().create_benchmark(
+            your_url=your_url,
+            competitor_urls=competitor_urls,
+            user_id=current_user["user_id"],
+            plan=plan
+        )
+
+        return BenchmarkResponse(
+            benchmark_id=benchmark_id,
+            status="processing",
+            message=f"Benchmark started. Analyzing {len(competitor_urls) + 1} websites..."
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create benchmark: {str(e)}"
+        )
+
+
+@router.get("/{benchmark_id}")
+async def get_benchmark(benchmark_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Benchmark progress, standings per category, insights and leaderboard
+
+    - **benchmark_id**: The benchmark ID
+    """
+    db = get_database()
+    benchmark = await _get_owned_benchmark(db, benchmark_id, current_user, BENCHMARK_PROJECTION)
+    benchmark["_id"] = str(benchmark["_id"])
+    return benchmark
+
+
+@router.get("/{benchmark_id}/sites")
+async def list_benchmark_sites(
+    benchmark_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Per-site scores of a benchmark, most recently finished first
+
+    - **cursor**: Continuation token from the previous page (X-Next-Cursor)
+    - **limit**: Page size (1-200)
+    """
+    db = get_database()
+    await _get_owned_benchmark(db, benchmark_id, current_user, {"user_id": 1})
+
+    sites, next_cursor = await fetch_page(
+        db.benchmark_sites, {"benchmark_id": benchmark_id}, cursor, limit, projection=SITE_PROJECTION
+    )
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return {
+        "sites": [_site_payload(site) for site in sites],
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/{benchmark_id}/stream")
+async def stream_benchmark(benchmark_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Stream per-site results as they finish (Server-Sent Events).
+
+    Events: `site` for each finished site, `progress` with the refreshed standings,
+    `done` when the benchmark is finished.
+    """
+    db = get_database()
+    await _get_owned_benchmark(db, benchmark_id, current_user, {"user_id": 1})
+
+    async def event_stream():
+        last_id = None
+        while True:
+            # Read the status first: once finished, every row is already visible below
+            benchmark = await db.benchmarks.find_one({"_id": ObjectId(benchmark_id)}, BENCHMARK_PROJECTION)
+            if benchmark is None:
+                yield sse_event("error", {"detail": "Benchmark not found"})
+                return
+
+            query = {"benchmark_id": benchmark_id}
+            if last_id:
+                query["_id"] = {"$gt": last_id}
+            sites = await db.benchmark_sites.find(query, SITE_PROJECTION).sort("_id", 1).to_list(length=None)
+
+            for site in sites:
+                last_id = site["_id"]
+                yield sse_event("site", _site_payload(site))
+
+            if sites or benchmark["status"] in ("completed", "failed"):
+                yield sse_event("progress", {
+                    key: benchmark.get(key)
+                    for key in ("status", "total", "completed", "failed", "summary", "insights", "leaderboard")
+                })
+
+            if benchmark["status"] in ("completed", "failed"):
+                yield sse_event("done", {"status": benchmark["status"], "error": benchmark.get("error_message")})
+                return
+
+            await asyncio.sleep(settings.BENCHMARK_STREAM_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
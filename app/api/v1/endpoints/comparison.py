@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Query
+from typing import List, Optional
 from bson import ObjectId
 
 from app.schemas.comparison import (
@@ -8,13 +8,23 @@ from app.schemas.comparison import (
     ComparisonDetail
 )
 from app.services.comparison_service import ComparisonService
+from app.services.share_service import ShareService
 from app.core.database import get_database
+from app.core.config import settings
+from app.core.security import get_current_user, get_current_user_optional
+from app.utils.pagination import fetch_page
+from app.utils.rate_limiter import limiter
 
 router = APIRouter()
 
 
 @router.post("/", response_model=ComparisonResponse)
-async def create_comparison(request: ComparisonCreateRequest):
+@limiter.limit(settings.RATE_LIMIT_COMPARISON)
+async def create_comparison(
+    request: Request,
+    comparison_request: ComparisonCreateRequest,
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
     """
     Create a new competitor comparison analysis
     
@@ -23,20 +33,20 @@ async def create_comparison(request: ComparisonCreateRequest):
     """
     
     # Validate competitor count
-    if len(request.competitor_urls) < 1:
+    if len(comparison_request.competitor_urls) < 1:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="At least 1 competitor URL is required"
         )
     
-    if len(request.competitor_urls) > 5:
+    if len(comparison_request.competitor_urls) > 5:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Maximum 5 competitors allowed"
         )
     
     # Check for duplicate URLs
-    all_urls = [str(request.your_url)] + [str(url) for url in request.competitor_urls]
+    all_urls = [str(comparison_request.your_url)] + [str(url) for url in comparison_request.competitor_urls]
     if len(all_urls) != len(set(all_urls)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,14 +56,15 @@ async def create_comparison(request: ComparisonCreateRequest):
     try:
         comparison_service = ComparisonService()
         comparison_id = await comparison_service.create_comparison(
-            your_url=str(request.your_url),
-            competitor_urls=[str(url) for url in request.competitor_urls]
+            your_url=str(comparison_request.your_url),
+            competitor_urls=[str(url) for url in comparison_request.competitor_urls],
+            user_id=current_user["user_id"] if current_user else None
         )
         
         return ComparisonResponse(
             comparison_id=comparison_id,
             status="processing",
-            message=f"Comparison started. Analyzing {len(request.competitor_urls) + 1} websites..."
+            message=f"Comparison started. Analyzing {len(comparison_request.competitor_urls) + 1} websites..."
         )
         
     except Exception as e:
@@ -63,6 +74,54 @@ async def create_comparison(request: ComparisonCreateRequest):
         )
 
 
+@router.get("/")
+async def list_comparisons(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    List the current user's comparisons, newest first
+    
+    - **cursor**: Continuation token from the previous page (X-Next-Cursor)
+    - **limit**: Page size (1-100)
+    """
+    db = get_database()
+    
+    comparisons, next_cursor = await fetch_page(
+        db.comparisons,
+        {"user_id": current_user["user_id"]},
+        cursor,
+        limit,
+        projection={
+            "your_website.url": 1,
+            "competitors.url": 1,
+            "status": 1,
+            "created_at": 1,
+            "completed_at": 1
+        }
+    )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return {
+        "comparisons": [
+            {
+                "id": str(comparison["_id"]),
+                "your_website_url": comparison.get("your_website", {}).get("url"),
+                "competitor_count": len(comparison.get("competitors", [])),
+                "status": comparison["status"],
+                "created_at": comparison["created_at"],
+                "completed_at": comparison.get("completed_at")
+            }
+            for comparison in comparisons
+        ],
+        "next_cursor": next_cursor
+    }
+
+
 @router.get("/{comparison_id}")
 async def get_comparison(comparison_id: str):
     """
@@ -130,7 +189,13 @@ async def get_comparison_status(comparison_id: str):
 
 
 @router.post("/{analysis_id}/compare")
-async def compare_from_analysis(analysis_id: str, competitor_urls: List[str]):
+@limiter.limit(settings.RATE_LIMIT_COMPARISON)
+async def compare_from_analysis(
+    request: Request,
+    analysis_id: str,
+    competitor_urls: List[str],
+    current_user: Optional[dict] = Depends(get_current_user_optional)
+):
     """
     Create comparison from existing analysis
     
@@ -142,7 +207,7 @@ async def compare_from_analysis(analysis_id: str, competitor_urls: List[str]):
         db = get_database()
         
         # Get existing analysis
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)}, {"website_url": 1})
         
         if not analysis:
             raise HTTPException(
@@ -150,11 +215,13 @@ async def compare_from_analysis(analysis_id: str, competitor_urls: List[str]):
                 detail="Analysis not found"
             )
         
-        # Create comparison
+        # Create comparison, reusing this analysis' results instead of re-analyzing the site
         comparison_service = ComparisonService()
         comparison_id = await comparison_service.create_comparison(
             your_url=analysis["website_url"],
-            competitor_urls=competitor_urls
+            competitor_urls=competitor_urls,
+            user_id=current_user["user_id"] if current_user else None,
+            analysis_ids={analysis["website_url"]: analysis_id}
         )
         
         return ComparisonResponse(
@@ -173,7 +240,8 @@ async def compare_from_analysis(analysis_id: str, competitor_urls: List[str]):
 
 
 @router.get("/{comparison_id}/pdf")
-async def get_comparison_pdf(comparison_id: str):
+@limiter.limit(settings.RATE_LIMIT_PDF)
+async def get_comparison_pdf(request: Request, comparison_id: str):
     """
     Get or generate comparison PDF report
     
@@ -221,6 +289,7 @@ async def get_comparison_pdf(comparison_id: str):
             {"_id": ObjectId(comparison_id)},
             {"$set": {"pdf_url": pdf_url}}
         )
+        await ShareService.purge(db, comparison_id=comparison_id)
         
         return {
             "pdf_url": pdf_url,
@@ -256,6 +325,8 @@ async def delete_comparison(comparison_id: str):
                 detail="Comparison not found"
             )
         
+        await ShareService.purge(db, comparison_id=comparison_id)
+        
         return {"message": "Comparison deleted successfully"}
         
     except HTTPException:
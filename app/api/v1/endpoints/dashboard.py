@@ -1,50 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from datetime import datetime, timedelta
-from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from typing import List, Optional
+import asyncio
 
 from app.core.security import get_current_user
 from app.core.database import get_database
-from app.schemas.analysis import AnalysisResponse
+from app.schemas.analysis import AnalysisResponse, ANALYSIS_LIST_PROJECTION
+from app.services.user_service import UserService
+from app.services.stats_service import UserStatsService
+from app.utils.pagination import fetch_page
+from app.utils.urls import normalize_domain
 
 router = APIRouter()
 
 
 @router.get("/")
-async def get_dashboard(current_user: dict = Depends(get_current_user)):
+async def get_dashboard(request: Request, current_user: dict = Depends(get_current_user)):
     """Get user dashboard data"""
     db = get_database()
     user_id = current_user["user_id"]
     
-    # Get user data
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    # User, aggregates and recent analyses are independent - fetch them together
+    user, stats, recent_analyses = await asyncio.gather(
+        UserService.get_user(db, user_id, request),
+        UserStatsService.get_stats(db, user_id),
+        db.analyses.find(
+            {"user_id": user_id}, ANALYSIS_LIST_PROJECTION
+        ).sort("created_at", -1).limit(5).to_list(length=5)
+    )
+    
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Get analyses count
-    total_analyses = await db.analyses.count_documents({"user_id": user_id})
-    
-    # Get recent analyses
-    recent_analyses = await db.analyses.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1).limit(5).to_list(length=5)
-    
-    # Calculate stats
-    completed_analyses = await db.analyses.count_documents({
-        "user_id": user_id,
-        "status": "completed"
-    })
-    
-    # Get average score
-    pipeline = [
-        {"$match": {"user_id": user_id, "status": "completed"}},
-        {"$group": {"_id": None, "avg_score": {"$avg": "$overall_score"}}}
-    ]
-    avg_result = await db.analyses.aggregate(pipeline).to_list(length=1)
-    avg_score = avg_result[0]["avg_score"] if avg_result else 0
+    total_analyses = stats.get("total", 0)
+    completed_analyses = stats.get("status_counts", {}).get("completed", 0)
+    avg_score = UserStatsService.average_score(stats)
     
     return {
         "user": {
@@ -60,13 +52,7 @@ async def get_dashboard(current_user: dict = Depends(get_current_user)):
             "average_score": round(avg_score, 2) if avg_score else 0
         },
         "recent_analyses": [
-            {
-                "id": str(a["_id"]),
-                "website_url": a["website_url"],
-                "status": a["status"],
-                "overall_score": a.get("overall_score"),
-                "created_at": a["created_at"]
-            }
+            AnalysisResponse.from_document(a)
             for a in recent_analyses
         ]
     }
@@ -74,29 +60,43 @@ async def get_dashboard(current_user: dict = Depends(get_current_user)):
 
 @router.get("/analyses", response_model=List[AnalysisResponse])
 async def get_user_analyses(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    domain: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all user analyses"""
+    """
+    Get user analyses, newest first
+    
+    - **cursor**: Continuation token from the previous page's X-Next-Cursor header
+    - **status**, **min_score**, **max_score**, **domain**: Optional filters
+    """
     db = get_database()
     user_id = current_user["user_id"]
     
-    analyses = await db.analyses.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
+    query = {"user_id": user_id}
+    if status_filter:
+        query["status"] = status_filter
+    if domain:
+        query["domain"] = normalize_domain(domain)
+    if min_score is not None or max_score is not None:
+        query["overall_score"] = {}
+        if min_score is not None:
+            query["overall_score"]["$gte"] = min_score
+        if max_score is not None:
+            query["overall_score"]["$lte"] = max_score
     
-    return [
-        AnalysisResponse(
-            id=str(a["_id"]),
-            website_url=a["website_url"],
-            status=a["status"],
-            overall_score=a.get("overall_score"),
-            created_at=a["created_at"],
-            completed_at=a.get("completed_at")
-        )
-        for a in analyses
-    ]
+    analyses, next_cursor = await fetch_page(
+        db.analyses, query, cursor, limit, projection=ANALYSIS_LIST_PROJECTION
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return [AnalysisResponse.from_document(a) for a in analyses]
 
 
 @router.get("/stats")
@@ -105,62 +105,14 @@ async def get_user_stats(current_user: dict = Depends(get_current_user)):
     db = get_database()
     user_id = current_user["user_id"]
     
-    # Get analyses by status
-    status_counts = {}
-    for status_type in ["pending", "processing", "completed", "failed"]:
-        count = await db.analyses.count_documents({
-            "user_id": user_id,
-            "status": status_type
-        })
-        status_counts[status_type] = count
-    
-    # Get analyses over time (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    daily_analyses = await db.analyses.aggregate([
-        {
-            "$match": {
-                "user_id": user_id,
-                "created_at": {"$gte": thirty_days_ago}
-            }
-        },
-        {
-            "$group": {
-                "_id": {
-                    "$dateToString": {
-                        "format": "%Y-%m-%d",
-                        "date": "$created_at"
-                    }
-                },
-                "count": {"$sum": 1}
-            }
-        },
-        {"$sort": {"_id": 1}}
-    ]).to_list(length=30)
-    
-    # Get score distribution
-    score_distribution = await db.analyses.aggregate([
-        {
-            "$match": {
-                "user_id": user_id,
-                "status": "completed",
-                "overall_score": {"$exists": True}
-            }
-        },
-        {
-            "$bucket": {
-                "groupBy": "$overall_score",
-                "boundaries": [0, 20, 40, 60, 80, 100],
-                "default": "Other",
-                "output": {"count": {"$sum": 1}}
-            }
-        }
-    ]).to_list(length=10)
+    stats = await UserStatsService.get_stats(db, user_id)
+    status_counts = {
+        status_type: stats.get("status_counts", {}).get(status_type, 0)
+        for status_type in UserStatsService.STATUSES
+    }
     
     return {
         "status_counts": status_counts,
-        "daily_analyses": [
-            {"date": item["_id"], "count": item["count"]}
-            for item in daily_analyses
-        ],
-        "score_distribution": score_distribution
+        "daily_analyses": UserStatsService.daily_counts(stats, days=30),
+        "score_distribution": UserStatsService.score_distribution(stats)
     }
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, HTTPException, status, Response
 from fastapi.responses import StreamingResponse
-from bson import ObjectId
 import csv
 import io
 import json
 from datetime import datetime
 
 from app.core.database import get_database
+from app.services.analysis_store import AnalysisStore
 
 router = APIRouter()
 
@@ -17,7 +17,10 @@ async def export_csv(analysis_id: str):
     db = get_database()
     
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await AnalysisStore.get(db, analysis_id, [
+            "ux_analysis", "seo_analysis", "performance_analysis", "content_analysis",
+            "priority_recommendations"
+        ])
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -96,7 +99,10 @@ async def export_json(analysis_id: str):
     db = get_database()
     
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await AnalysisStore.get(db, analysis_id, [
+            "ux_analysis", "seo_analysis", "performance_analysis", "content_analysis",
+            "ai_summary", "priority_recommendations", "action_plan"
+        ])
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -146,7 +152,7 @@ async def get_action_plan(analysis_id: str):
     db = get_database()
     
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await AnalysisStore.get(db, analysis_id, ["action_plan"])
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
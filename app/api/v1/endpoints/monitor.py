@@ -0,0 +1,199 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Query
+from typing import Optional
+from datetime import datetime
+from bson import ObjectId
+
+from app.schemas.monitor import MonitorCreate, MonitorUpdate
+from app.services.monitor_service import MonitorService, next_run_at
+from app.core.database import get_database
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.utils.pagination import fetch_page
+
+router = APIRouter()
+
+MONITOR_PROJECTION = {
+    "user_id": 1,
+    "website_url": 1,
+    "cadence_hours": 1,
+    "active": 1,
+    "next_run_at": 1,
+    "last_run_at": 1,
+    "last_analysis_id": 1,
+    "last_overall_score": 1,
+    "baseline.analysis_id": 1,
+    "runs": 1,
+    "regenerations": 1,
+    "failures": 1,
+    "last_error": 1,
+    "created_at": 1
+}
+
+RUN_PROJECTION = {
+    "status": 1,
+    "overall_score": 1,
+    "scores": 1,
+    "reports_regenerated": 1,
+    "pdf_url": 1,
+    "error_message": 1,
+    "created_at": 1,
+    "completed_at": 1
+}
+
+
+def _check_cadence(cadence_hours: float):
+    if cadence_hours < settings.MONITOR_MIN_CADENCE_HOURS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Minimum cadence is {settings.MONITOR_MIN_CADENCE_HOURS} hours"
+        )
+
+
+async def _get_owned_monitor(db, monitor_id: str, current_user: dict, projection: dict) -> dict:
+    """Monitor of the current user, or 404"""
+    monitor = None
+    if ObjectId.is_valid(monitor_id):
+        monitor = await db.monitors.find_one({"_id": ObjectId(monitor_id)}, projection)
+
+    if not monitor or monitor.get("user_id") != current_user["user_id"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Monitor not found"
+        )
+    return monitor
+
+
+def _monitor_payload(monitor: dict) -> dict:
+    monitor["_id"] = str(monitor["_id"])
+    monitor["baseline_analysis_id"] = (monitor.pop("baseline", None) or {}).get("analysis_id")
+    return monitor
+
+
+@router.post("/")
+async def create_monitor(monitor_data: MonitorCreate, current_user: dict = Depends(get_current_user)):
+    """
+    Re-analyze a website on a cadence. AI insights and the PDF are regenerated only when
+    the page content or scores change beyond the configured thresholds.
+
+    - **website_url**: Website to monitor
+    - **cadence_hours**: Hours between runs (jittered so runs are spread out)
+    """
+    db = get_database()
+    website_url = str(monitor_data.website_url)
+    cadence_hours = monitor_data.cadence_hours or settings.MONITOR_DEFAULT_CADENCE_HOURS
+    _check_cadence(cadence_hours)
+
+    if await db.monitors.find_one({"user_id": current_user["user_id"], "website_url": website_url}, {"_id": 1}):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This website is already monitored"
+        )
+
+    if await db.monitors.count_documents({"user_id": current_user["user_id"]}) >= settings.MONITOR_MAX_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {settings.MONITOR_MAX_PER_USER} monitored websites allowed"
+        )
+
+    monitor = await MonitorService().create_monitor(
+        website_url, cadence_hours, current_user["user_id"], current_user.get("plan", "free")
+    )
+    return _monitor_payload({key: value for key, value in monitor.items() if key not in ("domain", "plan")})
+
+
+@router.get("/")
+async def list_monitors(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Monitored websites of the current user, newest first
+
+    - **cursor**: Continuation token from the previous page (X-Next-Cursor)
+    - **limit**: Page size (1-100)
+    """
+    db = get_database()
+    monitors, next_cursor = await fetch_page(
+        db.monitors, {"user_id": current_user["user_id"]}, cursor, limit, projection=MONITOR_PROJECTION
+    )
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return {"monitors": [_monitor_payload(monitor) for monitor in monitors], "next_cursor": next_cursor}
+
+
+@router.get("/{monitor_id}")
+async def get_monitor(monitor_id: str, current_user: dict = Depends(get_current_user)):
+    """Monitor schedule, last result and run counters"""
+    db = get_database()
+    return _monitor_payload(await _get_owned_monitor(db, monitor_id, current_user, MONITOR_PROJECTION))
+
+
+@router.patch("/{monitor_id}")
+async def update_monitor(
+    monitor_id: str,
+    monitor_data: MonitorUpdate,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Change the cadence or pause/resume a monitor
+
+    - **cadence_hours**: New hours between runs (reschedules the next run)
+    - **active**: false pauses, true resumes
+    """
+    db = get_database()
+    monitor = await _get_owned_monitor(db, monitor_id, current_user, MONITOR_PROJECTION)
+
+    update = {}
+    if monitor_data.cadence_hours is not None:
+        _check_cadence(monitor_data.cadence_hours)
+        update["cadence_hours"] = monitor_data.cadence_hours
+        update["next_run_at"] = next_run_at(datetime.utcnow(), monitor_data.cadence_hours, first=True)
+    if monitor_data.active is not None:
+        update["active"] = monitor_data.active
+
+    if update:
+        await db.monitors.update_one({"_id": ObjectId(monitor_id)}, {"$set": update})
+        monitor.update(update)
+    return _monitor_payload(monitor)
+
+
+@router.delete("/{monitor_id}")
+async def delete_monitor(monitor_id: str, current_user: dict = Depends(get_current_user)):
+    """Stop monitoring a website (its past analyses are kept)"""
+    db = get_database()
+    await _get_owned_monitor(db, monitor_id, current_user, {"user_id": 1})
+    await db.monitors.delete_one({"_id": ObjectId(monitor_id)})
+    return {"message": "Monitor deleted successfully"}
+
+
+@router.get("/{monitor_id}/runs")
+async def list_monitor_runs(
+    monitor_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Analyses run by a monitor, newest first, with whether their reports were regenerated
+
+    - **cursor**: Continuation token from the previous page (X-Next-Cursor)
+    - **limit**: Page size (1-100)
+    """
+    db = get_database()
+    await _get_owned_monitor(db, monitor_id, current_user, {"user_id": 1})
+
+    runs, next_cursor = await fetch_page(
+        db.analyses, {"monitor_id": monitor_id}, cursor, limit, projection=RUN_PROJECTION
+    )
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    for run in runs:
+        run["_id"] = str(run["_id"])
+    return {"runs": runs, "next_cursor": next_cursor}
@@ -1,16 +1,39 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from bson import ObjectId
 from datetime import datetime, timedelta
+import asyncio
 import secrets
 from typing import Optional
 
-from app.schemas.analysis import AnalysisDetail
+from app.schemas.analysis import AnalysisDetail, AnalysisResponse, ANALYSIS_LIST_PROJECTION
 from app.core.security import get_current_user
+from app.core.config import settings
 from app.core.database import get_database
+from app.services.share_service import ShareService, share_type
+from app.services.analysis_store import AnalysisStore, SECTIONS
+from app.utils.pagination import fetch_page
 
 router = APIRouter()
 
 
+def _share_response(request: Request, share: dict, body: bytes, etag: Optional[str]) -> Response:
+    """JSON response with caching headers; 304 when the client already has this version"""
+    if etag and not share.get("password_hash"):
+        remaining = int((share["expires_at"] - datetime.utcnow()).total_seconds())
+        max_age = max(0, min(settings.SHARE_RESPONSE_MAX_AGE_SECONDS, remaining))
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+        
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    else:
+        headers = {"Cache-Control": "private, no-cache"}
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # ==================== COMPARISON SHARING ====================
 
 @router.post("/comparison/{comparison_id}/share")
@@ -55,8 +78,8 @@ async def create_comparison_share_link(
     # Hash password if provided
     password_hash = None
     if password:
-        from app.core.security import get_password_hash
-        password_hash = get_password_hash(password)
+        from app.core.security import get_password_hash_async
+        password_hash = await get_password_hash_async(password)
     
     # Create share record
     share_data = {
@@ -77,6 +100,8 @@ async def create_comparison_share_link(
         {"_id": ObjectId(comparison_id)},
         {"$set": {"is_shared": True, "last_shared_at": datetime.utcnow()}}
     )
+    # Rendered responses of its other links still show the old share fields
+    await ShareService.purge(db, comparison_id=comparison_id)
     
     share_url = f"/share/comparison/{share_token}"
     full_url = f"http://localhost:8000{share_url}"  # Update with your domain
@@ -93,7 +118,7 @@ async def create_comparison_share_link(
 
 
 @router.get("/comparison/{share_token}")
-async def get_shared_comparison(share_token: str, password: Optional[str] = None):
+async def get_shared_comparison(request: Request, share_token: str, password: Optional[str] = None):
     """
     Get comparison via share link
     
@@ -102,13 +127,10 @@ async def get_shared_comparison(share_token: str, password: Optional[str] = None
     """
     db = get_database()
     
-    # Find share record
-    share = await db.shares.find_one({
-        "share_token": share_token,
-        "type": "comparison"
-    })
+    # Find share record (cached)
+    share = await ShareService.resolve(db, share_token)
     
-    if not share:
+    if not share or share.get("type") != "comparison":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Share link not found"
@@ -136,12 +158,18 @@ async def get_shared_comparison(share_token: str, password: Optional[str] = None
                 detail="Password required"
             )
         
-        from app.core.security import verify_password
-        if not verify_password(password, share['password_hash']):
+        from app.core.security import verify_password_async
+        if not await verify_password_async(password, share['password_hash']):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password"
             )
+    else:
+        # Public link: serve the rendered response if we have it
+        cached = await ShareService.get_cached_response(share_token, "comparison")
+        if cached:
+            await ShareService.record_view(share_token)
+            return _share_response(request, share, cached["body"].encode(), cached["etag"])
     
     # Get comparison
     comparison_id = share.get('comparison_id')
@@ -159,19 +187,20 @@ async def get_shared_comparison(share_token: str, password: Optional[str] = None
             detail="Comparison not found"
         )
     
-    # Increment view count
-    await db.shares.update_one(
-        {"share_token": share_token},
-        {
-            "$inc": {"view_count": 1},
-            "$set": {"last_viewed_at": datetime.utcnow()}
-        }
-    )
+    # Increment view count (buffered, flushed in bulk)
+    await ShareService.record_view(share_token)
     
     # Convert ObjectId to string
     comparison["_id"] = str(comparison["_id"])
     
-    return comparison
+    body = JSONResponse(content=jsonable_encoder(comparison)).body
+    etag = None
+    if comparison.get("status") == "completed":
+        etag = ShareService.etag_for(share_token, str(comparison.get("completed_at")), body)
+        if not share.get("password_hash"):
+            await ShareService.cache_response(share_token, share, etag, body)
+    
+    return _share_response(request, share, body, etag)
 
 
 @router.delete("/comparison/{share_token}")
@@ -199,6 +228,8 @@ async def revoke_comparison_share_link(share_token: str):
         {"share_token": share_token},
         {"$set": {"is_active": False, "revoked_at": datetime.utcnow()}}
     )
+    await ShareService.invalidate(share_token)
+    await ShareService.purge(db, comparison_id=share.get("comparison_id"))
     
     return {"message": "Share link revoked successfully"}
 
@@ -216,7 +247,7 @@ async def create_share_link(
     db = get_database()
     
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)}, {"user_id": 1})
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -270,14 +301,15 @@ async def create_share_link(
 
 
 @router.get("/{share_token}")
-async def get_shared_analysis(share_token: str):
+async def get_shared_analysis(request: Request, share_token: str):
     """Get analysis via share link"""
     db = get_database()
     
-    # Find share record
-    share = await db.shares.find_one({"share_token": share_token})
+    # Find share record (cached)
+    share = await ShareService.resolve(db, share_token)
     
-    if not share:
+    # Comparison links are served by /comparison/{share_token} only
+    if not share or share_type(share) != "analysis":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Share link not found"
@@ -297,10 +329,16 @@ async def get_shared_analysis(share_token: str):
             detail="Share link has been deactivated"
         )
     
+    # Serve the rendered response if we have it
+    cached = await ShareService.get_cached_response(share_token, "analysis")
+    if cached:
+        await ShareService.record_view(share_token)
+        return _share_response(request, share, cached["body"].encode(), cached["etag"])
+    
     # Get analysis
     analysis_id = share.get('analysis_id')
     try:
-        analysis = await db.analyses.find_one({"_id": ObjectId(analysis_id)})
+        analysis = await AnalysisStore.get(db, analysis_id, SECTIONS)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -313,13 +351,10 @@ async def get_shared_analysis(share_token: str):
             detail="Analysis not found"
         )
     
-    # Increment view count
-    await db.shares.update_one(
-        {"share_token": share_token},
-        {"$inc": {"view_count": 1}}
-    )
+    # Increment view count (buffered, flushed in bulk)
+    await ShareService.record_view(share_token)
     
-    return AnalysisDetail(
+    detail = AnalysisDetail(
         id=str(analysis["_id"]),
         website_url=analysis["website_url"],
         status=analysis["status"],
@@ -338,6 +373,14 @@ async def get_shared_analysis(share_token: str):
         created_at=analysis["created_at"],
         completed_at=analysis.get("completed_at")
     )
+    
+    body = JSONResponse(content=jsonable_encoder(detail)).body
+    etag = None
+    if analysis["status"] == "completed":
+        etag = ShareService.etag_for(share_token, str(analysis.get("completed_at")), body)
+        await ShareService.cache_response(share_token, share, etag, body)
+    
+    return _share_response(request, share, body, etag)
 
 
 @router.delete("/{share_token}")
@@ -368,6 +411,7 @@ async def revoke_share_link(
         {"share_token": share_token},
         {"$set": {"is_active": False, "revoked_at": datetime.utcnow()}}
     )
+    await ShareService.invalidate(share_token)
     
     return {"message": "Share link revoked successfully"}
 
@@ -375,14 +419,35 @@ async def revoke_share_link(
 @router.get("/{analysis_id}/shares")
 async def list_share_links(
     analysis_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: Optional[dict] = Depends(get_current_user)
 ):
-    """List all share links for an analysis"""
+    """List share links for an analysis, newest first"""
     db = get_database()
     
-    shares = await db.shares.find({"analysis_id": analysis_id}).to_list(length=100)
+    try:
+        analysis_object_id = ObjectId(analysis_id)
+    except:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid analysis ID"
+        )
+    
+    analysis, (shares, next_cursor) = await asyncio.gather(
+        db.analyses.find_one({"_id": analysis_object_id}, ANALYSIS_LIST_PROJECTION),
+        fetch_page(
+            db.shares,
+            {"analysis_id": analysis_id},
+            cursor,
+            limit,
+            projection={"share_token": 1, "created_at": 1, "expires_at": 1, "view_count": 1, "is_active": 1}
+        )
+    )
     
     return {
+        "next_cursor": next_cursor,
+        "analysis": AnalysisResponse.from_document(analysis) if analysis else None,
         "shares": [
             {
                 "share_token": share["share_token"],
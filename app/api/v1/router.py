@@ -1,11 +1,16 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, analysis, dashboard, export, share, comparison, subscription
+from app.api.v1.endpoints import (
+    auth, analysis, dashboard, export, share, comparison, subscription, benchmark, batch, monitor
+)
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
 api_router.include_router(comparison.router, prefix="/comparisons", tags=["Competitor Analysis"])
+api_router.include_router(benchmark.router, prefix="/benchmarks", tags=["Competitor Analysis"])
+api_router.include_router(batch.router, prefix="/batches", tags=["Batch Analysis"])
+api_router.include_router(monitor.router, prefix="/monitors", tags=["Monitoring"])
 api_router.include_router(subscription.router, prefix="/subscription", tags=["Subscription"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 api_router.include_router(export.router, prefix="/export", tags=["Export"])
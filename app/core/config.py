@@ -19,6 +19,99 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str
     MONGODB_DB_NAME: str = "website_analyzer"
+    MONGO_ENSURE_INDEXES: bool = True
+    MONGO_INDEX_VERIFY: str = "warn"  # off, warn or fail when a hot query plan is a COLLSCAN
+    
+    # Stored analysis results (zlib with a preset dictionary of analyzer messages)
+    RESULT_COMPRESSION_ENABLED: bool = True
+    RESULT_COMPRESSION_LEVEL: int = 6
+    RESULT_COMPRESSION_DICTIONARY: int = 1
+    
+    # Bulk writes and write-behind queue for low-priority writes (view counters, score sketches)
+    WRITE_BATCH_MAX_SIZE: int = 500
+    WRITE_BEHIND_ENABLED: bool = True
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 1.0
+    
+    # Share links: cached token resolution and view counters buffered in Redis
+    SHARE_CACHE_TTL_SECONDS: int = 300
+    SHARE_VIEW_FLUSH_INTERVAL_SECONDS: float = 10.0
+    SHARE_RESPONSE_CACHE_TTL_SECONDS: int = 3600  # Rendered shared responses in Redis
+    SHARE_RESPONSE_MAX_AGE_SECONDS: int = 60  # Cache-Control max-age for browsers/CDNs
+    
+    # Comparisons reuse completed analyses of the same URL up to this age (0 disables)
+    COMPARISON_REUSE_MAX_AGE_HOURS: int = 24
+    # Per-site time budget; failing analyzers are retried on their own within it
+    COMPARISON_SITE_BUDGET_SECONDS: float = 120.0
+    COMPARISON_ANALYZER_TIMEOUT_SECONDS: float = 45.0
+    COMPARISON_ANALYZER_RETRIES: int = 2
+    COMPARISON_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    
+    # Analyzers: extra modules registering analyzers/stages (comma-separated), and the
+    # thread pools running CPU-bound stages (parsing) and blocking I/O stages (TLS probes)
+    ANALYZER_PLUGINS: str = ""
+    ANALYZER_CPU_WORKERS: int = 4
+    ANALYZER_IO_WORKERS: int = 8
+    
+    # Analysis profiles: quota units consumed per analysis (plan limits count standard
+    # analyses), and the quick profile's budget (headers and the start of the page only)
+    PROFILE_COST_QUICK: int = 1
+    PROFILE_COST_STANDARD: int = 5
+    PROFILE_COST_DEEP: int = 10
+    PROFILE_QUICK_MAX_KB: int = 128
+    PROFILE_QUICK_TIMEOUT_SECONDS: float = 0.8
+    # Broken link check run by the deep profile
+    LINK_CHECK_MAX_LINKS: int = 50
+    LINK_CHECK_CONCURRENCY: int = 10
+    LINK_CHECK_TIMEOUT_SECONDS: float = 10.0
+    # Headless Chromium (Playwright) page load, run only when an analyzer asks for it
+    RENDERED_TIMEOUT_SECONDS: float = 20.0
+    RENDERED_MIN_SECONDS: float = 5.0  # Less time left: no browser is started
+    
+    # Analysis job scheduling: slots shared by every analysis in this process, handed out
+    # by weighted fair queuing over plans, with per-user in-flight caps by plan
+    ANALYSIS_CONCURRENCY: int = 8
+    SCHEDULER_WEIGHT_FREE: float = 1.0
+    SCHEDULER_WEIGHT_BASIC: float = 2.0
+    SCHEDULER_WEIGHT_PRO: float = 4.0
+    SCHEDULER_WEIGHT_ENTERPRISE: float = 8.0
+    SCHEDULER_USER_IN_FLIGHT_FREE: int = 1
+    SCHEDULER_USER_IN_FLIGHT_BASIC: int = 2
+    SCHEDULER_USER_IN_FLIGHT_PRO: int = 4
+    SCHEDULER_USER_IN_FLIGHT_ENTERPRISE: int = 8
+    SCHEDULER_STARVATION_SECONDS: float = 60.0  # Jobs waiting this long go ahead of fair order
+    SCHEDULER_METRICS_WINDOW_SECONDS: int = 300
+    
+    # Benchmarks against large competitor sets
+    BENCHMARK_MAX_COMPETITORS: int = 500
+    BENCHMARK_CONCURRENCY: int = 10  # Sites crawled at once per benchmark
+    BENCHMARK_PROGRESS_INTERVAL_SECONDS: float = 2.0  # How often finished sites and standings are stored
+    BENCHMARK_STREAM_POLL_SECONDS: float = 1.0
+    BENCHMARK_LEADERBOARD_SIZE: int = 10
+    
+    # Batch analyses (caps are shared by all batches running in a process)
+    BATCH_MAX_URLS: int = 1000
+    BATCH_GLOBAL_CONCURRENCY: int = 8
+    BATCH_PER_HOST_CONCURRENCY: int = 2
+    BATCH_STREAM_POLL_SECONDS: float = 1.0
+    BATCH_THROUGHPUT_WINDOW_SECONDS: int = 300
+    
+    # Scheduled re-analysis (monitoring)
+    MONITOR_ENABLED: bool = True
+    MONITOR_POLL_SECONDS: float = 60.0
+    MONITOR_CONCURRENCY: int = 4  # Monitor runs at once per process
+    MONITOR_LEASE_SECONDS: int = 1800  # A claimed run lost with its process is retried after this
+    MONITOR_DEFAULT_CADENCE_HOURS: float = 24.0
+    MONITOR_MIN_CADENCE_HOURS: float = 1.0
+    MONITOR_JITTER: float = 0.1  # Fraction of the cadence runs are spread by
+    MONITOR_MAX_PER_USER: int = 50
+    # Reports are regenerated only past these changes from the last regenerated run
+    MONITOR_SCORE_THRESHOLD: float = 5.0  # Points, overall or any analyzer
+    MONITOR_FINGERPRINT_THRESHOLD: int = 3  # Differing bits of the 64-bit content SimHash
+    
+    # Industry score percentiles (fixed-bucket histograms per segment)
+    PERCENTILE_SEGMENTS: str = "tld"  # Extra segments besides "all": tld, plan (comma-separated)
+    PERCENTILE_MIN_SAMPLES: int = 20  # Segments with fewer analyses report no percentiles
+    PERCENTILE_CACHE_TTL_SECONDS: int = 60
     
     # Redis
     REDIS_HOST: str = "localhost"
@@ -33,11 +126,27 @@ class Settings(BaseSettings):
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    LOGIN_CONCURRENCY: int = 16
+    LOGIN_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    
+    # User cache
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 10000
+    
     # Google Gemini
     GOOGLE_API_KEY: str
     GEMINI_MODEL: str = "gemini-2.0-flash-exp"
     GEMINI_TEMPERATURE: float = 0.7
     GEMINI_MAX_TOKENS: int = 8192
+    # Priority recommendations are rule-based unless enabled (one more Gemini call per analysis)
+    AI_PRIORITY_RECOMMENDATIONS: bool = False
+    
+    # Analysis chat
+    CHAT_RECENT_MESSAGES: int = 6  # Verbatim turns sent with each question
+    CHAT_SUMMARY_BATCH: int = 10  # Older messages folded into the rolling summary at once
     
     # Google Drive
     GOOGLE_DRIVE_CREDENTIALS_FILE: str = "service-account-key.json"
@@ -48,10 +157,26 @@ class Settings(BaseSettings):
     RATE_LIMIT_BASIC_USER: int = 10
     RATE_LIMIT_PRO_USER: int = 100
     RATE_LIMIT_ENTERPRISE_USER: int = 1000
-    RATE_LIMIT_WINDOW_HOURS: int = 24
+    RATE_LIMIT_WINDOW_DAYS: int = 30  # Plan quota period (Redis window and Mongo reset alike)
+    
+    # Per-route request limits (shared across workers through Redis)
+    RATE_LIMIT_STORAGE_URL: str = ""  # Defaults to REDIS_URL
+    RATE_LIMIT_STORAGE_MAX_CONNECTIONS: int = 20
+    RATE_LIMIT_ANALYZE: str = "10/minute"
+    RATE_LIMIT_COMPARISON: str = "5/minute"
+    RATE_LIMIT_CHAT: str = "30/minute"
+    RATE_LIMIT_PDF: str = "20/minute"
     
     # Analysis
-    MAX_ANALYSIS_TIME_SECONDS: int = 300
+    MAX_ANALYSIS_TIME_SECONDS: int = 300  # Time budget of every analysis (fetch, analyzers, AI, PDF)
+    BUDGET_FETCH_TIMEOUT_SECONDS: float = 30.0
+    BUDGET_PROBE_TIMEOUT_SECONDS: float = 10.0  # TLS handshake, image and link probes
+    # Below this much time left, probes are cut to BUDGET_REDUCED_PROBES images/links
+    BUDGET_LOW_SECONDS: float = 60.0
+    BUDGET_REDUCED_PROBES: int = 5
+    # Time needed for LLM insights (else rule-based) and for the PDF (else made on download)
+    BUDGET_AI_RESERVE_SECONDS: float = 30.0
+    BUDGET_PDF_RESERVE_SECONDS: float = 10.0
     SCREENSHOT_WIDTH: int = 1920
     SCREENSHOT_HEIGHT: int = 1080
     LIGHTHOUSE_TIMEOUT: int = 60
@@ -1,5 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.indexes import bootstrap_indexes
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -12,6 +13,7 @@ async def connect_to_mongo():
     db.client = AsyncIOMotorClient(settings.MONGODB_URL)
     db.db = db.client[settings.MONGODB_DB_NAME]
     print(f"Connected to MongoDB: {settings.MONGODB_DB_NAME}")
+    await bootstrap_indexes(db.db)
 
 async def close_mongo_connection():
     """Close MongoDB connection"""
@@ -0,0 +1,284 @@
+from datetime import datetime
+from typing import Dict, List
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+
+
+# Indexes for every query shape the application issues, per collection
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "analyses": [
+        # Dashboard history (keyset pagination), recent analyses and daily stats
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_id"
+        ),
+        # History filtered by status, per-status counts and score aggregations
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_status_created_id"
+        ),
+        # History filtered by domain
+        IndexModel(
+            [("user_id", ASCENDING), ("domain", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_domain_created_id"
+        ),
+        # Latest completed analysis of a URL, reused by comparisons
+        IndexModel(
+            [("website_url", ASCENDING), ("status", ASCENDING), ("completed_at", DESCENDING)],
+            name="url_status_completed"
+        ),
+        # Analyses of a batch: scheduling and results in order, result stream by completion
+        IndexModel(
+            [("batch_id", ASCENDING), ("_id", ASCENDING)],
+            name="batch_id",
+            partialFilterExpression={"batch_id": {"$exists": True}}
+        ),
+        IndexModel(
+            [("batch_id", ASCENDING), ("completed_at", ASCENDING)],
+            name="batch_completed",
+            partialFilterExpression={"batch_id": {"$exists": True}}
+        ),
+        # Runs of a monitor, newest first
+        IndexModel(
+            [("monitor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="monitor_created_id",
+            partialFilterExpression={"monitor_id": {"$exists": True}}
+        ),
+    ],
+    "monitors": [
+        # Due monitors, most overdue first (scheduler claim)
+        IndexModel([("active", ASCENDING), ("next_run_at", ASCENDING)], name="active_next_run"),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_id"
+        ),
+        IndexModel([("user_id", ASCENDING), ("website_url", ASCENDING)], name="user_url"),
+    ],
+    "analysis_batches": [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_id"
+        ),
+    ],
+    "shares": [
+        IndexModel([("share_token", ASCENDING)], unique=True, name="share_token_unique"),
+        # Share links of an analysis, newest first
+        IndexModel(
+            [("analysis_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="analysis_created_id"
+        ),
+    ],
+    "comparisons": [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_id"
+        ),
+    ],
+    "benchmark_sites": [
+        # Sites of a benchmark, newest first (pagination)
+        IndexModel(
+            [("benchmark_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="benchmark_created_id"
+        ),
+        # Sites finished after a given one (result stream)
+        IndexModel([("benchmark_id", ASCENDING), ("_id", ASCENDING)], name="benchmark_id"),
+    ],
+    "chat_messages": [
+        IndexModel([("analysis_id", ASCENDING), ("created_at", ASCENDING)], name="analysis_created"),
+    ],
+    "subscriptions": [
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING)], name="user_status"),
+        # Scheduled trial and grace-period expiry sweeps
+        IndexModel([("status", ASCENDING), ("trial_end_date", ASCENDING)], name="status_trial_end"),
+        IndexModel([("status", ASCENDING), ("end_date", ASCENDING)], name="status_end"),
+    ],
+    "billing_history": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    ],
+}
+
+
+# Representative hot queries whose plans are checked at startup
+_SAMPLE_ID = "000000000000000000000000"
+HOT_QUERIES: List[Dict] = [
+    {
+        "name": "dashboard analyses history",
+        "collection": "analyses",
+        "filter": {"user_id": _SAMPLE_ID},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "analyses by status",
+        "collection": "analyses",
+        "filter": {"user_id": _SAMPLE_ID, "status": "completed"},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "analyses by domain",
+        "collection": "analyses",
+        "filter": {"user_id": _SAMPLE_ID, "domain": "example.com"},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "reusable analysis of url",
+        "collection": "analyses",
+        "filter": {"website_url": "https://example.com/", "status": "completed"},
+        "sort": {"completed_at": -1},
+    },
+    {
+        "name": "batch analyses",
+        "collection": "analyses",
+        "filter": {"batch_id": _SAMPLE_ID, "status": "pending"},
+        "sort": {"_id": 1},
+    },
+    {
+        "name": "batch result stream",
+        "collection": "analyses",
+        "filter": {"batch_id": _SAMPLE_ID, "completed_at": {"$gte": datetime(2024, 1, 1)}},
+        "sort": {"completed_at": 1},
+    },
+    {
+        "name": "batch history",
+        "collection": "analysis_batches",
+        "filter": {"user_id": _SAMPLE_ID},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "due monitors",
+        "collection": "monitors",
+        "filter": {"active": True, "next_run_at": {"$lte": datetime(2024, 1, 1)}},
+        "sort": {"next_run_at": 1},
+    },
+    {
+        "name": "monitor runs",
+        "collection": "analyses",
+        "filter": {"monitor_id": _SAMPLE_ID},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "share lookup",
+        "collection": "shares",
+        "filter": {"share_token": "sample"},
+    },
+    {
+        "name": "share links of analysis",
+        "collection": "shares",
+        "filter": {"analysis_id": _SAMPLE_ID},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "comparison history",
+        "collection": "comparisons",
+        "filter": {"user_id": _SAMPLE_ID},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "benchmark sites",
+        "collection": "benchmark_sites",
+        "filter": {"benchmark_id": _SAMPLE_ID},
+        "sort": {"created_at": -1, "_id": -1},
+    },
+    {
+        "name": "benchmark result stream",
+        "collection": "benchmark_sites",
+        "filter": {"benchmark_id": _SAMPLE_ID, "_id": {"$gt": ObjectId(_SAMPLE_ID)}},
+        "sort": {"_id": 1},
+    },
+    {
+        "name": "chat history",
+        "collection": "chat_messages",
+        "filter": {"analysis_id": _SAMPLE_ID},
+        "sort": {"created_at": 1},
+    },
+    {
+        "name": "login by email",
+        "collection": "users",
+        "filter": {"email": "sample@example.com"},
+    },
+    {
+        "name": "active subscription",
+        "collection": "subscriptions",
+        "filter": {"user_id": _SAMPLE_ID, "status": {"$in": ["trial", "active", "grace_period"]}},
+    },
+    {
+        "name": "expired trials",
+        "collection": "subscriptions",
+        "filter": {"status": "trial", "trial_end_date": {"$lt": datetime(2000, 1, 1)}},
+    },
+    {
+        "name": "billing history",
+        "collection": "billing_history",
+        "filter": {"user_id": _SAMPLE_ID},
+        "sort": {"created_at": -1},
+    },
+]
+
+
+async def ensure_indexes(database):
+    """Create any missing indexes (no-op for indexes that already exist)"""
+    for collection, indexes in INDEXES.items():
+        try:
+            names = await database[collection].create_indexes(indexes)
+            print(f"Indexes ready on {collection}: {', '.join(names)}")
+        except OperationFailure as e:
+            # e.g. duplicate keys blocking a unique index - keep serving, but make it visible
+            print(f"⚠️ Failed to create indexes on {collection}: {e}")
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """Collect every stage name in a query plan tree"""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return [stage for stage in stages if stage]
+
+
+async def verify_query_plans(database) -> List[str]:
+    """
+    Explain every registered hot query and report the ones that scan a whole collection.
+    Returns the names of the offending queries.
+    """
+    collection_scans = []
+
+    for query in HOT_QUERIES:
+        find = {"find": query["collection"], "filter": query["filter"]}
+        if query.get("sort"):
+            find["sort"] = query["sort"]
+
+        try:
+            explain = await database.command({"explain": find, "verbosity": "queryPlanner"})
+        except OperationFailure as e:
+            print(f"⚠️ Could not explain hot query '{query['name']}': {e}")
+            continue
+
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            collection_scans.append(query["name"])
+            print(f"⚠️ Hot query '{query['name']}' on {query['collection']} uses a COLLSCAN")
+
+    return collection_scans
+
+
+async def bootstrap_indexes(database):
+    """Startup stage: ensure indexes, then verify the hot query plans"""
+    if settings.MONGO_ENSURE_INDEXES:
+        await ensure_indexes(database)
+
+    mode = settings.MONGO_INDEX_VERIFY.lower()
+    if mode == "off":
+        return
+
+    collection_scans = await verify_query_plans(database)
+    if collection_scans and mode == "fail":
+        raise RuntimeError(
+            f"Hot queries without a usable index: {', '.join(collection_scans)}"
+        )
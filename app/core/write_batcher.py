@@ -0,0 +1,92 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.database import get_database
+
+
+async def bulk_write(collection, operations: List, batch_size: Optional[int] = None) -> int:
+    """
+    Run operations as unordered bulk writes, in chunks of `batch_size`.
+    A failing operation does not stop the others. Returns the number of operations sent.
+    """
+    batch_size = batch_size or settings.WRITE_BATCH_MAX_SIZE
+    for start in range(0, len(operations), batch_size):
+        chunk = operations[start:start + batch_size]
+        try:
+            await collection.bulk_write(chunk, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            print(f"⚠️ {len(errors)} of {len(chunk)} writes to {collection.name} failed: {errors[:1]}")
+    return len(operations)
+
+
+class WriteBehindQueue:
+    """Buffers low-priority writes and flushes them in bulk, by size or interval"""
+
+    def __init__(self):
+        self._pending: Dict[str, List] = defaultdict(list)
+        self._size = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start the background flusher (no-op when write-behind is disabled)"""
+        if settings.WRITE_BEHIND_ENABLED and not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def enqueue(self, collection: str, operations: List):
+        """Queue write operations; written immediately when the queue is not running"""
+        if not self.running:
+            await bulk_write(get_database()[collection], operations)
+            return
+
+        self._pending[collection].extend(operations)
+        self._size += len(operations)
+        if self._size >= settings.WRITE_BATCH_MAX_SIZE:
+            self._wakeup.set()
+
+    async def insert_many(self, collection: str, documents: List[Dict]):
+        await self.enqueue(collection, [InsertOne(document) for document in documents])
+
+    async def flush(self):
+        """Write every buffered operation, one unordered bulk write per collection"""
+        pending, self._pending, self._size = self._pending, defaultdict(list), 0
+        database = get_database()
+        for collection, operations in pending.items():
+            try:
+                await bulk_write(database[collection], operations)
+            except Exception as e:
+                # Low-priority data: report and drop rather than grow without bound
+                print(f"⚠️ Dropped {len(operations)} buffered writes to {collection}: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._size:
+                await self.flush()
+
+
+write_behind = WriteBehindQueue()
@@ -3,16 +3,17 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.redis import redis_client
+from app.core.write_batcher import write_behind
+from app.services.share_service import share_view_flusher
+from app.services.monitor_service import monitor_scheduler
 from app.api.v1.router import api_router
-
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+from app.utils.rate_limiter import limiter
 
 # Create FastAPI app
 app = FastAPI(
@@ -46,10 +47,18 @@ templates = Jinja2Templates(directory="app/templates")
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
+    await redis_client.connect()
+    await write_behind.start()
+    await share_view_flusher.start()
+    await monitor_scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await monitor_scheduler.stop()
+    await share_view_flusher.stop()
+    await write_behind.stop()
     await close_mongo_connection()
+    await redis_client.close()
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
@@ -99,9 +108,11 @@ async def comparison_results_page(request: Request, comparison_id: str):
 @app.get("/share/{share_token}", response_class=HTMLResponse)
 async def shared_analysis_page(request: Request, share_token: str):
     """Render shared analysis page"""
+    # The page shell is the same for every link; data comes from the cacheable share API
     return templates.TemplateResponse(
         "pages/shared_analysis.html",
-        {"request": request, "share_token": share_token}
+        {"request": request, "share_token": share_token},
+        headers={"Cache-Control": f"public, max-age={settings.SHARE_RESPONSE_MAX_AGE_SECONDS}"}
     )
 
 @app.get("/share/comparison/{share_token}", response_class=HTMLResponse)
@@ -109,7 +120,8 @@ async def shared_comparison_page(request: Request, share_token: str):
     """Shared comparison page"""
     return templates.TemplateResponse(
         "pages/shared_comparison.html",
-        {"request": request, "share_token": share_token}
+        {"request": request, "share_token": share_token},
+        headers={"Cache-Control": f"public, max-age={settings.SHARE_RESPONSE_MAX_AGE_SECONDS}"}
     )
 
 @app.get("/profile", response_class=HTMLResponse)
@@ -168,4 +180,12 @@ async def api_health_check():
         health_status["services"]["redis"] = f"unhealthy: {str(e)}"
         health_status["status"] = "degraded"
     
+    # Batch analysis throughput of this process
+    from app.services.batch_service import batch_scheduler
+    health_status["batches"] = batch_scheduler.metrics()
+    
+    # Analysis queue depth and wait times per plan (autoscaling signal)
+    from app.services.job_scheduler import analysis_scheduler
+    health_status["analysis_queue"] = analysis_scheduler.metrics()
+    
     return health_status
@@ -5,6 +5,21 @@ from datetime import datetime
 
 class AnalysisCreate(BaseModel):
     website_url: HttpUrl
+    # quick (headers and the start of the page, no AI or PDF), standard or deep (adds a
+    # broken link check); each consumes plan quota by its cost
+    profile: str = "standard"
+    # Subset of the profile's analyzers to run, by key ("seo", "performance", ...); all of them when omitted
+    analyzers: Optional[List[str]] = None
+
+
+# Fields needed to list an analysis without loading its results
+ANALYSIS_LIST_PROJECTION = {
+    "website_url": 1,
+    "status": 1,
+    "overall_score": 1,
+    "created_at": 1,
+    "completed_at": 1
+}
 
 
 class AnalysisResponse(BaseModel):
@@ -14,6 +29,18 @@ class AnalysisResponse(BaseModel):
     overall_score: Optional[float]
     created_at: datetime
     completed_at: Optional[datetime]
+    
+    @classmethod
+    def from_document(cls, analysis: Dict) -> "AnalysisResponse":
+        """Build the list representation from a document read with ANALYSIS_LIST_PROJECTION"""
+        return cls(
+            id=str(analysis["_id"]),
+            website_url=analysis["website_url"],
+            status=analysis["status"],
+            overall_score=analysis.get("overall_score"),
+            created_at=analysis["created_at"],
+            completed_at=analysis.get("completed_at")
+        )
 
 
 class AnalysisDetail(BaseModel):
@@ -32,6 +59,13 @@ class AnalysisDetail(BaseModel):
     action_plan: Optional[Dict]
     screenshot_url: Optional[str]
     pdf_url: Optional[str]
+    percentiles: Optional[Dict] = None
+    profile: Optional[str] = None
+    analyzers: Optional[List[str]] = None
+    # Optional work downgraded to fit the analysis time budget
+    degraded: Optional[List[str]] = None
+    # Results of analyzers registered by plugins, by section
+    additional_analyses: Optional[Dict[str, Dict]] = None
     created_at: datetime
     completed_at: Optional[datetime]
 
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class BatchCreateRequest(BaseModel):
+    """Request to analyze many websites as one batch"""
+    urls: List[str]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "urls": [
+                    "https://example.com",
+                    "https://example.org/pricing",
+                    "https://example.net"
+                ]
+            }
+        }
+
+
+class BatchResponse(BaseModel):
+    """Response after creating a batch"""
+    batch_id: str
+    status: str
+    total: int
+    rejected: List[str]
+    message: str
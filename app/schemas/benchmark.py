@@ -0,0 +1,27 @@
+from pydantic import BaseModel, HttpUrl
+from typing import List
+
+
+class BenchmarkCreateRequest(BaseModel):
+    """Request to benchmark a website against many competitors"""
+    your_url: HttpUrl
+    competitor_urls: List[HttpUrl]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "your_url": "https://example.com",
+                "competitor_urls": [
+                    "https://competitor1.com",
+                    "https://competitor2.com",
+                    "https://competitor3.com"
+                ]
+            }
+        }
+
+
+class BenchmarkResponse(BaseModel):
+    """Response after creating a benchmark"""
+    benchmark_id: str
+    status: str
+    message: str
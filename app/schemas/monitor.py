@@ -0,0 +1,22 @@
+from pydantic import BaseModel, HttpUrl
+from typing import Optional
+
+
+class MonitorCreate(BaseModel):
+    """Request to re-analyze a website on a cadence"""
+    website_url: HttpUrl
+    cadence_hours: Optional[float] = None  # Defaults to MONITOR_DEFAULT_CADENCE_HOURS
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "website_url": "https://example.com",
+                "cadence_hours": 24
+            }
+        }
+
+
+class MonitorUpdate(BaseModel):
+    """Change the cadence of a monitor or pause it"""
+    cadence_hours: Optional[float] = None
+    active: Optional[bool] = None
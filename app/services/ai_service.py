@@ -1,8 +1,11 @@
 import google.generativeai as genai
-from typing import List, Dict
+from typing import AsyncIterator, Callable, List, Dict, Optional
 import time
 import asyncio
+import json
 from app.core.config import settings
+from app.analyzers.registry import ANALYZERS, analyzer_sections
+from app.utils.budget import Budget
 
 # Configure Gemini
 genai.configure(api_key=settings.GOOGLE_API_KEY)
@@ -14,26 +17,54 @@ class AIService:
         self.max_retries = 3
         self.base_delay = 2
     
-    async def _generate_with_retry(self, prompt: str) -> str:
-        """Generate content with retry logic for rate limits"""
+    async def _generate_with_retry(self, prompt: str, use_fallback: bool = True, budget: Optional[Budget] = None,
+                                   fallback: Optional[Callable[[], str]] = None) -> str:
+        """
+        Generate content with retry logic for rate limits.
+        With a `budget`, the call runs off the event loop and gives up (returning
+        `fallback()`) once the time left before the PDF reserve is spent; it is not
+        attempted with less than BUDGET_AI_RESERVE_SECONDS left.
+        """
+        fallback = fallback or self._get_fallback_response
+        if budget is not None and not budget.allows(settings.BUDGET_AI_RESERVE_SECONDS):
+            budget.degrade("rule-based AI insights")
+            return fallback()
+        
         for attempt in range(self.max_retries):
             try:
-                response = self.model.generate_content(prompt)
+                if budget is None:
+                    response = self.model.generate_content(prompt)
+                else:
+                    response = await asyncio.wait_for(
+                        asyncio.to_thread(self.model.generate_content, prompt),
+                        timeout=budget.timeout(reserve=settings.BUDGET_PDF_RESERVE_SECONDS)
+                    )
                 return response.text
+            except asyncio.TimeoutError:
+                if budget is None:
+                    raise
+                print("⏳ AI generation ran out of analysis time budget. Using fallback response.")
+                budget.degrade("rule-based AI insights")
+                return fallback()
             except Exception as e:
                 error_msg = str(e)
                 
                 # Check if it's a quota/rate limit error
                 if "429" in error_msg or "quota" in error_msg.lower() or "rate" in error_msg.lower():
+                    delay = self.base_delay * (2 ** attempt)
+                    if budget is not None and not budget.allows(delay + settings.BUDGET_AI_RESERVE_SECONDS):
+                        budget.degrade("rule-based AI insights")
+                        return fallback()
                     if attempt < self.max_retries - 1:
                         # Exponential backoff
-                        delay = self.base_delay * (2 ** attempt)
                         print(f"⏳ Rate limit hit, retrying in {delay} seconds... (attempt {attempt + 1}/{self.max_retries})")
                         await asyncio.sleep(delay)
                         continue
+                    elif use_fallback:
+                        print("❌ Max retries reached. Using fallback response.")
+                        return fallback()
                     else:
-                        print(f"❌ Max retries reached. Using fallback response.")
-                        return self._get_fallback_response()
+                        raise
                 else:
                     # For other errors, raise immediately
                     raise
@@ -115,7 +146,67 @@ Please review the detailed analysis sections for specific recommendations tailor
 
 Please try asking your question again in a moment for a more detailed AI-powered response, or review the detailed analysis sections above."""
     
-    async def generate_analysis_summary(self, analysis_data: Dict) -> str:
+    def _findings(self, analysis_data: Dict) -> List[Dict]:
+        """Analyzer sections present in the analysis, weakest first"""
+        findings = []
+        for section in analyzer_sections():
+            data = analysis_data.get(section)
+            if isinstance(data, dict):
+                findings.append({
+                    "name": ANALYZERS[section].name,
+                    "score": data.get("score", 0) or 0,
+                    "issues": data.get("issues", []),
+                    "recommendations": data.get("recommendations", [])
+                })
+        return sorted(findings, key=lambda finding: finding["score"])
+
+    def rule_based_summary(self, analysis_data: Dict) -> str:
+        """Summary built from the analyzer findings alone, when there is no time for the LLM"""
+        overall_score = analysis_data.get("overall_score", 0) or 0
+        findings = self._findings(analysis_data)
+        if overall_score >= 80:
+            state = "is in good shape, with a few areas left to polish"
+        elif overall_score >= 60:
+            state = "is solid overall, with clear room for improvement"
+        else:
+            state = "needs attention in several areas"
+        issues = [f"**{f['name']}:** {issue}" for f in findings for issue in f["issues"][:2]][:4]
+        wins = [f"**{f['name']}:** {rec}" for f in findings for rec in f["recommendations"][:1]][:4]
+        weakest = findings[0] if findings else None
+
+        lines = [
+            "## 🎯 Overall Assessment",
+            f"The website scores **{overall_score:.1f}/100** and {state}.",
+            "",
+            "## 🚨 Critical Issues",
+            *(f"- {issue}" for issue in issues or ["No critical issues detected"]),
+            "",
+            "## ⚡ Quick Wins",
+            *(f"- {win}" for win in wins or ["Keep monitoring the site to maintain its scores"]),
+        ]
+        if weakest:
+            lines += [
+                "",
+                "## 💡 Key Takeaway",
+                f"Start with **{weakest['name']}** ({weakest['score']:.0f}/100), the lowest scoring area."
+            ]
+        return "\n".join(lines)
+
+    def rule_based_action_plan(self, analysis_data: Dict) -> str:
+        """30/60/90 day roadmap from the analyzer recommendations, weakest areas first"""
+        tasks = [
+            f"**{f['name']}:** {rec}"
+            for f in self._findings(analysis_data)
+            for rec in f["recommendations"][:2]
+        ]
+        phases = [("30 Days (Quick Wins)", tasks[:4]), ("60 Days (Foundation Building)", tasks[4:8]),
+                  ("90 Days (Strategic Growth)", tasks[8:12])]
+        lines = []
+        for title, phase_tasks in phases:
+            lines += [f"## {title}", *(f"- {task}" for task in phase_tasks or ["Re-analyze and review progress"]), ""]
+        return "\n".join(lines).strip()
+
+    async def generate_analysis_summary(self, analysis_data: Dict, budget: Optional[Budget] = None) -> str:
         """Generate AI summary of the analysis"""
         
         prompt = f"""
@@ -164,10 +255,19 @@ Please try asking your question again in a moment for a more detailed AI-powered
         Use clear, actionable language. Be specific and professional. Format using markdown with headers, bold text, and bullet points for readability.
         """
         
-        return await self._generate_with_retry(prompt)
+        return await self._generate_with_retry(
+            prompt, budget=budget, fallback=lambda: self.rule_based_summary(analysis_data)
+        )
     
-    async def generate_priority_recommendations(self, analysis_data: Dict) -> List[Dict]:
-        """Generate prioritized recommendations"""
+    async def generate_priority_recommendations(
+        self, analysis_data: Dict, budget: Optional[Budget] = None
+    ) -> List[Dict]:
+        """
+        Generate prioritized recommendations: rule-based unless AI_PRIORITY_RECOMMENDATIONS is
+        set, and rule-based whenever the LLM fails, runs out of time or replies unusably
+        """
+        if not settings.AI_PRIORITY_RECOMMENDATIONS:
+            return self.rule_based_priority_recommendations(analysis_data)
         
         prompt = f"""
         Based on this website analysis, provide exactly 5 prioritized recommendations.
@@ -189,73 +289,56 @@ Please try asking your question again in a moment for a more detailed AI-powered
         5. Effort (High/Medium/Low)
         6. Category (UX/SEO/Performance/Content)
         
-        Format as JSON array.
+        Format as a JSON array of objects with the keys "title", "description", "priority",
+        "impact", "effort" and "category", and nothing else.
         """
         
-        # For now, return structured format without AI call to save quota
-        # You can enable AI generation when quota is available
-        return [
-            {
-                "title": "Improve Page Load Speed",
-                "description": "Optimize images and enable caching to reduce load time by 40%",
-                "priority": "High",
-                "impact": "High",
-                "effort": "Medium",
-                "category": "Performance"
-            },
-            {
-                "title": "Add Meta Descriptions",
-                "description": "Create unique meta descriptions for all pages to improve SEO",
-                "priority": "High",
-                "impact": "Medium",
-                "effort": "Low",
-                "category": "SEO"
-            },
-            {
-                "title": "Enhance Mobile Responsiveness",
-                "description": "Fix layout issues on mobile devices for better user experience",
-                "priority": "Medium",
-                "impact": "High",
-                "effort": "Medium",
-                "category": "UX"
-            },
-            {
-                "title": "Improve Content Readability",
-                "description": "Break up long paragraphs and use more headings",
-                "priority": "Medium",
-                "impact": "Medium",
-                "effort": "Low",
-                "category": "Content"
-            },
-            {
-                "title": "Add Clear Call-to-Actions",
-                "description": "Place prominent CTAs above the fold to increase conversions",
-                "priority": "High",
-                "impact": "High",
-                "effort": "Low",
-                "category": "UX"
-            }
-        ]
-    
-    async def chat_about_analysis(
-        self,
-        analysis: Dict,
-        user_message: str,
-        chat_history: List[Dict]
-    ) -> str:
-        """Generate response for chat about analysis with enhanced context and intelligence"""
-        
         try:
-            # Extract detailed analysis data
-            ux_data = analysis.get('ux_analysis', {})
-            seo_data = analysis.get('seo_analysis', {})
-            perf_data = analysis.get('performance_analysis', {})
-            content_data = analysis.get('content_analysis', {})
-            security_data = analysis.get('security_analysis', {})
-            image_data = analysis.get('image_analysis', {})
-            
-            # Build comprehensive context
-            context = f"""
+            text = await self._generate_with_retry(
+                prompt, budget=budget,
+                fallback=lambda: json.dumps(self.rule_based_priority_recommendations(analysis_data))
+            )
+            recommendations = json.loads(text[text.index("["):text.rindex("]") + 1])
+        except Exception as e:
+            print(f"⚠️ AI priority recommendations failed: {e}")
+            recommendations = None
+        if not isinstance(recommendations, list) or not all(
+            isinstance(rec, dict) and rec.get("title") for rec in recommendations
+        ):
+            print("⚠️ Unusable priority recommendations from AI. Using rule-based ones.")
+            return self.rule_based_priority_recommendations(analysis_data)
+        return recommendations[:5]
+    
+    def rule_based_priority_recommendations(self, analysis_data: Dict) -> List[Dict]:
+        """Up to 5 recommendations from the analyzer findings, weakest areas first"""
+        recommendations = []
+        for finding in self._findings(analysis_data):
+            level = "High" if finding["score"] < 60 else "Medium" if finding["score"] < 80 else "Low"
+            issue = finding["issues"][0] if finding["issues"] else None
+            for rec in finding["recommendations"][:2]:
+                recommendations.append({
+                    "title": rec,
+                    "description": f"{finding['name']} scores {finding['score']:.0f}/100"
+                                   + (f": {issue}." if issue else "."),
+                    "priority": level,
+                    "impact": level,
+                    "effort": "Medium",
+                    "category": finding["name"]
+                })
+        return recommendations[:5]
+    
+    def build_chat_context(self, analysis: Dict) -> str:
+        """Condensed analysis context for chat (cached per analysis by ChatContextService)"""
+        # Extract detailed analysis data
+        ux_data = analysis.get('ux_analysis', {})
+        seo_data = analysis.get('seo_analysis', {})
+        perf_data = analysis.get('performance_analysis', {})
+        content_data = analysis.get('content_analysis', {})
+        security_data = analysis.get('security_analysis', {})
+        image_data = analysis.get('image_analysis', {})
+        
+        # Build comprehensive context
+        return f"""
 You are an expert website analyst and digital strategist with deep knowledge in UX design, SEO, web performance, content strategy, security, and image optimization. You're helping a user understand their website analysis and providing actionable recommendations.
 
 **Website Being Analyzed:** {analysis.get('website_url')}
@@ -295,28 +378,37 @@ Image Issues ({len(image_data.get('issues', []))} total):
 **AI Summary:**
 {analysis.get('ai_summary', 'Analysis in progress')}
 """
-            
-            # Build chat history with better formatting
-            history_text = ""
-            if chat_history:
-                recent_history = chat_history[-6:]  # Last 6 messages (3 exchanges)
-                history_text = "\n".join([
-                    f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['message']}"
-                    for msg in recent_history
-                ])
-            
-            # Detect question type for better responses
-            question_lower = user_message.lower()
-            is_how_to = any(word in question_lower for word in ['how', 'what', 'why', 'when', 'where'])
-            is_comparison = any(word in question_lower for word in ['compare', 'vs', 'versus', 'difference', 'better'])
-            is_priority = any(word in question_lower for word in ['first', 'priority', 'important', 'urgent', 'start'])
-            is_technical = any(word in question_lower for word in ['code', 'implement', 'technical', 'developer', 'css', 'html', 'javascript'])
-            is_business = any(word in question_lower for word in ['roi', 'revenue', 'conversion', 'business', 'sales', 'customers'])
-            
-            # Build enhanced prompt based on question type
-            prompt = f"""
+
+    def build_chat_prompt(
+        self,
+        context: str,
+        user_message: str,
+        chat_history: List[Dict],
+        conversation_summary: Optional[str] = None
+    ) -> str:
+        """Full chat prompt: cached context, conversation summary, recent turns and the question"""
+        # Build chat history with better formatting
+        history_text = ""
+        if chat_history:
+            recent_history = chat_history[-settings.CHAT_RECENT_MESSAGES:]
+            history_text = "\n".join([
+                f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['message']}"
+                for msg in recent_history
+            ])
+        
+        # Detect question type for better responses
+        question_lower = user_message.lower()
+        is_how_to = any(word in question_lower for word in ['how', 'what', 'why', 'when', 'where'])
+        is_comparison = any(word in question_lower for word in ['compare', 'vs', 'versus', 'difference', 'better'])
+        is_priority = any(word in question_lower for word in ['first', 'priority', 'important', 'urgent', 'start'])
+        is_technical = any(word in question_lower for word in ['code', 'implement', 'technical', 'developer', 'css', 'html', 'javascript'])
+        is_business = any(word in question_lower for word in ['roi', 'revenue', 'conversion', 'business', 'sales', 'customers'])
+        
+        # Build enhanced prompt based on question type
+        return f"""
 {context}
 
+{"**Earlier Conversation (summary):**" + chr(10) + conversation_summary + chr(10) if conversation_summary else ""}
 **Previous Conversation:**
 {history_text if history_text else "This is the start of the conversation."}
 
@@ -353,7 +445,22 @@ Image Issues ({len(image_data.get('issues', []))} total):
 
 Provide your response now:
 """
+
+    async def chat_about_analysis(
+        self,
+        analysis: Dict,
+        user_message: str,
+        chat_history: List[Dict],
+        context: Optional[str] = None,
+        conversation_summary: Optional[str] = None
+    ) -> str:
+        """Generate response for chat about analysis with enhanced context and intelligence"""
+        
+        try:
+            if context is None:
+                context = self.build_chat_context(analysis)
             
+            prompt = self.build_chat_prompt(context, user_message, chat_history, conversation_summary)
             return await self._generate_with_retry(prompt)
             
         except Exception as e:
@@ -363,7 +470,53 @@ Provide your response now:
             # Return contextual fallback
             return self._get_chat_fallback_response(analysis, user_message)
 
-    async def generate_action_plan(self, analysis_data: Dict) -> Dict:
+    async def stream_chat(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield response text as the model produces it.
+        Rate-limit errors are retried only until the first chunk arrives.
+        """
+        for attempt in range(self.max_retries):
+            started = False
+            try:
+                response = await self.model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    text = chunk.text
+                    if text:
+                        started = True
+                        yield text
+                return
+            except Exception as e:
+                error_msg = str(e)
+                is_rate_limit = "429" in error_msg or "quota" in error_msg.lower() or "rate" in error_msg.lower()
+                if started or not is_rate_limit or attempt == self.max_retries - 1:
+                    raise
+                
+                delay = self.base_delay * (2 ** attempt)
+                print(f"⏳ Rate limit hit, retrying stream in {delay} seconds... (attempt {attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+    async def summarize_conversation(self, previous_summary: Optional[str], messages: List[Dict]) -> str:
+        """Fold older chat turns into a short rolling summary"""
+        transcript = "\n".join(
+            f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['message']}"
+            for msg in messages
+        )
+        prompt = f"""
+Summarize this conversation between a user and a website analysis assistant in at most 8 bullet points.
+Keep the user's goals, decisions, constraints and any advice already given. Omit greetings and filler.
+
+**Summary So Far:**
+{previous_summary or "None"}
+
+**New Messages:**
+{transcript}
+
+Provide the updated summary now:
+"""
+        # A canned fallback would corrupt the summary, so let failures propagate
+        return await self._generate_with_retry(prompt, use_fallback=False)
+
+    async def generate_action_plan(self, analysis_data: Dict, budget: Optional[Budget] = None) -> Dict:
         """Generate 30/60/90 day action plan"""
         
         prompt = f"""
@@ -398,7 +551,9 @@ Provide your response now:
         Format the response in clear markdown with headers and bullet points.
         """
         
-        roadmap_text = await self._generate_with_retry(prompt)
+        roadmap_text = await self._generate_with_retry(
+            prompt, budget=budget, fallback=lambda: self.rule_based_action_plan(analysis_data)
+        )
         
         return {
             "roadmap": roadmap_text,
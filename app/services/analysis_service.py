@@ -1,170 +1,234 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from motor.motor_asyncio import AsyncIOMotorClient
-import asyncio
+from typing import Dict, List, Optional
 
 from app.core.config import settings
 from app.core.database import get_database
-from app.analyzers.ux_analyzer import UXAnalyzer
-from app.analyzers.seo_analyzer import SEOAnalyzer
-from app.analyzers.performance_analyzer import PerformanceAnalyzer
-from app.analyzers.content_analyzer import ContentAnalyzer
-from app.analyzers.security_analyzer import SecurityAnalyzer
-from app.analyzers.image_analyzer import ImageAnalyzer
+from app.analyzers.executor import run_analyzers, weighted_overall_score
+from app.analyzers.profiles import get_profile
 from app.services.ai_service import AIService
 from app.services.pdf_service import PDFService
 from app.services.storage_service import StorageService
+from app.services.stats_service import UserStatsService
+from app.services.analysis_store import AnalysisStore, AI_SECTIONS
+from app.services.chat_context_service import ChatContextService
+from app.services.share_service import ShareService
+from app.services.percentile_service import PercentileService
+from app.utils.budget import Budget
+from app.utils.urls import normalize_domain
+from app.utils.fingerprint import significant_change
 
 
-async def perform_website_analysis(analysis_id: str, website_url: str):
-    """Perform complete website analysis"""
+async def update_analysis_status(analysis_id: str, status: str, fields: dict = None):
+    """Set an analysis status and keep the owner's dashboard aggregates in step"""
     db = get_database()
+    update = {"status": status, **(fields or {})}
+    
+    # Only the request that actually changes the status moves the counters
+    previous = await db.analyses.find_one_and_update(
+        {"_id": ObjectId(analysis_id), "status": {"$ne": status}},
+        {"$set": update},
+        projection={"user_id": 1, "status": 1, "domain": 1, "plan": 1, "profile": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    
+    if previous is None:
+        # Already in this status - still apply the remaining fields
+        if fields:
+            await db.analyses.update_one({"_id": ObjectId(analysis_id)}, {"$set": fields})
+            await ShareService.purge(db, analysis_id=analysis_id)
+        return
+    
+    # Results are being replaced or were just written - rebuild chat context and
+    # shared responses on next use
+    await ChatContextService.invalidate(db, analysis_id)
+    await ShareService.purge(db, analysis_id=analysis_id)
+    
+    await UserStatsService.record_transition(
+        db,
+        previous.get("user_id"),
+        previous.get("status"),
+        status,
+        update.get("overall_score")
+    )
+    
+    if status == "completed" and update.get("overall_score") is not None:
+        ranked = PercentileService.ranked_scores(
+            update["overall_score"], update.get("scores", {}), previous.get("profile")
+        )
+        if ranked is not None:
+            await PercentileService.record(*ranked, previous.get("domain"), previous.get("plan"))
+
+
+async def _reusable_reports(db, previous: Optional[Dict]) -> Optional[Dict]:
+    """AI sections and PDF of the previous run, when they can be carried over"""
+    if not previous or not previous.get("analysis_id"):
+        return None
+    
+    reports = await AnalysisStore.load_sections(db, previous["analysis_id"], AI_SECTIONS)
+    if set(reports) != set(AI_SECTIONS):
+        return None
+    header = await db.analyses.find_one({"_id": ObjectId(previous["analysis_id"])}, {"pdf_url": 1})
+    reports["pdf_url"] = (header or {}).get("pdf_url")
+    return reports
+
+
+async def perform_website_analysis(analysis_id: str, website_url: str, previous: Optional[Dict] = None,
+                                   analyzers: Optional[List[str]] = None, profile: str = "standard"):
+    """
+    Perform complete website analysis.
+    `profile` (quick / standard / deep) sets the analyzers, page fetch and whether AI
+    insights and the PDF are generated; `analyzers` overrides its analyzers (keys or sections).
+    Everything shares a MAX_ANALYSIS_TIME_SECONDS budget: steps bound their waits by the time
+    left and downgrade optional work as it runs low (recorded in "degraded").
+    `previous` (monitoring re-runs) holds the last run's analysis_id, fingerprint and scores:
+    when nothing changed beyond the thresholds its AI insights and PDF are reused.
+    """
+    db = get_database()
+    budget = Budget(settings.MAX_ANALYSIS_TIME_SECONDS)
     
     try:
         print(f"📊 Analysis {analysis_id}: Starting for {website_url}")
         
         # Update status to processing
-        await db.analyses.update_one(
-            {"_id": ObjectId(analysis_id)},
-            {"$set": {"status": "processing"}}
-        )
+        await update_analysis_status(analysis_id, "processing")
         print(f"📊 Analysis {analysis_id}: Status updated to processing")
         
-        # Initialize analyzers
-        print(f"📊 Analysis {analysis_id}: Initializing analyzers...")
-        ux_analyzer = UXAnalyzer()
-        seo_analyzer = SEOAnalyzer()
-        performance_analyzer = PerformanceAnalyzer()
-        content_analyzer = ContentAnalyzer()
-        security_analyzer = SecurityAnalyzer()
-        image_analyzer = ImageAnalyzer()
         ai_service = AIService()
+        profile = get_profile(profile)
         
-        # Run analyses in parallel
-        print(f"📊 Analysis {analysis_id}: Running analyzers...")
-        ux_result, seo_result, perf_result, content_result, security_result, image_result = await asyncio.gather(
-            ux_analyzer.analyze(website_url),
-            seo_analyzer.analyze(website_url),
-            performance_analyzer.analyze(website_url),
-            content_analyzer.analyze(website_url),
-            security_analyzer.analyze(website_url),
-            image_analyzer.analyze(website_url),
-            return_exceptions=True
+        # Run the profile's (or the selected) analyzers; the page is fetched and parsed once
+        # and shared with every analyzer and the content fingerprint
+        print(f"📊 Analysis {analysis_id}: Running {profile.name} analyzers...")
+        analyzer_results, stages = await run_analyzers(
+            website_url,
+            profile.analyzer_names(analyzers),
+            extra_stages=["fingerprint"],
+            overrides=profile.stage_overrides(),
+            budget=budget
         )
+        fingerprint = stages["fingerprint"] if isinstance(stages["fingerprint"], str) else None
         print(f"📊 Analysis {analysis_id}: Analyzers completed")
         
-        # Handle any errors
-        if isinstance(ux_result, Exception):
-            print(f"⚠️  UX analyzer error: {ux_result}")
-            ux_result = {"score": 0, "issues": ["Analysis failed"], "recommendations": []}
-        if isinstance(seo_result, Exception):
-            print(f"⚠️  SEO analyzer error: {seo_result}")
-            seo_result = {"score": 0, "issues": ["Analysis failed"], "recommendations": []}
-        if isinstance(perf_result, Exception):
-            print(f"⚠️  Performance analyzer error: {perf_result}")
-            perf_result = {"score": 0, "issues": ["Analysis failed"], "recommendations": []}
-        if isinstance(content_result, Exception):
-            print(f"⚠️  Content analyzer error: {content_result}")
-            content_result = {"score": 0, "issues": ["Analysis failed"], "recommendations": []}
-        if isinstance(security_result, Exception):
-            print(f"⚠️  Security analyzer error: {security_result}")
-            security_result = {"score": 0, "issues": ["Analysis failed"], "recommendations": []}
-        if isinstance(image_result, Exception):
-            print(f"⚠️  Image analyzer error: {image_result}")
-            image_result = {"score": 0, "issues": ["Analysis failed"], "recommendations": []}
-        
-        # Calculate overall score (6 analyzers with weighted importance)
-        overall_score = (
-            ux_result.get("score", 0) * 0.18 +
-            seo_result.get("score", 0) * 0.20 +
-            perf_result.get("score", 0) * 0.20 +
-            content_result.get("score", 0) * 0.17 +
-            security_result.get("score", 0) * 0.15 +
-            image_result.get("score", 0) * 0.10
-        )
+        # Calculate overall score (weighted by the registry, over the analyzers that ran)
+        overall_score = weighted_overall_score(analyzer_results)
         print(f"📊 Analysis {analysis_id}: Overall score calculated: {overall_score}")
         
         # Prepare analysis data for AI
         analysis_data = {
             "website_url": website_url,
             "overall_score": overall_score,
-            "ux_analysis": ux_result,
-            "seo_analysis": seo_result,
-            "performance_analysis": perf_result,
-            "content_analysis": content_result,
-            "security_analysis": security_result,
-            "image_analysis": image_result
+            **analyzer_results
         }
         
-        # Generate AI insights
-        print(f"📊 Analysis {analysis_id}: Generating AI insights...")
-        ai_summary = await ai_service.generate_analysis_summary(analysis_data)
-        priority_recommendations = await ai_service.generate_priority_recommendations(analysis_data)
-        print(f"📊 Analysis {analysis_id}: AI insights generated")
+        # Monitoring re-runs regenerate AI insights and the PDF only on a significant change
+        reports = None
+        change = None
+        if previous is not None:
+            change = significant_change(
+                previous,
+                overall_score,
+                AnalysisStore.header_fields(analysis_data)["scores"],
+                fingerprint,
+                settings.MONITOR_SCORE_THRESHOLD,
+                settings.MONITOR_FINGERPRINT_THRESHOLD
+            )
+            if change is None:
+                reports = await _reusable_reports(db, previous)
         
-        # Generate action plan
-        print(f"📊 Analysis {analysis_id}: Generating action plan...")
-        action_plan = await ai_service.generate_action_plan(analysis_data)
-        print(f"📊 Analysis {analysis_id}: Action plan generated")
-        
-        # Generate PDF report
-        print(f"📊 Analysis {analysis_id}: Generating PDF report...")
-        pdf_url = None
-        try:
-            pdf_service = PDFService()
+        if not profile.reports:
+            print(f"📊 Analysis {analysis_id}: {profile.name.capitalize()} profile, skipping AI insights and PDF")
+            ai_summary = priority_recommendations = action_plan = pdf_url = None
+        elif reports is not None:
+            print(f"♻️ Analysis {analysis_id}: No significant change, reusing AI insights and PDF")
+            ai_summary = reports["ai_summary"]
+            priority_recommendations = reports["priority_recommendations"]
+            action_plan = reports["action_plan"]
+            pdf_url = reports["pdf_url"]
+        else:
+            if change:
+                print(f"📊 Analysis {analysis_id}: Regenerating reports ({change})")
+            # Generate AI insights
+            print(f"📊 Analysis {analysis_id}: Generating AI insights...")
+            ai_summary = await ai_service.generate_analysis_summary(analysis_data, budget)
+            priority_recommendations = await ai_service.generate_priority_recommendations(analysis_data, budget)
+            print(f"📊 Analysis {analysis_id}: AI insights generated")
+            
+            # Generate action plan
+            print(f"📊 Analysis {analysis_id}: Generating action plan...")
+            action_plan = await ai_service.generate_action_plan(analysis_data, budget)
+            print(f"📊 Analysis {analysis_id}: Action plan generated")
+            
+            # Generate PDF report (when short on time, it is generated on first download)
+            pdf_url = None
+            if not budget.allows(settings.BUDGET_PDF_RESERVE_SECONDS):
+                print(f"⏳ Analysis {analysis_id}: Out of time budget, deferring PDF report to download")
+                budget.degrade("PDF deferred to download")
+            else:
+                print(f"📊 Analysis {analysis_id}: Generating PDF report...")
+                try:
+                    pdf_service = PDFService()
             
-            # Prepare data for PDF
-            pdf_data = {
-                'id': analysis_id,
-                'website_url': website_url,
-                'overall_score': round(overall_score, 2),
-                'ux_analysis': ux_result,
-                'seo_analysis': seo_result,
-                'performance_analysis': perf_result,
-                'content_analysis': content_result,
-                'security_analysis': security_result,
-                'image_analysis': image_result,
-                'ai_summary': ai_summary,
-                'priority_recommendations': priority_recommendations
-            }
+                    # Prepare data for PDF
+                    pdf_data = {
+                        'id': analysis_id,
+                        'website_url': website_url,
+                        'overall_score': round(overall_score, 2),
+                        **analyzer_results,
+                        'ai_summary': ai_summary,
+                        'priority_recommendations': priority_recommendations,
+                        'percentiles': await PercentileService.percentiles(
+                            db,
+                            overall_score,
+                            AnalysisStore.header_fields(analysis_data)["scores"],
+                            normalize_domain(website_url)
+                        )
+                    }
             
-            # Generate PDF (saves directly to app/static/pdfs/)
-            pdf_path = await pdf_service.generate_report(pdf_data)
+                    # Generate PDF (saves directly to app/static/pdfs/)
+                    pdf_path = await pdf_service.generate_report(pdf_data)
             
-            # PDF URL for accessing via web
-            pdf_filename = f"analysis_{analysis_id}.pdf"
-            pdf_url = f"/static/pdfs/{pdf_filename}"
+                    # PDF URL for accessing via web
+                    pdf_filename = f"analysis_{analysis_id}.pdf"
+                    pdf_url = f"/static/pdfs/{pdf_filename}"
             
-            print(f"✅ PDF generated successfully: {pdf_url}")
+                    print(f"✅ PDF generated successfully: {pdf_url}")
             
-        except Exception as pdf_error:
-            print(f"⚠️  PDF generation error: {pdf_error}")
-            import traceback
-            traceback.print_exc()
+                except Exception as pdf_error:
+                    print(f"⚠️  PDF generation error: {pdf_error}")
+                    import traceback
+                    traceback.print_exc()
         
-        # Update analysis with results
+        # Store result sections first so a "completed" header always has them
+        results = dict(analyzer_results)
+        if profile.reports:
+            results.update({
+                "ai_summary": ai_summary,
+                "priority_recommendations": priority_recommendations,
+                "action_plan": action_plan
+            })
+        await AnalysisStore.save_sections(db, analysis_id, results)
+        
+        # Update the analysis header
         update_data = {
-            "status": "completed",
             "overall_score": round(overall_score, 2),
-            "ux_analysis": ux_result,
-            "seo_analysis": seo_result,
-            "performance_analysis": perf_result,
-            "content_analysis": content_result,
-            "security_analysis": security_result,
-            "image_analysis": image_result,
-            "ai_summary": ai_summary,
-            "priority_recommendations": priority_recommendations,
-            "action_plan": action_plan,
+            **AnalysisStore.header_fields(results),
+            "analyzers": list(analyzer_results),
+            "fingerprint": fingerprint,
+            "degraded": budget.degraded,
             "completed_at": datetime.utcnow()
         }
+        if budget.degraded:
+            print(f"⏳ Analysis {analysis_id}: Downgraded to fit the time budget: {', '.join(budget.degraded)}")
+        if previous is not None:
+            update_data["reports_regenerated"] = reports is None
         
         if pdf_url:
             update_data["pdf_url"] = pdf_url
         
-        await db.analyses.update_one(
-            {"_id": ObjectId(analysis_id)},
-            {"$set": update_data}
-        )
+        await update_analysis_status(analysis_id, "completed", update_data)
         print(f"✅ Analysis {analysis_id}: Completed successfully!")
         
     except Exception as e:
@@ -172,13 +236,8 @@ async def perform_website_analysis(analysis_id: str, website_url: str):
         import traceback
         traceback.print_exc()
         # Update status to failed
-        await db.analyses.update_one(
-            {"_id": ObjectId(analysis_id)},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error_message": str(e),
-                    "completed_at": datetime.utcnow()
-                }
-            }
+        await update_analysis_status(
+            analysis_id,
+            "failed",
+            {"error_message": str(e), "completed_at": datetime.utcnow()}
         )
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from app.analyzers.registry import analyzer_sections
+from app.utils.compression import decode_value, encode_value
+
+
+# Heavy result sections, each stored as its own document in analysis_sections: one per
+# registered analyzer, then the AI output
+ANALYZER_SECTIONS = analyzer_sections()
+AI_SECTIONS = ["ai_summary", "priority_recommendations", "action_plan"]
+SECTIONS = ANALYZER_SECTIONS + AI_SECTIONS
+
+# Fields kept on the slim analyses header document
+HEADER_PROJECTION = {
+    "user_id": 1,
+    "website_url": 1,
+    "domain": 1,
+    "plan": 1,
+    "status": 1,
+    "overall_score": 1,
+    "scores": 1,
+    "profile": 1,
+    "analyzers": 1,
+    "degraded": 1,
+    "screenshot_url": 1,
+    "pdf_url": 1,
+    "error_message": 1,
+    "created_at": 1,
+    "completed_at": 1
+}
+
+
+class AnalysisStore:
+    """Analyses stored as a slim header plus one (compressed) detail document per result section"""
+
+    @staticmethod
+    def section_id(analysis_id: str, section: str) -> str:
+        return f"{analysis_id}:{section}"
+
+    @classmethod
+    def header_fields(cls, results: Dict) -> Dict:
+        """Per-analyzer scores kept on the header so lists and summaries need no sections"""
+        return {
+            "scores": {
+                section: results[section].get("score")
+                for section in ANALYZER_SECTIONS
+                if isinstance(results.get(section), dict)
+            }
+        }
+
+    @classmethod
+    async def save_sections(cls, db, analysis_id: str, results: Dict):
+        """Write (or overwrite) the section documents present in `results`"""
+        now = datetime.utcnow()
+        requests = [
+            ReplaceOne(
+                {"_id": cls.section_id(analysis_id, section)},
+                {
+                    "analysis_id": analysis_id,
+                    "section": section,
+                    **encode_value(results[section]),
+                    "updated_at": now
+                },
+                upsert=True
+            )
+            for section in SECTIONS
+            if section in results
+        ]
+        if requests:
+            await db.analysis_sections.bulk_write(requests, ordered=False)
+
+    @classmethod
+    async def load_sections(cls, db, analysis_id: str, sections: Iterable[str]) -> Dict:
+        """Read the requested sections; missing ones are simply absent from the result"""
+        ids = [cls.section_id(analysis_id, section) for section in sections]
+        if not ids:
+            return {}
+
+        documents = await db.analysis_sections.find(
+            {"_id": {"$in": ids}}, {"section": 1, "data": 1, "codec": 1, "blob": 1}
+        ).to_list(length=len(ids))
+        return {document["section"]: decode_value(document) for document in documents}
+
+    @classmethod
+    async def get(cls, db, analysis_id: str, sections: Iterable[str] = ()) -> Optional[Dict]:
+        """
+        Load the header and only the requested sections, concurrently.
+        Analyses written before the split still carry their sections inline; those are
+        picked up through the header projection.
+        """
+        sections = list(sections)
+        projection = {**HEADER_PROJECTION, **{section: 1 for section in sections}}
+
+        header, stored = await asyncio.gather(
+            db.analyses.find_one({"_id": ObjectId(analysis_id)}, projection),
+            cls.load_sections(db, analysis_id, sections)
+        )
+        if header is None:
+            return None
+
+        header.update(stored)
+        return header
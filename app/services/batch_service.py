@@ -0,0 +1,266 @@
+from collections import defaultdict, deque
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from pydantic import HttpUrl, TypeAdapter, ValidationError
+import asyncio
+import csv
+import io
+import time
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.services.analysis_service import perform_website_analysis
+from app.services.job_scheduler import analysis_scheduler, plan_in_flight
+from app.services.stats_service import UserStatsService
+from app.utils.urls import normalize_domain
+
+
+_http_url = TypeAdapter(HttpUrl)
+
+
+def parse_urls(values: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Validate and de-duplicate submitted URLs, keeping their order.
+    Returns: (urls, rejected) where rejected are the entries that are not http(s) URLs
+    """
+    urls, rejected = {}, []
+    for value in values:
+        value = (value or "").strip()
+        if not value:
+            continue
+        try:
+            urls.setdefault(str(_http_url.validate_python(value)), None)
+        except ValidationError:
+            rejected.append(value)
+    return list(urls), rejected
+
+
+def read_csv_urls(text: str) -> List[str]:
+    """URLs of an uploaded CSV: the "url" column when there is a header, else the first column"""
+    rows = [row for row in csv.reader(io.StringIO(text)) if row]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    if "url" in header:
+        column = header.index("url")
+        return [row[column] for row in rows[1:] if len(row) > column]
+    return [row[0] for row in rows]
+
+
+def interleave_by_host(urls: List[str]) -> List[str]:
+    """Order URLs round-robin across hosts, so one large site cannot fill the queue head"""
+    by_host: Dict[str, Deque[str]] = defaultdict(deque)
+    for url in urls:
+        by_host[normalize_domain(url)].append(url)
+
+    ordered = []
+    while by_host:
+        for host in list(by_host):
+            ordered.append(by_host[host].popleft())
+            if not by_host[host]:
+                del by_host[host]
+    return ordered
+
+
+class BatchScheduler:
+    """
+    Admits batch analyses under a global concurrency cap and a per-host cap, both shared
+    by every batch running in this process, and the user's plan in-flight cap, so a batch
+    slot is never held waiting on the analysis scheduler's per-user limit. Also tracks
+    recent throughput.
+    """
+
+    def __init__(self):
+        self._changed = asyncio.Condition()
+        self._running = 0
+        self._per_host: Dict[str, int] = defaultdict(int)
+        self._per_user: Dict[str, int] = defaultdict(int)
+        self._finished: Deque[float] = deque()
+
+    async def acquire(self, pending: List[Dict]) -> Optional[Dict]:
+        """
+        Take the first pending item whose host and user have spare capacity, waiting for a slot.
+        Returns None once nothing is pending.
+        """
+        async with self._changed:
+            while pending:
+                if self._running < settings.BATCH_GLOBAL_CONCURRENCY:
+                    for index, item in enumerate(pending):
+                        if self._admits(item):
+                            self._running += 1
+                            self._per_host[item["host"]] += 1
+                            if item.get("user_id"):
+                                self._per_user[item["user_id"]] += 1
+                            return pending.pop(index)
+                await self._changed.wait()
+            return None
+
+    def _admits(self, item: Dict) -> bool:
+        if self._per_host[item["host"]] >= settings.BATCH_PER_HOST_CONCURRENCY:
+            return False
+        user_id = item.get("user_id")
+        return not user_id or self._per_user[user_id] < plan_in_flight(item.get("plan", "free"))
+
+    async def release(self, item: Dict):
+        async with self._changed:
+            self._running -= 1
+            self._per_host[item["host"]] -= 1
+            if not self._per_host[item["host"]]:
+                del self._per_host[item["host"]]
+            if item.get("user_id"):
+                self._per_user[item["user_id"]] -= 1
+                if not self._per_user[item["user_id"]]:
+                    del self._per_user[item["user_id"]]
+            self._finished.append(time.monotonic())
+            self._changed.notify_all()
+
+    def metrics(self) -> Dict:
+        """In-flight analyses and URLs per minute (overall and per slot) over the last window"""
+        window = settings.BATCH_THROUGHPUT_WINDOW_SECONDS
+        cutoff = time.monotonic() - window
+        while self._finished and self._finished[0] < cutoff:
+            self._finished.popleft()
+
+        urls_per_minute = len(self._finished) / (window / 60)
+        return {
+            "running": self._running,
+            "hosts": len(self._per_host),
+            "urls_per_minute": round(urls_per_minute, 2),
+            "urls_per_minute_per_worker": round(urls_per_minute / settings.BATCH_GLOBAL_CONCURRENCY, 2)
+        }
+
+
+batch_scheduler = BatchScheduler()
+
+
+class BatchService:
+    """Bulk analyses: one batch job creating and scheduling an analysis per URL"""
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def create_batch(self, urls: List[str], user_id: str, plan: str) -> str:
+        """Create the batch and a pending analysis per URL, then start scheduling"""
+        now = datetime.utcnow()
+        batch = {
+            "user_id": user_id,
+            "status": "pending",
+            "total": len(urls),
+            "completed": 0,
+            "failed": 0,
+            "throughput": None,
+            "created_at": now,
+            "started_at": None,
+            "completed_at": None
+        }
+        result = await self.db.analysis_batches.insert_one(batch)
+        batch_id = str(result.inserted_id)
+
+        await self.db.analyses.insert_many([
+            {
+                "user_id": user_id,
+                "batch_id": batch_id,
+                "website_url": url,
+                "domain": normalize_domain(url),
+                "plan": plan,
+                "status": "pending",
+                "created_at": now
+            }
+            for url in interleave_by_host(urls)
+        ])
+        await UserStatsService.record_created(self.db, user_id, now, count=len(urls))
+
+        print(f"📦 Batch {batch_id}: Created with {len(urls)} URLs")
+        asyncio.create_task(self.run_batch(batch_id))
+        return batch_id
+
+    async def _analyze(self, batch_id: str, item: Dict, started: float, workers: int):
+        """Run one analysis and account for it on the batch"""
+        # Failures are recorded on the analysis itself, never raised
+        await analysis_scheduler.run(
+            item.get("plan", "free"),
+            item.get("user_id"),
+            lambda: perform_website_analysis(str(item["_id"]), item["website_url"])
+        )
+
+        analysis = await self.db.analyses.find_one({"_id": item["_id"]}, {"status": 1})
+        counter = "completed" if analysis and analysis["status"] == "completed" else "failed"
+
+        batch = await self.db.analysis_batches.find_one_and_update(
+            {"_id": ObjectId(batch_id)},
+            {"$inc": {counter: 1}},
+            projection={"completed": 1, "failed": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        finished = batch["completed"] + batch["failed"]
+        urls_per_minute = finished / max((time.monotonic() - started) / 60, 1e-6)
+        await self.db.analysis_batches.update_one(
+            {"_id": ObjectId(batch_id)},
+            {
+                "$set": {
+                    "throughput": {
+                        "urls_per_minute": round(urls_per_minute, 2),
+                        "urls_per_minute_per_worker": round(urls_per_minute / workers, 2),
+                        "workers": workers
+                    }
+                }
+            }
+        )
+
+    async def run_batch(self, batch_id: str):
+        """Feed the batch's pending analyses through the shared scheduler"""
+        try:
+            await self.db.analysis_batches.update_one(
+                {"_id": ObjectId(batch_id)},
+                {"$set": {"status": "processing", "started_at": datetime.utcnow()}}
+            )
+            pending = [
+                {**analysis, "host": analysis["domain"]}
+                async for analysis in self.db.analyses.find(
+                    {"batch_id": batch_id, "status": "pending"},
+                    {"website_url": 1, "domain": 1, "user_id": 1, "plan": 1}
+                ).sort("_id", 1)
+            ]
+
+            started = time.monotonic()
+            # More workers than the user may run at once would only wait for each other
+            plan = pending[0].get("plan", "free") if pending else "free"
+            workers = max(1, min(settings.BATCH_GLOBAL_CONCURRENCY, plan_in_flight(plan), len(pending)))
+
+            async def worker():
+                while True:
+                    item = await batch_scheduler.acquire(pending)
+                    if item is None:
+                        return
+                    try:
+                        await self._analyze(batch_id, item, started, workers)
+                    finally:
+                        await batch_scheduler.release(item)
+
+            print(f"📦 Batch {batch_id}: Scheduling {len(pending)} analyses...")
+            await asyncio.gather(*[worker() for _ in range(workers)])
+
+            await self.db.analysis_batches.update_one(
+                {"_id": ObjectId(batch_id)},
+                {"$set": {"status": "completed", "completed_at": datetime.utcnow()}}
+            )
+            print(f"✅ Batch {batch_id}: Completed")
+
+        except Exception as e:
+            print(f"❌ Batch {batch_id}: Failed with error: {e}")
+            import traceback
+            traceback.print_exc()
+
+            await self.db.analysis_batches.update_one(
+                {"_id": ObjectId(batch_id)},
+                {
+                    "$set": {
+                        "status": "failed",
+                        "error_message": str(e),
+                        "completed_at": datetime.utcnow()
+                    }
+                }
+            )
@@ -0,0 +1,285 @@
+from datetime import datetime
+from bson import ObjectId
+from typing import Dict, List
+from pymongo import UpdateOne
+import asyncio
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.write_batcher import bulk_write
+from app.services.comparison_service import ComparisonService, COMPARISON_CATEGORIES
+from app.services.job_scheduler import analysis_scheduler
+from app.utils.score_matrix import ScoreMatrix
+
+
+# Score matrix columns: the overall score, then one per analyzer category
+BENCHMARK_CATEGORIES = ["overall"] + [key for key, _, _ in COMPARISON_CATEGORIES.values()]
+
+
+class BenchmarkService:
+    """Benchmarks one website against a large set of competitors"""
+
+    def __init__(self):
+        self.db = get_database()
+        self.comparisons = ComparisonService()
+
+    async def create_benchmark(self, your_url: str, competitor_urls: List[str], user_id: str, plan: str) -> str:
+        """Create a benchmark and start crawling in the background"""
+        benchmark = {
+            "user_id": user_id,
+            "plan": plan,
+            "your_url": your_url,
+            "competitor_urls": competitor_urls,
+            "status": "pending",
+            "total": len(competitor_urls) + 1,
+            "completed": 0,
+            "failed": 0,
+            "summary": None,
+            "insights": None,
+            "leaderboard": None,
+            "created_at": datetime.utcnow(),
+            "completed_at": None
+        }
+
+        result = await self.db.benchmarks.insert_one(benchmark)
+        benchmark_id = str(result.inserted_id)
+
+        print(f"📊 Benchmark {benchmark_id}: Created with {len(competitor_urls)} competitors")
+        asyncio.create_task(self.run_benchmark(benchmark_id))
+
+        return benchmark_id
+
+    async def _benchmark_site(self, url: str, plan: str, user_id: str) -> Dict:
+        """
+        Stored results when fresh enough, else a new crawl scheduled like any analysis
+        of the owner's plan; never raises
+        """
+        try:
+            return (
+                await self.comparisons._load_stored_result(url)
+                or await analysis_scheduler.run(plan, user_id, lambda: self.comparisons._analyze_website(url))
+            )
+        except Exception as e:
+            print(f"❌ Benchmark site {url} failed: {e}")
+            return {"url": url, "overall_score": 0, "confidence": 0, "error": str(e)}
+
+    def _site_row(self, benchmark_id: str, result: Dict, is_yours: bool) -> Dict:
+        """Scores-only row stored per benchmarked site"""
+        row = {
+            "benchmark_id": benchmark_id,
+            "url": result["url"],
+            "is_yours": is_yours,
+            "status": "failed" if result.get("error") else "completed",
+            "overall_score": result.get("overall_score", 0),
+            "confidence": result.get("confidence", 0),
+            "analysis_id": result.get("analysis_id"),
+            "created_at": datetime.utcnow()
+        }
+        if result.get("error"):
+            row["error"] = result["error"]
+        else:
+            row["scores"] = {
+                key: result[section].get("score", 0)
+                for section, (key, _, _) in COMPARISON_CATEGORIES.items()
+            }
+        return row
+
+    def _insights(self, summary: Dict) -> Dict:
+        """Strengths, weaknesses and opportunities from your standing in each category"""
+        strengths = []
+        weaknesses = []
+        opportunities = []
+
+        for category, entry in summary.items():
+            if "percentile" not in entry:
+                continue
+            name = category.title()
+            percentile = entry["percentile"]
+
+            if percentile >= 75:
+                strengths.append({
+                    "category": name,
+                    "rank": entry["rank"],
+                    "percentile": percentile,
+                    "score": entry["your_score"],
+                    "message": f"Ahead of {percentile:.0f}% of competitors in {name}"
+                })
+            elif percentile < 50:
+                gap = entry["gap_to_leader"]
+                if gap >= 30:
+                    severity = "Critical"
+                elif gap >= 20:
+                    severity = "High"
+                elif gap >= 10:
+                    severity = "Medium"
+                else:
+                    severity = "Low"
+
+                weaknesses.append({
+                    "category": name,
+                    "rank": entry["rank"],
+                    "percentile": percentile,
+                    "your_score": entry["your_score"],
+                    "median_score": entry["median"],
+                    "leader_score": entry["leader_score"],
+                    "leader_url": entry["leader_url"],
+                    "gap": gap,
+                    "severity": severity,
+                    "message": (f"Behind {100 - percentile:.0f}% of competitors in {name} - "
+                                f"{gap:.1f} points behind leader"),
+                    "recommendation": self.comparisons._get_category_recommendation(category, gap, severity)
+                })
+
+                gap_to_median = entry["median"] - entry["your_score"]
+                if 0 < gap_to_median < 10:
+                    opportunities.append({
+                        "category": name,
+                        "type": "Quick Win",
+                        "gap": round(gap_to_median, 1),
+                        "message": f"{gap_to_median:.1f} points would lift {name} above the median competitor"
+                    })
+
+        weaknesses.sort(key=lambda w: -w["gap"])
+
+        return {
+            "strengths": strengths,
+            "weaknesses": weaknesses,
+            "opportunities": opportunities,
+            "summary": {
+                "leading_in": sum(1 for entry in summary.values() if entry.get("rank") == 1),
+                "top_quartile_in": len(strengths),
+                "bottom_half_in": len(weaknesses),
+                "quick_wins": len(opportunities)
+            }
+        }
+
+    async def _flush_progress(self, benchmark_id: str, rows: List[Dict], matrix: ScoreMatrix,
+                              finished: int, failed: int):
+        """Store newly finished site rows and refresh the standings and insights"""
+        if rows:
+            await self.db.benchmark_sites.insert_many(rows)
+
+        summary = matrix.summary()
+        await self.db.benchmarks.update_one(
+            {"_id": ObjectId(benchmark_id)},
+            {
+                "$set": {
+                    "completed": finished,
+                    "failed": failed,
+                    "summary": summary,
+                    "insights": self._insights(summary),
+                    "leaderboard": matrix.leaderboard(settings.BENCHMARK_LEADERBOARD_SIZE),
+                    "updated_at": datetime.utcnow()
+                }
+            }
+        )
+
+    async def _store_final_standings(self, matrix: ScoreMatrix, matrix_rows: List[Dict]):
+        """Write every site's final rank and percentile per category"""
+        ranks = matrix.ranks().tolist()
+        percentiles = matrix.percentiles().round(1).tolist()
+        await bulk_write(self.db.benchmark_sites, [
+            UpdateOne(
+                {"_id": row["_id"]},
+                {
+                    "$set": {
+                        "ranks": dict(zip(matrix.categories, ranks[i])),
+                        "percentiles": dict(zip(matrix.categories, percentiles[i]))
+                    }
+                }
+            )
+            for i, row in enumerate(matrix_rows)
+        ])
+
+    async def run_benchmark(self, benchmark_id: str):
+        """
+        Crawl every site with a bounded pool of workers. Finished sites are stored and the
+        standings refreshed at most every BENCHMARK_PROGRESS_INTERVAL_SECONDS.
+        """
+        loop = asyncio.get_running_loop()
+        workers: List[asyncio.Task] = []
+
+        try:
+            benchmark = await self.db.benchmarks.find_one_and_update(
+                {"_id": ObjectId(benchmark_id)},
+                {"$set": {"status": "processing"}},
+                projection={"user_id": 1, "plan": 1, "your_url": 1, "competitor_urls": 1}
+            )
+            plan = benchmark.get("plan", "free")
+            your_url = benchmark["your_url"]
+            urls = [your_url] + benchmark["competitor_urls"]
+
+            # Your site goes first so your standing is tracked from the first rows on
+            pending: asyncio.Queue = asyncio.Queue()
+            for url in urls:
+                pending.put_nowait(url)
+            finished_sites: asyncio.Queue = asyncio.Queue()
+
+            async def worker():
+                while not pending.empty():
+                    url = pending.get_nowait()
+                    await finished_sites.put(await self._benchmark_site(url, plan, benchmark["user_id"]))
+
+            concurrency = min(settings.BENCHMARK_CONCURRENCY, len(urls))
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            print(f"📊 Benchmark {benchmark_id}: Crawling {len(urls)} sites, {concurrency} at a time...")
+
+            matrix = ScoreMatrix(BENCHMARK_CATEGORIES, capacity=len(urls))
+            matrix_rows: List[Dict] = []
+            new_rows: List[Dict] = []
+            finished = failed = 0
+            last_flush = loop.time()
+
+            while finished < len(urls):
+                try:
+                    result = await asyncio.wait_for(
+                        finished_sites.get(), timeout=settings.BENCHMARK_PROGRESS_INTERVAL_SECONDS
+                    )
+                    finished += 1
+                    row = self._site_row(benchmark_id, result, is_yours=result["url"] == your_url)
+                    if row["status"] == "completed":
+                        matrix.add(
+                            row["url"],
+                            [row["overall_score"]] + [row["scores"][key] for key in BENCHMARK_CATEGORIES[1:]],
+                            is_yours=row["is_yours"]
+                        )
+                        matrix_rows.append(row)
+                    else:
+                        failed += 1
+                    new_rows.append(row)
+                except asyncio.TimeoutError:
+                    pass
+
+                if new_rows and (
+                    finished == len(urls)
+                    or loop.time() - last_flush >= settings.BENCHMARK_PROGRESS_INTERVAL_SECONDS
+                ):
+                    await self._flush_progress(benchmark_id, new_rows, matrix, finished, failed)
+                    new_rows = []
+                    last_flush = loop.time()
+
+            await self._store_final_standings(matrix, matrix_rows)
+            await self.db.benchmarks.update_one(
+                {"_id": ObjectId(benchmark_id)},
+                {"$set": {"status": "completed", "completed_at": datetime.utcnow()}}
+            )
+            print(f"✅ Benchmark {benchmark_id}: {finished - failed}/{finished} sites scored")
+
+        except Exception as e:
+            print(f"❌ Benchmark {benchmark_id}: Failed with error: {e}")
+            import traceback
+            traceback.print_exc()
+
+            await self.db.benchmarks.update_one(
+                {"_id": ObjectId(benchmark_id)},
+                {
+                    "$set": {
+                        "status": "failed",
+                        "error_message": str(e),
+                        "completed_at": datetime.utcnow()
+                    }
+                }
+            )
+        finally:
+            for task in workers:
+                task.cancel()
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.analysis_store import AnalysisStore, ANALYZER_SECTIONS
+
+
+# Sections the chat context is built from
+CHAT_SECTIONS = ANALYZER_SECTIONS + ["ai_summary", "priority_recommendations"]
+
+
+class ChatContextService:
+    """Prepared chat context per analysis, plus a rolling summary of older turns"""
+
+    @classmethod
+    async def get_context(cls, db, analysis_id: str) -> Optional[Dict]:
+        """
+        Cached context for a completed analysis, built on first use.
+        Returns None if the analysis does not exist, or {"status": ...} if it is not completed.
+        """
+        cached = await db.chat_contexts.find_one({"_id": analysis_id})
+        if cached and cached.get("context"):
+            return cached
+
+        analysis = await AnalysisStore.get(db, analysis_id, CHAT_SECTIONS)
+        if analysis is None:
+            return None
+        if analysis["status"] != "completed":
+            return {"status": analysis["status"]}
+
+        prepared = {
+            "status": "completed",
+            "context": AIService().build_chat_context(analysis),
+            "website_url": analysis["website_url"],
+            "overall_score": analysis.get("overall_score"),
+            **AnalysisStore.header_fields(analysis),
+            "updated_at": datetime.utcnow()
+        }
+        # The conversation summary is kept across rebuilds
+        await db.chat_contexts.update_one({"_id": analysis_id}, {"$set": prepared}, upsert=True)
+        return {**(cached or {}), **prepared, "_id": analysis_id}
+
+    @classmethod
+    async def invalidate(cls, db, analysis_id: str):
+        """Drop the prepared context after the analysis results changed"""
+        await db.chat_contexts.update_one({"_id": analysis_id}, {"$unset": {"context": ""}})
+
+    @classmethod
+    def score_view(cls, context: Dict) -> Dict:
+        """Analysis-shaped dict with just the scores, for fallback responses"""
+        scores = context.get("scores", {})
+        return {
+            "website_url": context.get("website_url"),
+            "overall_score": context.get("overall_score") or 0,
+            **{section: {"score": scores.get(section) or 0} for section in ANALYZER_SECTIONS}
+        }
+
+    @classmethod
+    def _unsummarized_query(cls, analysis_id: str, context: Dict) -> Dict:
+        query = {"analysis_id": analysis_id}
+        if context.get("summarized_until"):
+            query["created_at"] = {"$gt": context["summarized_until"]}
+        return query
+
+    @classmethod
+    async def recent_messages(cls, db, analysis_id: str, context: Dict) -> List[Dict]:
+        """Messages not yet folded into the summary, oldest first, newest window only"""
+        limit = settings.CHAT_RECENT_MESSAGES + settings.CHAT_SUMMARY_BATCH
+        messages = await db.chat_messages.find(
+            cls._unsummarized_query(analysis_id, context),
+            {"role": 1, "message": 1, "created_at": 1}
+        ).sort("created_at", -1).limit(limit).to_list(length=limit)
+        messages.reverse()
+        return messages
+
+    @classmethod
+    def should_fold(cls, unsummarized_count: int) -> bool:
+        """Whether enough messages have aged out of the recent window to summarize"""
+        return unsummarized_count - settings.CHAT_RECENT_MESSAGES >= settings.CHAT_SUMMARY_BATCH
+
+    @classmethod
+    async def fold_history(cls, db, analysis_id: str):
+        """Summarize every message older than the recent window into the rolling summary"""
+        context = await db.chat_contexts.find_one(
+            {"_id": analysis_id}, {"summary": 1, "summarized_until": 1}
+        )
+        if not context:
+            return
+
+        messages = await db.chat_messages.find(
+            cls._unsummarized_query(analysis_id, context),
+            {"role": 1, "message": 1, "created_at": 1}
+        ).sort("created_at", 1).to_list(length=None)
+
+        older = messages[:-settings.CHAT_RECENT_MESSAGES]
+        if len(older) < settings.CHAT_SUMMARY_BATCH:
+            return
+
+        try:
+            summary = await AIService().summarize_conversation(context.get("summary"), older)
+        except Exception as e:
+            print(f"⚠️ Could not summarize chat for {analysis_id}: {e}")
+            return
+
+        # Guarded on the previous position so concurrent folds apply only once
+        await db.chat_contexts.update_one(
+            {"_id": analysis_id, "summarized_until": context.get("summarized_until")},
+            {"$set": {"summary": summary, "summarized_until": older[-1]["created_at"]}}
+        )
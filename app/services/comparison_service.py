@@ -1,17 +1,31 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
-from typing import List, Dict
+from typing import Awaitable, Callable, List, Dict, Optional
 import asyncio
 
+from app.core.config import settings
 from app.core.database import get_database
-from app.analyzers.ux_analyzer import UXAnalyzer
-from app.analyzers.seo_analyzer import SEOAnalyzer
-from app.analyzers.performance_analyzer import PerformanceAnalyzer
-from app.analyzers.content_analyzer import ContentAnalyzer
-from app.analyzers.security_analyzer import SecurityAnalyzer
-from app.analyzers.image_analyzer import ImageAnalyzer
+from app.analyzers.executor import run_analyzers
 from app.services.ai_service import AIService
+from app.services.analysis_store import AnalysisStore
 from app.services.comparison_pdf_service import ComparisonPDFService
+from app.services.share_service import ShareService
+from app.services.percentile_service import PercentileService
+from app.utils.urls import normalize_domain
+from app.utils.retry import backoff_delay
+
+
+# Analyzer sections scored in comparisons: (category key, display name, weight).
+# Weights optimized for competitive analysis accuracy (they differ from the registry's
+# overall-score weights)
+COMPARISON_CATEGORIES = {
+    "ux_analysis": ("ux", "UX", 0.18),                          # UX drives conversions
+    "seo_analysis": ("seo", "SEO", 0.22),                       # SEO is critical for visibility
+    "performance_analysis": ("performance", "Performance", 0.20),  # Performance affects user experience
+    "content_analysis": ("content", "Content", 0.17),           # Content quality matters
+    "security_analysis": ("security", "Security", 0.15),        # Security builds trust
+    "image_analysis": ("images", "Image", 0.08),                # Important but less critical
+}
 
 
 class ComparisonService:
@@ -21,18 +35,25 @@ class ComparisonService:
         self.db = get_database()
         self.ai_service = AIService()
     
-    async def create_comparison(self, your_url: str, competitor_urls: List[str], user_id: str = None) -> str:
-        """Create a new comparison analysis"""
+    async def create_comparison(self, your_url: str, competitor_urls: List[str], user_id: str = None,
+                                analysis_ids: Optional[Dict[str, str]] = None) -> str:
+        """
+        Create a new comparison analysis.
+        `analysis_ids` maps participant URLs to existing analyses whose results are reused.
+        """
+        analysis_ids = analysis_ids or {}
         
         # Create comparison record
         comparison = {
             "user_id": user_id,
             "your_website": {
                 "url": your_url,
+                "analysis_id": analysis_ids.get(your_url),
                 "analysis_data": None
             },
             "competitors": [
-                {"url": url, "analysis_data": None} for url in competitor_urls
+                {"url": url, "analysis_id": analysis_ids.get(url), "analysis_data": None}
+                for url in competitor_urls
             ],
             "rankings": None,
             "insights": None,
@@ -58,23 +79,45 @@ class ComparisonService:
         try:
             print(f"📊 Comparison {comparison_id}: Starting analysis...")
             
-            # Update status
-            await self.db.comparisons.update_one(
+            # Update status and read the URLs in one round-trip
+            comparison = await self.db.comparisons.find_one_and_update(
                 {"_id": ObjectId(comparison_id)},
-                {"$set": {"status": "processing"}}
+                {"$set": {"status": "processing"}},
+                projection={"your_website": 1, "competitors": 1}
             )
             
-            # Get comparison data
-            comparison = await self.db.comparisons.find_one({"_id": ObjectId(comparison_id)})
-            
-            your_url = comparison["your_website"]["url"]
-            competitor_urls = [c["url"] for c in comparison["competitors"]]
-            
-            # Analyze all websites in parallel
-            print(f"📊 Comparison {comparison_id}: Analyzing {len(competitor_urls) + 1} websites...")
+            participants = [comparison["your_website"]] + comparison["competitors"]
+            your_url = participants[0]["url"]
+            competitor_urls = [c["url"] for c in participants[1:]]
+            
+            # Reuse stored analyzer results where possible, analyze the rest in parallel
+            stored_results = await asyncio.gather(*[
+                self._load_stored_result(participant["url"], participant.get("analysis_id"))
+                for participant in participants
+            ])
+            missing_urls = [
+                participant["url"]
+                for participant, result in zip(participants, stored_results)
+                if result is None
+            ]
+            print(
+                f"📊 Comparison {comparison_id}: Reusing {len(participants) - len(missing_urls)} stored "
+                f"analyses, analyzing {len(missing_urls)} websites..."
+            )
             
-            all_urls = [your_url] + competitor_urls
-            analysis_results = await self._analyze_websites(all_urls)
+            crawled_results = iter(await self._analyze_websites(missing_urls))
+            analysis_results = [result or next(crawled_results) for result in stored_results]
+            
+            # Industry standing per category; the comparison's overall score uses its own
+            # weights, so it is not ranked against the analyses' overall distribution
+            for result in analysis_results:
+                if not result.get("error"):
+                    result["industry_percentiles"] = await PercentileService.percentiles(
+                        self.db,
+                        None,
+                        {section: result[section].get("score") for section in COMPARISON_CATEGORIES},
+                        normalize_domain(result["url"])
+                    )
             
             # Separate your website from competitors
             your_analysis = analysis_results[0]
@@ -134,10 +177,12 @@ class ComparisonService:
                 {"_id": ObjectId(comparison_id)},
                 {
                     "$set": {
+                        "your_website.analysis_id": your_analysis.get("analysis_id"),
                         "your_website.analysis_data": your_analysis,
                         "competitors": [
                             {
                                 "url": competitor_urls[i],
+                                "analysis_id": competitor_analyses[i].get("analysis_id"),
                                 "analysis_data": competitor_analyses[i]
                             }
                             for i in range(len(competitor_urls))
@@ -152,6 +197,7 @@ class ComparisonService:
                 }
             )
             
+            await ShareService.purge(self.db, comparison_id=comparison_id)
             print(f"✅ Comparison {comparison_id}: Completed successfully!")
             
         except Exception as e:
@@ -170,167 +216,193 @@ class ComparisonService:
                 }
             )
     
+    @staticmethod
+    def _grade(score: float) -> str:
+        """Letter grade for a 0-100 score"""
+        if score >= 90: return 'A'
+        elif score >= 80: return 'B'
+        elif score >= 70: return 'C'
+        elif score >= 60: return 'D'
+        else: return 'F'
+    
+    def _build_site_result(self, url: str, results: Dict) -> Dict:
+        """Validate per-analyzer results (keyed by section) and score one website"""
+        
+        # Enhanced error handling with detailed logging
+        def safe_result(result, analyzer_name, default_score=0):
+            if isinstance(result, Exception):
+                print(f"⚠️  {analyzer_name} failed for {url}: {result}")
+                return {
+                    "score": default_score, 
+                    "issues": [f"{analyzer_name} analysis failed"],
+                    "recommendations": [],
+                    "error": str(result)
+                }
+            
+            # Validate result structure
+            if not isinstance(result, dict) or "score" not in result:
+                print(f"⚠️  {analyzer_name} returned invalid data for {url}")
+                return {
+                    "score": default_score,
+                    "issues": [f"{analyzer_name} returned invalid data"],
+                    "recommendations": []
+                }
+            
+            # Ensure score is within valid range
+            score = result.get("score", default_score)
+            if not isinstance(score, (int, float)) or score < 0 or score > 100:
+                print(f"⚠️  {analyzer_name} returned invalid score: {score}")
+                result["score"] = max(0, min(100, default_score))
+            
+            return result
+        
+        sections = {
+            section: safe_result(results.get(section), name)
+            for section, (_, name, _) in COMPARISON_CATEGORIES.items()
+        }
+        weights = {key: weight for key, _, weight in COMPARISON_CATEGORIES.values()}
+        
+        overall_score = sum(
+            sections[section].get("score", 0) * weight
+            for section, (_, _, weight) in COMPARISON_CATEGORIES.items()
+        )
+        
+        # Calculate confidence score based on successful analyzers
+        successful_analyzers = sum(1 for r in sections.values() if not r.get('error'))
+        confidence = (successful_analyzers / len(sections)) * 100
+        
+        analysis_data = {
+            "url": url,
+            "overall_score": round(overall_score, 2),
+            "confidence": round(confidence, 1),
+            "overall_grade": self._grade(overall_score),
+            **sections,
+            "category_grades": {
+                key: self._grade(sections[section].get("score", 0))
+                for section, (key, _, _) in COMPARISON_CATEGORIES.items()
+            },
+            "weights_used": weights,
+            "analysis_timestamp": datetime.utcnow().isoformat()
+        }
+        
+        print(f"✅ {url}: Score={overall_score:.1f}, Confidence={confidence:.1f}%, Grade={self._grade(overall_score)}")
+        return analysis_data
+    
+    async def _find_reusable_analysis(self, url: str) -> Optional[str]:
+        """Most recent completed analysis of this exact URL, if it is fresh enough to reuse"""
+        if settings.COMPARISON_REUSE_MAX_AGE_HOURS <= 0:
+            return None
+        
+        # Analyzer output depends only on the public page, so any owner's run will do
+        # (quick scans only read the start of the page)
+        cutoff = datetime.utcnow() - timedelta(hours=settings.COMPARISON_REUSE_MAX_AGE_HOURS)
+        analysis = await self.db.analyses.find_one(
+            {"website_url": url, "status": "completed", "completed_at": {"$gte": cutoff}, "profile": {"$ne": "quick"}},
+            {"_id": 1},
+            sort=[("completed_at", -1)]
+        )
+        return str(analysis["_id"]) if analysis else None
+    
+    async def _load_stored_result(self, url: str, analysis_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Comparison entry built from stored analyzer results instead of a new crawl:
+        the given analysis, or else a fresh-enough completed analysis of the same URL.
+        Returns None when the site has to be analyzed.
+        """
+        try:
+            analysis_id = analysis_id or await self._find_reusable_analysis(url)
+            if not analysis_id:
+                return None
+            analysis = await AnalysisStore.get(self.db, analysis_id, COMPARISON_CATEGORIES)
+        except Exception as e:
+            print(f"⚠️  Could not load stored results for {url}: {e}")
+            return None
+        
+        if (
+            not analysis
+            or analysis.get("status") != "completed"
+            or not all(isinstance(analysis.get(section), dict) for section in COMPARISON_CATEGORIES)
+        ):
+            return None
+        
+        print(f"♻️  {url}: Reusing analysis {analysis_id}")
+        result = self._build_site_result(url, {section: analysis[section] for section in COMPARISON_CATEGORIES})
+        result["analysis_id"] = analysis_id
+        if analysis.get("completed_at"):
+            result["analysis_timestamp"] = analysis["completed_at"].isoformat()
+        return result
+    
+    @staticmethod
+    def _failed(result) -> bool:
+        """Whether an attempt raised or an analyzer reported its own failure"""
+        return isinstance(result, Exception) or (isinstance(result, dict) and bool(result.get("error")))
+    
+    async def _retry_within_budget(self, name: str, url: str, call: Callable[[], Awaitable], deadline: float):
+        """
+        Await `call()` until it succeeds, retrying just this step with jittered backoff while
+        the site's deadline allows. Returns the first success, else the last failure.
+        """
+        loop = asyncio.get_running_loop()
+        result = asyncio.TimeoutError(f"{name} skipped: site time budget exhausted")
+        
+        for attempt in range(settings.COMPARISON_ANALYZER_RETRIES + 1):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            
+            try:
+                result = await asyncio.wait_for(
+                    call(), timeout=min(remaining, settings.COMPARISON_ANALYZER_TIMEOUT_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                result = asyncio.TimeoutError(f"{name} timed out")
+            except Exception as e:
+                result = e
+            
+            if not self._failed(result):
+                return result
+            
+            delay = backoff_delay(attempt, settings.COMPARISON_RETRY_BASE_DELAY_SECONDS)
+            if attempt == settings.COMPARISON_ANALYZER_RETRIES or loop.time() + delay >= deadline:
+                break
+            print(f"⚠️  {name} failed for {url} (attempt {attempt + 1}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        
+        return result
+    
+    async def _analyze_website(self, url: str) -> Dict:
+        """
+        Run the comparison analyzers on shared inputs (the page is fetched once). Failing
+        stages and analyzers are retried on their own within the site's time budget;
+        analyzers that succeeded are kept.
+        """
+        deadline = asyncio.get_running_loop().time() + settings.COMPARISON_SITE_BUDGET_SECONDS
+        print(f"🔍 Analyzing {url}")
+        
+        async def run_step(name: str, call: Callable[[], Awaitable]):
+            return await self._retry_within_budget(name, url, call, deadline)
+        
+        results, stages = await run_analyzers(url, list(COMPARISON_CATEGORIES), run_step=run_step)
+        if self._failed(stages["page"]):
+            print(f"❌ {url}: Could not fetch page: {stages['page']}")
+            return {
+                "url": url,
+                "overall_score": 0,
+                "confidence": 0,
+                "error": "Website could not be fetched - it may be slow or unresponsive"
+            }
+        
+        return self._build_site_result(url, results)
+    
     async def _analyze_websites(self, urls: List[str]) -> List[Dict]:
         """Analyze multiple websites in parallel with enhanced accuracy"""
         
-        async def analyze_single_website(url: str) -> Dict:
-            """Analyze a single website with retry logic and validation"""
-            max_retries = 2
-            retry_count = 0
-            
-            while retry_count <= max_retries:
-                try:
-                    print(f"🔍 Analyzing {url} (attempt {retry_count + 1}/{max_retries + 1})")
-                    
-                    # Initialize analyzers
-                    ux_analyzer = UXAnalyzer()
-                    seo_analyzer = SEOAnalyzer()
-                    performance_analyzer = PerformanceAnalyzer()
-                    content_analyzer = ContentAnalyzer()
-                    security_analyzer = SecurityAnalyzer()
-                    image_analyzer = ImageAnalyzer()
-                    
-                    # Run all analyzers in parallel with timeout
-                    results = await asyncio.wait_for(
-                        asyncio.gather(
-                            ux_analyzer.analyze(url),
-                            seo_analyzer.analyze(url),
-                            performance_analyzer.analyze(url),
-                            content_analyzer.analyze(url),
-                            security_analyzer.analyze(url),
-                            image_analyzer.analyze(url),
-                            return_exceptions=True
-                        ),
-                        timeout=120  # 2 minute timeout per website
-                    )
-                    
-                    ux_result, seo_result, perf_result, content_result, security_result, image_result = results
-                    
-                    # Enhanced error handling with detailed logging
-                    def safe_result(result, analyzer_name, default_score=0):
-                        if isinstance(result, Exception):
-                            print(f"⚠️  {analyzer_name} failed for {url}: {result}")
-                            return {
-                                "score": default_score, 
-                                "issues": [f"{analyzer_name} analysis failed"],
-                                "recommendations": [],
-                                "error": str(result)
-                            }
-                        
-                        # Validate result structure
-                        if not isinstance(result, dict) or "score" not in result:
-                            print(f"⚠️  {analyzer_name} returned invalid data for {url}")
-                            return {
-                                "score": default_score,
-                                "issues": [f"{analyzer_name} returned invalid data"],
-                                "recommendations": []
-                            }
-                        
-                        # Ensure score is within valid range
-                        score = result.get("score", default_score)
-                        if not isinstance(score, (int, float)) or score < 0 or score > 100:
-                            print(f"⚠️  {analyzer_name} returned invalid score: {score}")
-                            result["score"] = max(0, min(100, default_score))
-                        
-                        return result
-                    
-                    ux_result = safe_result(ux_result, "UX")
-                    seo_result = safe_result(seo_result, "SEO")
-                    perf_result = safe_result(perf_result, "Performance")
-                    content_result = safe_result(content_result, "Content")
-                    security_result = safe_result(security_result, "Security")
-                    image_result = safe_result(image_result, "Image")
-                    
-                    # Enhanced weighted scoring with industry standards
-                    # Weights optimized for competitive analysis accuracy
-                    weights = {
-                        'seo': 0.22,        # SEO is critical for visibility
-                        'performance': 0.20, # Performance affects user experience
-                        'ux': 0.18,         # UX drives conversions
-                        'content': 0.17,    # Content quality matters
-                        'security': 0.15,   # Security builds trust
-                        'images': 0.08      # Image optimization is important but less critical
-                    }
-                    
-                    overall_score = (
-                        ux_result.get("score", 0) * weights['ux'] +
-                        seo_result.get("score", 0) * weights['seo'] +
-                        perf_result.get("score", 0) * weights['performance'] +
-                        content_result.get("score", 0) * weights['content'] +
-                        security_result.get("score", 0) * weights['security'] +
-                        image_result.get("score", 0) * weights['images']
-                    )
-                    
-                    # Calculate confidence score based on successful analyzers
-                    successful_analyzers = sum([
-                        1 for r in [ux_result, seo_result, perf_result, content_result, security_result, image_result]
-                        if not r.get('error')
-                    ])
-                    confidence = (successful_analyzers / 6) * 100
-                    
-                    # Calculate category grades
-                    def get_grade(score):
-                        if score >= 90: return 'A'
-                        elif score >= 80: return 'B'
-                        elif score >= 70: return 'C'
-                        elif score >= 60: return 'D'
-                        else: return 'F'
-                    
-                    analysis_data = {
-                        "url": url,
-                        "overall_score": round(overall_score, 2),
-                        "confidence": round(confidence, 1),
-                        "overall_grade": get_grade(overall_score),
-                        "ux_analysis": ux_result,
-                        "seo_analysis": seo_result,
-                        "performance_analysis": perf_result,
-                        "content_analysis": content_result,
-                        "security_analysis": security_result,
-                        "image_analysis": image_result,
-                        "category_grades": {
-                            "ux": get_grade(ux_result.get("score", 0)),
-                            "seo": get_grade(seo_result.get("score", 0)),
-                            "performance": get_grade(perf_result.get("score", 0)),
-                            "content": get_grade(content_result.get("score", 0)),
-                            "security": get_grade(security_result.get("score", 0)),
-                            "images": get_grade(image_result.get("score", 0))
-                        },
-                        "weights_used": weights,
-                        "analysis_timestamp": datetime.utcnow().isoformat()
-                    }
-                    
-                    print(f"✅ {url}: Score={overall_score:.1f}, Confidence={confidence:.1f}%, Grade={get_grade(overall_score)}")
-                    return analysis_data
-                    
-                except asyncio.TimeoutError:
-                    retry_count += 1
-                    if retry_count > max_retries:
-                        print(f"❌ {url}: Analysis timeout after {max_retries + 1} attempts")
-                        return {
-                            "url": url,
-                            "overall_score": 0,
-                            "confidence": 0,
-                            "error": "Analysis timeout - website may be slow or unresponsive"
-                        }
-                    print(f"⏱️  {url}: Timeout, retrying...")
-                    await asyncio.sleep(2)
-                    
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count > max_retries:
-                        print(f"❌ {url}: Analysis failed after {max_retries + 1} attempts: {e}")
-                        return {
-                            "url": url,
-                            "overall_score": 0,
-                            "confidence": 0,
-                            "error": str(e)
-                        }
-                    print(f"⚠️  {url}: Error, retrying... {e}")
-                    await asyncio.sleep(2)
+        if not urls:
+            return []
         
         # Analyze all websites in parallel with progress tracking
         print(f"🚀 Starting parallel analysis of {len(urls)} websites...")
-        results = await asyncio.gather(*[analyze_single_website(url) for url in urls])
+        results = await asyncio.gather(*[self._analyze_website(url) for url in urls])
         
         # Log summary
         successful = sum(1 for r in results if r.get('overall_score', 0) > 0)
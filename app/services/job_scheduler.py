@@ -0,0 +1,157 @@
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from app.core.config import settings
+
+
+PLANS = ["enterprise", "pro", "basic", "free"]
+
+
+def plan_weight(plan: str) -> float:
+    """Share of analysis slots a plan's queue gets while every queue is busy"""
+    weights = {
+        "free": settings.SCHEDULER_WEIGHT_FREE,
+        "basic": settings.SCHEDULER_WEIGHT_BASIC,
+        "pro": settings.SCHEDULER_WEIGHT_PRO,
+        "enterprise": settings.SCHEDULER_WEIGHT_ENTERPRISE
+    }
+    return weights.get(plan, settings.SCHEDULER_WEIGHT_FREE)
+
+
+def plan_in_flight(plan: str) -> int:
+    """Analyses one user of a plan may have running at once"""
+    caps = {
+        "free": settings.SCHEDULER_USER_IN_FLIGHT_FREE,
+        "basic": settings.SCHEDULER_USER_IN_FLIGHT_BASIC,
+        "pro": settings.SCHEDULER_USER_IN_FLIGHT_PRO,
+        "enterprise": settings.SCHEDULER_USER_IN_FLIGHT_ENTERPRISE
+    }
+    return caps.get(plan, settings.SCHEDULER_USER_IN_FLIGHT_FREE)
+
+
+class _Job:
+    __slots__ = ("plan", "user_id", "start", "finish", "enqueued", "admitted")
+
+    def __init__(self, plan: str, user_id: Optional[str], start: float, finish: float):
+        self.plan = plan
+        self.user_id = user_id
+        self.start = start
+        self.finish = finish
+        self.enqueued = time.monotonic()
+        self.admitted = asyncio.get_running_loop().create_future()
+
+
+class AnalysisScheduler:
+    """
+    Admits analyses to ANALYSIS_CONCURRENCY slots with weighted fair queuing by plan: each
+    plan's queue gets slots in proportion to its weight, so paying plans overtake free
+    traffic during spikes without shutting it out. A user never has more than their
+    plan's in-flight cap running, and a job waiting SCHEDULER_STARVATION_SECONDS is
+    admitted ahead of fair order.
+    """
+
+    def __init__(self):
+        self._waiting: List[_Job] = []
+        self._running = 0
+        self._user_running: Dict[str, int] = defaultdict(int)
+        self._plan_running: Dict[str, int] = defaultdict(int)
+        # Virtual clock advancing with the start tag of each admitted job
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = defaultdict(float)
+        self._waits: Dict[str, Deque[Tuple[float, float]]] = defaultdict(deque)
+
+    async def run(self, plan: str, user_id: Optional[str], call: Callable[[], Awaitable]):
+        """Wait for a slot, then await call() in it"""
+        job = await self.acquire(plan, user_id)
+        try:
+            return await call()
+        finally:
+            self.release(job)
+
+    async def acquire(self, plan: str, user_id: Optional[str]) -> _Job:
+        plan = plan if plan in PLANS else "free"
+        start = max(self._virtual_time, self._last_finish[plan])
+        job = _Job(plan, user_id, start, start + 1 / plan_weight(plan))
+        self._last_finish[plan] = job.finish
+        self._waiting.append(job)
+        self._dispatch()
+
+        try:
+            await job.admitted
+        except asyncio.CancelledError:
+            if job in self._waiting:
+                self._waiting.remove(job)
+            else:
+                # Admitted just before the cancellation arrived
+                self.release(job)
+            raise
+        return job
+
+    def release(self, job: _Job):
+        self._running -= 1
+        self._plan_running[job.plan] -= 1
+        if job.user_id:
+            self._user_running[job.user_id] -= 1
+            if not self._user_running[job.user_id]:
+                del self._user_running[job.user_id]
+        self._dispatch()
+
+    def _next(self) -> Optional[_Job]:
+        eligible = [
+            job for job in self._waiting
+            if not job.user_id or self._user_running[job.user_id] < plan_in_flight(job.plan)
+        ]
+        if not eligible:
+            return None
+        cutoff = time.monotonic() - settings.SCHEDULER_STARVATION_SECONDS
+        starving = [job for job in eligible if job.enqueued <= cutoff]
+        if starving:
+            return min(starving, key=lambda job: job.enqueued)
+        return min(eligible, key=lambda job: (job.finish, job.enqueued))
+
+    def _dispatch(self):
+        while self._running < settings.ANALYSIS_CONCURRENCY:
+            job = self._next()
+            if job is None:
+                return
+            self._waiting.remove(job)
+            self._running += 1
+            self._plan_running[job.plan] += 1
+            if job.user_id:
+                self._user_running[job.user_id] += 1
+            self._virtual_time = max(self._virtual_time, job.start)
+
+            now = time.monotonic()
+            self._waits[job.plan].append((now, now - job.enqueued))
+            job.admitted.set_result(None)
+
+    def metrics(self) -> Dict:
+        """Queue depth, running analyses and wait times (last window) per plan"""
+        now = time.monotonic()
+        cutoff = now - settings.SCHEDULER_METRICS_WINDOW_SECONDS
+        plans = {}
+        for plan in PLANS:
+            waits = self._waits[plan]
+            while waits and waits[0][0] < cutoff:
+                waits.popleft()
+            recent = sorted(wait for _, wait in waits)
+            queued = [job for job in self._waiting if job.plan == plan]
+            plans[plan] = {
+                "queued": len(queued),
+                "running": self._plan_running[plan],
+                "oldest_wait_seconds": round(max((now - job.enqueued for job in queued), default=0), 2),
+                "admitted": len(recent),
+                "avg_wait_seconds": round(sum(recent) / len(recent), 2) if recent else 0,
+                "p95_wait_seconds": round(recent[int(0.95 * (len(recent) - 1))], 2) if recent else 0
+            }
+        return {
+            "concurrency": settings.ANALYSIS_CONCURRENCY,
+            "running": self._running,
+            "queued": len(self._waiting),
+            "plans": plans
+        }
+
+
+analysis_scheduler = AnalysisScheduler()
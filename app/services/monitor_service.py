@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from typing import Dict, Optional, Set
+import asyncio
+import random
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.services.analysis_service import perform_website_analysis
+from app.services.job_scheduler import analysis_scheduler
+from app.services.stats_service import UserStatsService
+from app.utils.rate_limiter import check_rate_limit
+from app.utils.urls import normalize_domain
+
+
+def next_run_at(now: datetime, cadence_hours: float, first: bool = False) -> datetime:
+    """
+    When a monitor runs next: one cadence later, moved by up to MONITOR_JITTER of it
+    either way. A new monitor starts within the first MONITOR_JITTER of a cadence, so
+    monitors registered together never fire together.
+    """
+    cadence = cadence_hours * 3600
+    if first:
+        return now + timedelta(seconds=random.uniform(0, cadence * settings.MONITOR_JITTER))
+    jitter = random.uniform(-settings.MONITOR_JITTER, settings.MONITOR_JITTER)
+    return now + timedelta(seconds=cadence * (1 + jitter))
+
+
+class MonitorService:
+    """Websites re-analyzed on a cadence, with reports regenerated only when they change"""
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def create_monitor(self, website_url: str, cadence_hours: float, user_id: str, plan: str) -> Dict:
+        """Register a URL for monitoring; its first run is spread into the first cadence"""
+        now = datetime.utcnow()
+        monitor = {
+            "user_id": user_id,
+            "website_url": website_url,
+            "domain": normalize_domain(website_url),
+            "plan": plan,
+            "cadence_hours": cadence_hours,
+            "active": True,
+            "next_run_at": next_run_at(now, cadence_hours, first=True),
+            "last_run_at": None,
+            "last_analysis_id": None,
+            "last_overall_score": None,
+            # Run whose AI insights and PDF are current; later runs are compared against it
+            "baseline": None,
+            "runs": 0,
+            "regenerations": 0,
+            "failures": 0,
+            "last_error": None,
+            "created_at": now
+        }
+        result = await self.db.monitors.insert_one(monitor)
+        monitor["_id"] = result.inserted_id
+        return monitor
+
+    async def claim_due(self) -> Optional[Dict]:
+        """
+        Atomically take the most overdue monitor. Its next run is pushed out by a lease,
+        so other workers skip it, and a run lost with its process is retried later.
+        """
+        now = datetime.utcnow()
+        return await self.db.monitors.find_one_and_update(
+            {"active": True, "next_run_at": {"$lte": now}},
+            {"$set": {"next_run_at": now + timedelta(seconds=settings.MONITOR_LEASE_SECONDS)}},
+            sort=[("next_run_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def run_monitor(self, monitor: Dict):
+        """Re-analyze a monitored URL, reusing the baseline's reports when nothing changed"""
+        monitor_id = str(monitor["_id"])
+        user_id = monitor["user_id"]
+        now = datetime.utcnow()
+        update = {
+            "$set": {
+                "last_run_at": now,
+                "next_run_at": next_run_at(now, monitor["cadence_hours"])
+            }
+        }
+
+        try:
+            # Monitoring runs count against the plan like any other analysis
+            await check_rate_limit(user_id, monitor.get("plan", "free"), self.db)
+        except HTTPException as e:
+            print(f"⚠️ Monitor {monitor_id}: Skipped, {e.detail}")
+            update["$set"]["last_error"] = e.detail
+            await self.db.monitors.update_one({"_id": monitor["_id"]}, update)
+            return
+
+        analysis = {
+            "user_id": user_id,
+            "monitor_id": monitor_id,
+            "website_url": monitor["website_url"],
+            "domain": monitor["domain"],
+            "plan": monitor.get("plan", "free"),
+            "status": "pending",
+            "created_at": now
+        }
+        result = await self.db.analyses.insert_one(analysis)
+        analysis_id = str(result.inserted_id)
+        await UserStatsService.record_created(self.db, user_id, now)
+
+        print(f"🔍 Monitor {monitor_id}: Re-analyzing {monitor['website_url']}")
+        await analysis_scheduler.run(
+            monitor.get("plan", "free"),
+            user_id,
+            lambda: perform_website_analysis(analysis_id, monitor["website_url"], monitor.get("baseline"))
+        )
+
+        header = await self.db.analyses.find_one(
+            {"_id": result.inserted_id},
+            {"status": 1, "overall_score": 1, "scores": 1, "fingerprint": 1, "reports_regenerated": 1,
+             "error_message": 1}
+        )
+        if not header or header["status"] != "completed":
+            update["$set"]["last_error"] = (header or {}).get("error_message", "Analysis failed")
+            update["$inc"] = {"failures": 1}
+            await self.db.monitors.update_one({"_id": monitor["_id"]}, update)
+            return
+
+        update["$set"].update({
+            "last_analysis_id": analysis_id,
+            "last_overall_score": header.get("overall_score"),
+            "last_error": None
+        })
+        update["$inc"] = {"runs": 1}
+        # First runs have no baseline and always generate their reports
+        if header.get("reports_regenerated", True):
+            update["$set"]["baseline"] = {
+                "analysis_id": analysis_id,
+                "fingerprint": header.get("fingerprint"),
+                "overall_score": header.get("overall_score"),
+                "scores": header.get("scores", {})
+            }
+            update["$inc"]["regenerations"] = 1
+        await self.db.monitors.update_one({"_id": monitor["_id"]}, update)
+        regenerated = header.get('reports_regenerated', True)
+        print(f"✅ Monitor {monitor_id}: Run complete (reports regenerated: {regenerated})")
+
+
+class MonitorScheduler:
+    """Polls for due monitors and runs up to MONITOR_CONCURRENCY of them at a time"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def start(self):
+        if self._task is None and settings.MONITOR_ENABLED:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Interrupted runs keep their lease and are picked up again after it expires
+        for task in list(self._running):
+            task.cancel()
+
+    async def _run_one(self, monitor: Dict):
+        try:
+            await MonitorService().run_monitor(monitor)
+        except Exception as e:
+            print(f"❌ Monitor {monitor['_id']}: Run failed with error: {e}")
+
+    async def _dispatch(self):
+        if get_database() is None:
+            return
+        service = MonitorService()
+        while len(self._running) < settings.MONITOR_CONCURRENCY:
+            monitor = await service.claim_due()
+            if monitor is None:
+                return
+            task = asyncio.create_task(self._run_one(monitor))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self):
+        while True:
+            try:
+                await self._dispatch()
+            except Exception as e:
+                print(f"⚠️ Monitor scheduler error: {e}")
+            await asyncio.sleep(settings.MONITOR_POLL_SECONDS)
+
+
+monitor_scheduler = MonitorScheduler()
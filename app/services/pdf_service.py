@@ -243,6 +243,16 @@ class PDFService:
                 ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
             ]))
             elements.append(score_wrapper)
+            
+            # Industry standing, when enough analyses have been recorded
+            percentiles = analysis_data.get('percentiles') or {}
+            if percentiles.get('overall') is not None:
+                elements.append(Spacer(1, 0.15*inch))
+                elements.append(Paragraph(
+                    f'<font color="#6B7280">Better than <b>{percentiles["overall"]:.0f}%</b> of '
+                    f'{percentiles["sample_size"]:,} analyzed websites</font>',
+                    ParagraphStyle('PercentileStyle', fontSize=11, alignment=TA_CENTER)
+                ))
             elements.append(Spacer(1, 0.35*inch))
             
             # Score Breakdown (6 analyzers)
@@ -376,6 +386,9 @@ class PDFService:
             ]
             
             for section_title, section_key, section_color, section_bg in sections:
+                # Analyses run with a subset of analyzers only report those
+                if section_key not in analysis_data:
+                    continue
                 section_data = analysis_data.get(section_key, {})
                 score = section_data.get('score', 0)
                 
@@ -384,7 +397,13 @@ class PDFService:
                 
                 section_elements.append(Paragraph(section_title, ParagraphStyle('SectionHeading', parent=heading_style, textColor=section_color)))
                 section_elements.append(HRFlowable(width="100%", thickness=2, color=section_color, spaceBefore=5, spaceAfter=10))
-                section_elements.append(Paragraph(f'<b>Score: <font color="{self._get_score_color(score)}">{score:.0f}/100</font></b>', 
+                standing = ''
+                if percentiles.get(section_key) is not None:
+                    standing = (f' <font size="10" color="#6B7280">'
+                                f'(better than {percentiles[section_key]:.0f}% of sites)</font>')
+                score_badge = (f'<b>Score: <font color="{self._get_score_color(score)}">{score:.0f}/100</font></b>'
+                               f'{standing}')
+                section_elements.append(Paragraph(score_badge,
                                         ParagraphStyle('ScoreBadge', fontSize=12, textColor=self.colors['gray_dark'])))
                 section_elements.append(Spacer(1, 0.15*inch))
                 
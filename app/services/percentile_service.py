@@ -0,0 +1,145 @@
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.write_batcher import write_behind
+from app.analyzers.profiles import get_profile
+from app.analyzers.registry import select_analyzers
+from app.services.analysis_store import ANALYZER_SECTIONS
+from app.utils.cache import TTLCache
+
+
+# Score distributions kept per segment: the overall score and every analyzer score
+METRICS = ["overall"] + ANALYZER_SECTIONS
+BUCKETS = 101  # One bucket per whole point, 0-100
+
+
+def score_bucket(score: float) -> int:
+    return min(max(int(score), 0), BUCKETS - 1)
+
+
+class ScoreSketch:
+    """Fixed-bucket histogram of one score, with cumulative counts for O(1) percentile ranks"""
+
+    def __init__(self, counts: List[int]):
+        self.counts = counts
+        self.total = sum(counts)
+        # Number of samples in the buckets below each bucket
+        self._below = [0] + list(accumulate(counts))[:-1]
+
+    @classmethod
+    def from_document(cls, histogram: Dict[str, int]) -> "ScoreSketch":
+        counts = [0] * BUCKETS
+        for bucket, count in histogram.items():
+            counts[int(bucket)] = count
+        return cls(counts)
+
+    def percentile_rank(self, score: float) -> Optional[float]:
+        """Share of samples below the score, counting its own bucket half (0-100)"""
+        if not self.total:
+            return None
+        bucket = score_bucket(score)
+        return round((self._below[bucket] + self.counts[bucket] / 2) / self.total * 100, 1)
+
+
+class PercentileService:
+    """Industry score distributions, updated as analyses complete, answering "better than X%" """
+
+    _cache = TTLCache(settings.PERCENTILE_CACHE_TTL_SECONDS, maxsize=256)
+
+    @classmethod
+    def segments(cls, domain: Optional[str] = None, plan: Optional[str] = None) -> List[str]:
+        """Sketch segments an analysis counts towards: everything, plus the configured ones"""
+        segments = ["all"]
+        enabled = {name.strip() for name in settings.PERCENTILE_SEGMENTS.split(",") if name.strip()}
+        if "tld" in enabled and domain and "." in domain:
+            segments.append(f"tld:{domain.rsplit('.', 1)[1]}")
+        if "plan" in enabled and plan:
+            segments.append(f"plan:{plan}")
+        return segments
+
+    @classmethod
+    def ranked_scores(cls, overall_score: Optional[float], scores: Dict[str, Optional[float]],
+                      profile: Optional[str] = None) -> Optional[Tuple[Optional[float], Dict]]:
+        """
+        What a completed analysis contributes to the histograms: nothing for runs whose
+        inputs were cut down (quick scans), and the overall score only when every default
+        analyzer ran (a subset's overall score is not comparable with full runs)
+        """
+        if not get_profile(profile or "standard").comparable:
+            return None
+        full_run = {spec.section for spec in select_analyzers()} <= set(scores)
+        return (overall_score if full_run else None), scores
+
+    @classmethod
+    async def record(cls, overall_score: Optional[float], scores: Dict[str, Optional[float]],
+                     domain: Optional[str] = None, plan: Optional[str] = None):
+        """Add a completed analysis to every segment it belongs to (buffered $inc)"""
+        values = {"overall": overall_score, **scores}
+        inc = {}
+        for metric in METRICS:
+            score = values.get(metric)
+            if isinstance(score, (int, float)):
+                inc[f"histograms.{metric}.{score_bucket(score)}"] = 1
+                inc[f"totals.{metric}"] = 1
+        if not inc:
+            return
+
+        await write_behind.enqueue("score_sketches", [
+            UpdateOne({"_id": segment}, {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}}, upsert=True)
+            for segment in cls.segments(domain, plan)
+        ])
+
+    @classmethod
+    async def load(cls, db, segment: str) -> Dict[str, ScoreSketch]:
+        """Sketches of a segment, from the in-process cache when fresh"""
+        sketches = cls._cache.get(segment)
+        if sketches is None:
+            document = await db.score_sketches.find_one({"_id": segment}, {"histograms": 1}) or {}
+            sketches = {
+                metric: ScoreSketch.from_document(histogram)
+                for metric, histogram in document.get("histograms", {}).items()
+            }
+            cls._cache.set(segment, sketches)
+        return sketches
+
+    @classmethod
+    def _ranks(cls, sketches: Dict[str, ScoreSketch], values: Dict[str, Optional[float]]) -> Optional[Dict]:
+        overall = sketches.get("overall")
+        if overall is None or overall.total < settings.PERCENTILE_MIN_SAMPLES:
+            return None
+
+        ranks = {"sample_size": overall.total}
+        for metric in METRICS:
+            sketch = sketches.get(metric)
+            if sketch is not None and isinstance(values.get(metric), (int, float)):
+                ranks[metric] = sketch.percentile_rank(values[metric])
+        return ranks
+
+    @classmethod
+    async def percentiles(cls, db, overall_score: Optional[float], scores: Dict[str, Optional[float]],
+                          domain: Optional[str] = None, plan: Optional[str] = None) -> Optional[Dict]:
+        """
+        Percentile ranks against all analyzed sites ({"overall": 73.4, "ux_analysis": ...,
+        "sample_size": n}), with narrower configured segments under "segments".
+        None until enough analyses have been recorded.
+        """
+        values = {"overall": overall_score, **scores}
+        segments = cls.segments(domain, plan)
+
+        try:
+            ranks = cls._ranks(await cls.load(db, segments[0]), values)
+            if ranks is None:
+                return None
+
+            ranks["segments"] = {}
+            for segment in segments[1:]:
+                segment_ranks = cls._ranks(await cls.load(db, segment), values)
+                if segment_ranks:
+                    ranks["segments"][segment] = segment_ranks
+            return ranks
+        except Exception as e:
+            print(f"⚠️ Could not compute percentiles: {e}")
+            return None
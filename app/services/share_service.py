@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Optional
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis import redis_client
+from app.core.write_batcher import bulk_write, write_behind
+
+
+# Share fields needed to serve a shared page (never the view counters)
+SHARE_PROJECTION = {
+    "analysis_id": 1,
+    "comparison_id": 1,
+    "type": 1,
+    "expires_at": 1,
+    "is_active": 1,
+    "password_hash": 1
+}
+
+VIEWS_KEY = "share:views"
+LAST_VIEWED_KEY = "share:last_viewed"
+BATCH_SUFFIX = ":batch"
+FLUSH_LOCK_KEY = "share:views:lock"
+FLUSH_LOCK_SECONDS = 30
+
+# Turn the live counters into the batch to flush, unless a previous batch is still pending.
+# KEYS: views, last_viewed, views batch, last_viewed batch. Returns 1 if there is a batch.
+CLAIM_BATCH_LUA = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return 1
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RENAME', KEYS[1], KEYS[3])
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('RENAME', KEYS[2], KEYS[4])
+end
+return 1
+"""
+
+_claim_batch_script = None
+
+
+def _share_key(share_token: str) -> str:
+    return f"share:token:{share_token}"
+
+
+# Shared resource types: the rendered response of a link is only served by its own route
+SHARE_TYPES = ["analysis", "comparison"]
+
+
+def share_type(share: Dict) -> str:
+    """Type of a share record (analysis links predate the "type" field)"""
+    return share.get("type") or "analysis"
+
+
+def _response_key(share_token: str, kind: str) -> str:
+    return f"share:response:{kind}:{share_token}"
+
+
+class ShareService:
+    """Share-token resolution and rendered shared pages cached in Redis, view counts buffered there too"""
+
+    @classmethod
+    async def resolve(cls, db, share_token: str) -> Optional[Dict]:
+        """Share record for a token, from Redis when possible"""
+        if redis_client.redis is not None:
+            try:
+                cached = await redis_client.get(_share_key(share_token))
+                if cached:
+                    share = json.loads(cached)
+                    share["expires_at"] = datetime.fromisoformat(share["expires_at"])
+                    return share
+            except Exception as e:
+                print(f"⚠️ Share cache read failed: {e}")
+
+        share = await db.shares.find_one({"share_token": share_token}, SHARE_PROJECTION)
+        if share is None:
+            return None
+
+        share.pop("_id", None)
+        if redis_client.redis is not None:
+            # Never cache past expiry, so an expired link cannot outlive its record
+            ttl = int((share["expires_at"] - datetime.utcnow()).total_seconds())
+            ttl = min(ttl, settings.SHARE_CACHE_TTL_SECONDS)
+            if ttl > 0:
+                try:
+                    await redis_client.set(_share_key(share_token), json.dumps(share, default=str), expire=ttl)
+                except Exception as e:
+                    print(f"⚠️ Share cache write failed: {e}")
+        return share
+
+    @classmethod
+    async def invalidate(cls, share_token: str):
+        """Forget a cached share record and its rendered response (after revocation)"""
+        if redis_client.redis is None:
+            return
+        try:
+            await redis_client.redis.delete(
+                _share_key(share_token), *[_response_key(share_token, kind) for kind in SHARE_TYPES]
+            )
+        except Exception as e:
+            print(f"⚠️ Share cache invalidation failed: {e}")
+
+    @staticmethod
+    def etag_for(share_token: str, version: str, body: bytes) -> str:
+        """Strong ETag over the token, the shared document's version and the exact body"""
+        digest = hashlib.sha256(f"{share_token}:{version}:".encode() + body).hexdigest()
+        return f'"{digest[:32]}"'
+
+    @classmethod
+    async def get_cached_response(cls, share_token: str, kind: str) -> Optional[Dict]:
+        """Rendered response {"etag", "body"} for a share link of this type, if cached"""
+        if redis_client.redis is None:
+            return None
+        try:
+            cached = await redis_client.get(_response_key(share_token, kind))
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            print(f"⚠️ Share response cache read failed: {e}")
+            return None
+
+    @classmethod
+    async def cache_response(cls, share_token: str, share: Dict, etag: str, body: bytes):
+        """Keep a rendered response until it is purged, its TTL ends or the link expires"""
+        if redis_client.redis is None:
+            return
+        ttl = int((share["expires_at"] - datetime.utcnow()).total_seconds())
+        ttl = min(ttl, settings.SHARE_RESPONSE_CACHE_TTL_SECONDS)
+        if ttl <= 0:
+            return
+        try:
+            await redis_client.set(
+                _response_key(share_token, share_type(share)),
+                json.dumps({"etag": etag, "body": body.decode()}),
+                expire=ttl
+            )
+        except Exception as e:
+            print(f"⚠️ Share response cache write failed: {e}")
+
+    @classmethod
+    async def purge(cls, db, analysis_id: Optional[str] = None, comparison_id: Optional[str] = None):
+        """Drop cached responses of every link sharing this analysis or comparison"""
+        if redis_client.redis is None:
+            return
+        query = {"analysis_id": analysis_id} if analysis_id else {"comparison_id": comparison_id}
+        kind = "analysis" if analysis_id else "comparison"
+        try:
+            tokens = [
+                share["share_token"]
+                async for share in db.shares.find(query, {"share_token": 1})
+            ]
+            if tokens:
+                await redis_client.redis.delete(*[_response_key(token, kind) for token in tokens])
+        except Exception as e:
+            print(f"⚠️ Share response cache purge failed: {e}")
+
+    @classmethod
+    async def record_view(cls, share_token: str):
+        """Count a view in Redis; falls back to a buffered Mongo $inc"""
+        now = datetime.utcnow()
+        if redis_client.redis is not None:
+            try:
+                pipe = redis_client.redis.pipeline(transaction=False)
+                pipe.hincrby(VIEWS_KEY, share_token, 1)
+                pipe.hset(LAST_VIEWED_KEY, share_token, now.isoformat())
+                await pipe.execute()
+                return
+            except Exception as e:
+                print(f"⚠️ Share view counter unavailable, writing to Mongo: {e}")
+
+        await write_behind.enqueue("shares", [UpdateOne(
+            {"share_token": share_token},
+            {"$inc": {"view_count": 1}, "$max": {"last_viewed_at": now}}
+        )])
+
+    @classmethod
+    async def flush_views(cls) -> int:
+        """
+        Move buffered view counts into Mongo with one bulk write.
+        The counters are renamed into a batch first, so views arriving meanwhile start a
+        new one; a batch left behind by a failed flush is retried on the next run.
+        Returns the number of share links updated.
+        """
+        global _claim_batch_script
+        redis = redis_client.redis
+
+        # One flusher at a time across workers
+        if not await redis.set(FLUSH_LOCK_KEY, "1", nx=True, ex=FLUSH_LOCK_SECONDS):
+            return 0
+
+        try:
+            if _claim_batch_script is None:
+                _claim_batch_script = redis.register_script(CLAIM_BATCH_LUA)
+            keys = [VIEWS_KEY, LAST_VIEWED_KEY, VIEWS_KEY + BATCH_SUFFIX, LAST_VIEWED_KEY + BATCH_SUFFIX]
+            if not await _claim_batch_script(keys=keys):
+                return 0
+
+            views = await redis.hgetall(keys[2])
+            last_viewed = await redis.hgetall(keys[3])
+            operations = []
+            for share_token, count in views.items():
+                update = {"$inc": {"view_count": int(count)}}
+                if share_token in last_viewed:
+                    update["$max"] = {"last_viewed_at": datetime.fromisoformat(last_viewed[share_token])}
+                operations.append(UpdateOne({"share_token": share_token}, update))
+
+            await bulk_write(get_database().shares, operations)
+            await redis.delete(keys[2], keys[3])
+            return len(operations)
+        finally:
+            await redis.delete(FLUSH_LOCK_KEY)
+
+
+class ShareViewFlusher:
+    """Periodically flushes buffered share view counts to Mongo"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._flush()
+
+    async def _flush(self):
+        if redis_client.redis is None or get_database() is None:
+            return
+        try:
+            await ShareService.flush_views()
+        except Exception as e:
+            print(f"⚠️ Failed to flush share view counts: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.SHARE_VIEW_FLUSH_INTERVAL_SECONDS)
+            await self._flush()
+
+
+share_view_flusher = ShareViewFlusher()
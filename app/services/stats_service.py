@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Union
+from pymongo.errors import DuplicateKeyError
+
+
+class UserStatsService:
+    """Per-user dashboard aggregates, maintained incrementally as analyses change"""
+
+    STATUSES = ["pending", "processing", "completed", "failed"]
+
+    # Same boundaries as the original $bucket aggregation; scores outside go to "Other"
+    SCORE_BOUNDARIES = [0, 20, 40, 60, 80, 100]
+
+    # Attempts of a rebuild whose aggregation raced incremental updates
+    REBUILD_ATTEMPTS = 3
+
+    @classmethod
+    def score_bucket(cls, score: float) -> Union[int, str]:
+        """Lower bound of the score bucket, matching $bucket semantics"""
+        for lower, upper in zip(cls.SCORE_BOUNDARIES, cls.SCORE_BOUNDARIES[1:]):
+            if lower <= score < upper:
+                return lower
+        return "Other"
+
+    @classmethod
+    async def record_created(cls, db, user_id: Optional[str], created_at: datetime, status: str = "pending",
+                             count: int = 1):
+        """Count newly created analyses"""
+        if not user_id:
+            return
+
+        await db.user_stats.update_one(
+            {"_id": user_id},
+            {
+                "$inc": {
+                    "total": count,
+                    f"status_counts.{status}": count,
+                    f"daily.{created_at.strftime('%Y-%m-%d')}": count,
+                    "version": 1
+                },
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+
+    @classmethod
+    async def record_transition(
+        cls,
+        db,
+        user_id: Optional[str],
+        from_status: Optional[str],
+        to_status: str,
+        score: Optional[float] = None
+    ):
+        """Move an analysis between status counters and account for its score"""
+        if not user_id or from_status == to_status:
+            return
+
+        inc = {f"status_counts.{to_status}": 1, "version": 1}
+        if from_status:
+            inc[f"status_counts.{from_status}"] = -1
+
+        if to_status == "completed" and score is not None:
+            inc["score_sum"] = score
+            inc["score_count"] = 1
+            inc[f"score_buckets.{cls.score_bucket(score)}"] = 1
+
+        await db.user_stats.update_one(
+            {"_id": user_id},
+            {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    @classmethod
+    async def get_stats(cls, db, user_id: str) -> Dict:
+        """Get the user's aggregates, rebuilding them once from history if needed"""
+        stats = await db.user_stats.find_one({"_id": user_id})
+        if stats and stats.get("initialized"):
+            return stats
+        return await cls.rebuild(db, user_id)
+
+    @classmethod
+    async def rebuild(cls, db, user_id: str) -> Dict:
+        """
+        Recompute a user's aggregates from the analyses collection.
+        Every incremental update bumps "version", and the result is only written if the
+        version is unchanged since the aggregation started (otherwise it is recomputed), so
+        a $inc landing mid-rebuild is never overwritten. If updates keep racing it, the
+        aggregates are returned unsaved and rebuilt on the next read.
+        """
+        for _ in range(cls.REBUILD_ATTEMPTS):
+            current = await db.user_stats.find_one({"_id": user_id}, {"version": 1})
+            version = (current or {}).get("version")
+            stats = await cls._aggregate(db, user_id)
+            stats["version"] = (version or 0) + 1
+            try:
+                result = await db.user_stats.update_one(
+                    {"_id": user_id, "version": version if version is not None else {"$exists": False}},
+                    {"$set": stats},
+                    upsert=current is None
+                )
+            except DuplicateKeyError:
+                # The first incremental update created the document meanwhile
+                continue
+            if result.matched_count or result.upserted_id is not None:
+                break
+        else:
+            print(f"⚠️ User stats for {user_id} changed during every rebuild attempt; not saved")
+            stats["initialized"] = False
+
+        stats["_id"] = user_id
+        return stats
+
+    @classmethod
+    async def _aggregate(cls, db, user_id: str) -> Dict:
+        """A user's aggregates computed from the analyses collection"""
+        status_counts = {status: 0 for status in cls.STATUSES}
+        async for row in db.analyses.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]):
+            status_counts[row["_id"]] = row["count"]
+
+        daily = {}
+        async for row in db.analyses.aggregate([
+            {"$match": {"user_id": user_id}},
+            {
+                "$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                    "count": {"$sum": 1}
+                }
+            }
+        ]):
+            daily[row["_id"]] = row["count"]
+
+        score_sum = 0.0
+        score_count = 0
+        score_buckets = {}
+        async for row in db.analyses.find(
+            {"user_id": user_id, "status": "completed", "overall_score": {"$exists": True}},
+            {"overall_score": 1}
+        ):
+            score = row["overall_score"]
+            if score is None:
+                continue
+            score_sum += score
+            score_count += 1
+            bucket = str(cls.score_bucket(score))
+            score_buckets[bucket] = score_buckets.get(bucket, 0) + 1
+
+        stats = {
+            "total": sum(status_counts.values()),
+            "status_counts": status_counts,
+            "daily": daily,
+            "score_sum": score_sum,
+            "score_count": score_count,
+            "score_buckets": score_buckets,
+            "initialized": True,
+            "updated_at": datetime.utcnow()
+        }
+        return stats
+
+    @classmethod
+    def average_score(cls, stats: Dict) -> float:
+        """Average overall score of completed analyses"""
+        if not stats.get("score_count"):
+            return 0
+        return stats["score_sum"] / stats["score_count"]
+
+    @classmethod
+    def daily_counts(cls, stats: Dict, days: int = 30) -> list:
+        """Per-day analysis counts for the last `days` days, oldest first"""
+        since = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
+        return [
+            {"date": date, "count": count}
+            for date, count in sorted(stats.get("daily", {}).items())
+            if date >= since and count
+        ]
+
+    @classmethod
+    def score_distribution(cls, stats: Dict) -> list:
+        """Score buckets in the same shape as the $bucket aggregation output"""
+        buckets = stats.get("score_buckets", {})
+        distribution = [
+            {"_id": lower, "count": buckets[str(lower)]}
+            for lower in cls.SCORE_BOUNDARIES[:-1]
+            if buckets.get(str(lower))
+        ]
+        if buckets.get("Other"):
+            distribution.append({"_id": "Other", "count": buckets["Other"]})
+        return distribution
@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Dict, Optional
-from bson import ObjectId
+from pymongo import UpdateOne
 
 from app.models.subscription import Subscription, SubscriptionStatus, BillingHistory
 from app.schemas.subscription import PlanDetails, PlanLimits
+from app.services.user_service import UserService
+from app.core.write_batcher import bulk_write
 
 
 class SubscriptionService:
@@ -190,10 +192,7 @@ class SubscriptionService:
         await db.billing_history.insert_one(billing_entry.dict(by_alias=True, exclude={"id"}))
         
         # Update user plan
-        await db.users.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": {"plan": plan, "updated_at": datetime.utcnow()}}
-        )
+        await UserService.update_user(db, user_id, {"plan": plan})
         
         return subscription
     
@@ -317,13 +316,12 @@ class SubscriptionService:
             "trial_end_date": {"$lt": now}
         }).to_list(length=1000)
         
-        for subscription_data in expired_trials:
-            subscription = Subscription(**subscription_data)
-            
-            # Move to grace period (7 days)
-            grace_end = now + timedelta(days=7)
-            await db.subscriptions.update_one(
-                {"_id": subscription.id},
+        # Move to grace period (7 days), one bulk write for the whole sweep
+        grace_end = now + timedelta(days=7)
+        subscriptions = [Subscription(**subscription_data) for subscription_data in expired_trials]
+        await bulk_write(db.subscriptions, [
+            UpdateOne(
+                {"_id": subscription.id, "status": SubscriptionStatus.TRIAL},
                 {
                     "$set": {
                         "status": SubscriptionStatus.GRACE_PERIOD,
@@ -332,7 +330,10 @@ class SubscriptionService:
                     }
                 }
             )
-            
+            for subscription in subscriptions
+        ])
+        
+        for subscription in subscriptions:
             # TODO: Send email notification about trial expiry
             print(f"Trial expired for user {subscription.user_id}, moved to grace period")
         
@@ -342,12 +343,11 @@ class SubscriptionService:
             "end_date": {"$lt": now}
         }).to_list(length=1000)
         
-        for subscription_data in expired_grace:
-            subscription = Subscription(**subscription_data)
-            
-            # Downgrade to free plan
-            await db.subscriptions.update_one(
-                {"_id": subscription.id},
+        # Downgrade to free plan
+        subscriptions = [Subscription(**subscription_data) for subscription_data in expired_grace]
+        await bulk_write(db.subscriptions, [
+            UpdateOne(
+                {"_id": subscription.id, "status": SubscriptionStatus.GRACE_PERIOD},
                 {
                     "$set": {
                         "status": SubscriptionStatus.EXPIRED,
@@ -355,7 +355,10 @@ class SubscriptionService:
                     }
                 }
             )
-            
+            for subscription in subscriptions
+        ])
+        
+        for subscription in subscriptions:
             # Create free plan subscription
             await cls.create_subscription(db, subscription.user_id, "free")
             
@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Dict, Optional
+from bson import ObjectId
+from fastapi import Request
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+class UserService:
+    """Cached access to user documents"""
+
+    # Process-level cache shared by all requests handled by this worker.
+    # Entries are short-lived because other workers cannot invalidate them.
+    _cache = TTLCache(
+        ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+        maxsize=settings.USER_CACHE_MAX_SIZE
+    )
+
+    # Never cache credentials
+    PROJECTION = {"hashed_password": 0}
+
+    @classmethod
+    async def get_user(cls, db, user_id: str, request: Optional[Request] = None) -> Optional[Dict]:
+        """
+        Get a user document, reading MongoDB at most once per request
+        and at most once per TTL per worker
+        """
+        # Request-scoped cache
+        if request is not None:
+            request_users = getattr(request.state, "users", None)
+            if request_users is None:
+                request_users = {}
+                request.state.users = request_users
+            if user_id in request_users:
+                return request_users[user_id]
+
+        user = cls._cache.get(user_id)
+        if user is None:
+            user = await db.users.find_one({"_id": ObjectId(user_id)}, cls.PROJECTION)
+            if user:
+                cls._cache.set(user_id, user)
+
+        if request is not None:
+            request.state.users[user_id] = user
+
+        return user
+
+    @classmethod
+    async def update_user(cls, db, user_id: str, fields: Dict):
+        """Update user fields and drop the cached copy"""
+        fields = {**fields, "updated_at": datetime.utcnow()}
+        await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": fields})
+        cls.invalidate(user_id)
+
+    @classmethod
+    def invalidate(cls, user_id: str):
+        """Drop the cached user document, e.g. after a plan or profile change"""
+        cls._cache.delete(user_id)
@@ -0,0 +1,31 @@
+import time
+from typing import List, Optional
+
+
+class Budget:
+    """
+    Deadline of one analysis, passed from the fetch through the analyzers to AI insights
+    and the PDF. Each step bounds its waits by the time left and downgrades optional work
+    when it runs low; what was downgraded is recorded in `degraded`.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.degraded: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def timeout(self, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """Time a step may wait: what is left after `reserve`, at most `cap`"""
+        left = max(0.0, self.remaining() - reserve)
+        return left if cap is None else min(cap, left)
+
+    def allows(self, seconds: float) -> bool:
+        """Whether at least `seconds` are left"""
+        return self.remaining() >= seconds
+
+    def degrade(self, note: str):
+        if note not in self.degraded:
+            self.degraded.append(note)
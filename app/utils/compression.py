@@ -0,0 +1,56 @@
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+import bson
+
+from app.core.config import settings
+
+
+DICTIONARIES_DIR = Path(__file__).parent / "compression_dictionaries"
+
+# Values smaller than this are stored as-is; compressing them saves nothing
+MIN_COMPRESS_BYTES = 256
+
+
+@lru_cache(maxsize=None)
+def load_dictionary(version: int) -> bytes:
+    """Preset dictionary `version`; files are immutable once released"""
+    return (DICTIONARIES_DIR / f"v{version}.txt").read_bytes()
+
+
+def encode_value(value: Any) -> Dict:
+    """
+    Encode a stored result value.
+    Returns either {"data": value} or {"codec": ..., "blob": compressed BSON}
+    """
+    if not settings.RESULT_COMPRESSION_ENABLED:
+        return {"data": value}
+
+    # BSON keeps every type Mongo would have stored (dates, ints vs floats) intact
+    raw = bson.encode({"v": value})
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return {"data": value}
+
+    version = settings.RESULT_COMPRESSION_DICTIONARY
+    compressor = zlib.compressobj(
+        settings.RESULT_COMPRESSION_LEVEL,
+        zdict=load_dictionary(version)
+    )
+    blob = compressor.compress(raw) + compressor.flush()
+    return {"codec": f"zlib-d{version}", "blob": blob}
+
+
+def decode_value(document: Dict) -> Any:
+    """Inverse of encode_value; documents without a codec hold the plain value"""
+    codec = document.get("codec")
+    if not codec:
+        return document.get("data")
+
+    if not codec.startswith("zlib-d"):
+        raise ValueError(f"Unknown result codec: {codec}")
+
+    decompressor = zlib.decompressobj(zdict=load_dictionary(int(codec[len("zlib-d"):])))
+    raw = decompressor.decompress(document["blob"]) + decompressor.flush()
+    return bson.decode(raw)["v"]
@@ -0,0 +1,62 @@
+import hashlib
+import re
+from typing import Dict, Optional
+from bs4 import BeautifulSoup
+
+FINGERPRINT_BITS = 64
+_WORD = re.compile(r"\w+")
+
+
+def content_fingerprint(html: str) -> str:
+    """
+    64-bit SimHash of the page's visible text (word 3-shingles), as hex. Near-identical
+    pages get fingerprints a few bits apart, so small edits stay below the change threshold.
+    """
+    soup = BeautifulSoup(html or "", "html.parser")
+    for element in soup(["script", "style", "noscript", "template"]):
+        element.decompose()
+    words = _WORD.findall(soup.get_text(" ").lower())
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))] if words else []
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return f"{fingerprint:016x}"
+
+
+def fingerprint_distance(a: str, b: str) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def significant_change(
+    previous: Dict,
+    overall_score: float,
+    scores: Dict[str, Optional[float]],
+    fingerprint: Optional[str],
+    score_threshold: float,
+    fingerprint_threshold: int
+) -> Optional[str]:
+    """
+    Why a re-analysis differs enough from the previous run to regenerate its report,
+    or None when it does not. `previous` holds the last run's fingerprint and scores.
+    """
+    if fingerprint is None or previous.get("fingerprint") is None:
+        return "no fingerprint"
+    distance = fingerprint_distance(fingerprint, previous["fingerprint"])
+    if distance > fingerprint_threshold:
+        return f"content changed ({distance} bits)"
+
+    if abs(overall_score - (previous.get("overall_score") or 0)) > score_threshold:
+        return "overall score changed"
+    previous_scores = previous.get("scores") or {}
+    for section, score in scores.items():
+        if score is None or previous_scores.get(section) is None:
+            continue
+        if abs(score - previous_scores[section]) > score_threshold:
+            return f"{section} score changed"
+    return None
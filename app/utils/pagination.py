@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+
+def encode_cursor(document: Dict, field: str = "created_at") -> str:
+    """Opaque continuation token pointing just past `document` in (field, _id) order"""
+    payload = {"t": document[field].isoformat(), "id": str(document["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, ObjectId]:
+    """Decode a continuation token, raising 400 if it was tampered with"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_filter(token: Optional[str], field: str = "created_at") -> Dict:
+    """Filter selecting documents after the cursor in descending (field, _id) order"""
+    if not token:
+        return {}
+
+    value, object_id = decode_cursor(token)
+    return {
+        "$or": [
+            {field: {"$lt": value}},
+            {field: value, "_id": {"$lt": object_id}}
+        ]
+    }
+
+
+async def fetch_page(
+    collection,
+    query: Dict,
+    cursor: Optional[str],
+    limit: int,
+    projection: Optional[Dict] = None,
+    field: str = "created_at"
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch one page, newest first, using keyset pagination on (field, _id).
+    Returns: (documents, next_cursor) where next_cursor is None on the last page
+    """
+    after = keyset_filter(cursor, field)
+    if after:
+        query = {"$and": [query, after]}
+
+    # Read one extra document to know whether another page exists
+    documents = await collection.find(query, projection).sort(
+        [(field, -1), ("_id", -1)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], field)
+
+    return documents, next_cursor
@@ -1,55 +1,157 @@
+import asyncio
+import uuid
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
 from bson import ObjectId
+from slowapi import Limiter
+from slowapi.util import get_remote_address
 from app.core.config import settings
+from app.core.redis import redis_client
+from app.analyzers.profiles import profile_cost
+from app.services.user_service import UserService
 
 
-async def check_rate_limit(user_id: str, plan: str, db):
-    """Check if user has exceeded rate limit"""
-    
-    # Get rate limits based on plan
+# Request limiter shared by every worker: counters live in Redis and use the
+# atomic moving-window strategy, falling back to in-memory counters if Redis is down
+limiter = Limiter(
+    key_func=get_remote_address,
+    strategy="moving-window",
+    storage_uri=settings.RATE_LIMIT_STORAGE_URL or settings.REDIS_URL,
+    storage_options={"max_connections": settings.RATE_LIMIT_STORAGE_MAX_CONNECTIONS},
+    in_memory_fallback_enabled=True,
+    swallow_errors=True
+)
+
+
+# Sliding-window check-and-consume, executed atomically inside Redis.
+# KEYS[1] - per-user window key (sorted set of consumed units scored by time in ms)
+# ARGV[1] - window length in ms, ARGV[2] - limit, ARGV[3] - cost, ARGV[4] - unique request id
+# Returns {allowed, used, retry_after_ms}
+SLIDING_WINDOW_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local used = redis.call('ZCARD', KEYS[1])
+
+if used + cost > limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    local retry_after = window
+    if oldest[2] then
+        retry_after = tonumber(oldest[2]) + window - now
+    end
+    return {0, used, retry_after}
+end
+
+for i = 1, cost do
+    redis.call('ZADD', KEYS[1], now, ARGV[4] .. ':' .. i)
+end
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, used + cost, 0}
+"""
+
+_sliding_window_script = None
+
+# Keep references to fire-and-forget usage write-backs so they are not garbage collected
+_background_tasks = set()
+
+
+def get_plan_limit(plan: str) -> int:
+    """Get the analysis limit for a plan"""
     rate_limits = {
         "free": settings.RATE_LIMIT_FREE_USER,
         "basic": settings.RATE_LIMIT_BASIC_USER,
         "pro": settings.RATE_LIMIT_PRO_USER,
         "enterprise": settings.RATE_LIMIT_ENTERPRISE_USER
     }
-    
-    limit = rate_limits.get(plan, settings.RATE_LIMIT_FREE_USER)
-    
-    if user_id:
-        # Get user's monthly count
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
-        if user:
-            monthly_reset_date = user.get("monthly_reset_date")
-            
-            # Reset if needed
-            if not monthly_reset_date or monthly_reset_date < datetime.utcnow():
-                await db.users.update_one(
-                    {"_id": ObjectId(user_id)},
-                    {
-                        "$set": {
-                            "monthly_analyses_count": 0,
-                            "monthly_reset_date": datetime.utcnow() + timedelta(days=30)
-                        }
-                    }
-                )
-                monthly_count = 0
-            else:
-                monthly_count = user.get("monthly_analyses_count", 0)
-            
-            # Check limit
-            if monthly_count >= limit:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Monthly analysis limit reached. Upgrade your plan for more analyses."
-                )
-            
-            # Increment count
+    return rate_limits.get(plan, settings.RATE_LIMIT_FREE_USER)
+
+
+async def consume_rate_limit(user_id: str, limit: int, cost: int = 1) -> tuple[bool, int, int]:
+    """
+    Atomically check and consume `cost` units from the user's sliding window.
+    Returns: (allowed, used, retry_after_seconds)
+    """
+    global _sliding_window_script
+    if _sliding_window_script is None:
+        _sliding_window_script = redis_client.redis.register_script(SLIDING_WINDOW_LUA)
+
+    window_ms = settings.RATE_LIMIT_WINDOW_DAYS * 86400 * 1000
+    allowed, used, retry_after_ms = await _sliding_window_script(
+        keys=[f"rate:analysis:{user_id}"],
+        args=[window_ms, limit, cost, uuid.uuid4().hex]
+    )
+    return bool(allowed), int(used), max(0, int(retry_after_ms) // 1000)
+
+
+async def _record_usage(db, user_id: str, cost: int, units: int):
+    """Write consumed analyses and quota units back to the user document for reporting"""
+    try:
+        now = datetime.utcnow()
+        # Start a new reporting period if the previous one has lapsed
+        result = await db.users.update_one(
+            {"_id": ObjectId(user_id), "monthly_reset_date": {"$not": {"$gte": now}}},
+            {
+                "$set": {
+                    "monthly_analyses_count": cost,
+                    "monthly_quota_units": units,
+                    "monthly_reset_date": now + timedelta(days=settings.RATE_LIMIT_WINDOW_DAYS),
+                    "last_analysis_date": now
+                },
+                "$inc": {"analyses_count": cost}
+            }
+        )
+        if result.matched_count == 0:
             await db.users.update_one(
                 {"_id": ObjectId(user_id)},
-                {"$inc": {"monthly_analyses_count": 1, "analyses_count": 1}}
+                {
+                    "$inc": {"monthly_analyses_count": cost, "analyses_count": cost, "monthly_quota_units": units},
+                    "$set": {"last_analysis_date": now}
+                }
             )
+        UserService.invalidate(user_id)
+    except Exception as e:
+        print(f"⚠️ Failed to record usage for user {user_id}: {e}")
+
+
+def _schedule_usage_write(db, user_id: str, cost: int, units: int):
+    task = asyncio.create_task(_record_usage(db, user_id, cost, units))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def check_rate_limit(user_id: str, plan: str, db, cost: int = 1, profile: str = "standard"):
+    """
+    Check if user has exceeded rate limit, consuming `cost` analyses of a profile.
+    Quota is counted in units: a plan's limit is that many standard analyses, and each
+    profile consumes units by its cost (quick scans a fraction, deep scans more).
+    """
+
+    limit = get_plan_limit(plan)
+    limit_units = limit * settings.PROFILE_COST_STANDARD
+    units = cost * profile_cost(profile)
+
+    if user_id:
+        if redis_client.redis is not None:
+            try:
+                allowed, used, retry_after = await consume_rate_limit(user_id, limit_units, units)
+            except Exception as e:
+                # Redis unavailable - fall back to the Mongo counters
+                print(f"⚠️ Redis rate limiter unavailable, falling back to MongoDB: {e}")
+            else:
+                if not allowed:
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail="Analysis limit reached for your plan. Upgrade your plan for more analyses.",
+                        headers={"Retry-After": str(retry_after)}
+                    )
+                _schedule_usage_write(db, user_id, cost, units)
+                return
+
+        await _check_rate_limit_mongo(user_id, limit_units, db, cost, units)
     else:
         # Guest user - always limited to 1
         if limit <= 0:
@@ -57,3 +159,47 @@ async def check_rate_limit(user_id: str, plan: str, db):
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Please register to perform more analyses"
             )
+
+
+async def _check_rate_limit_mongo(user_id: str, limit_units: int, db, cost: int = 1, units: int = None):
+    """Fallback limiter based on the monthly counters stored on the user document"""
+    units = cost * settings.PROFILE_COST_STANDARD if units is None else units
+    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    if user:
+        monthly_reset_date = user.get("monthly_reset_date")
+
+        # Reset if needed
+        if not monthly_reset_date or monthly_reset_date < datetime.utcnow():
+            await db.users.update_one(
+                {"_id": ObjectId(user_id)},
+                {
+                    "$set": {
+                        "monthly_analyses_count": 0,
+                        "monthly_quota_units": 0,
+                        "monthly_reset_date": datetime.utcnow() + timedelta(days=settings.RATE_LIMIT_WINDOW_DAYS)
+                    }
+                }
+            )
+            UserService.invalidate(user_id)
+            used_units = 0
+        else:
+            # Counts from before quota units were standard analyses
+            used_units = user.get(
+                "monthly_quota_units",
+                user.get("monthly_analyses_count", 0) * settings.PROFILE_COST_STANDARD
+            )
+
+        # Check limit
+        if used_units + units > limit_units:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Monthly analysis limit reached. Upgrade your plan for more analyses."
+            )
+
+        # Increment count
+        await db.users.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {"monthly_analyses_count": cost, "analyses_count": cost, "monthly_quota_units": units}}
+        )
+        # Cached user documents would otherwise serve stale quota fields until their TTL
+        UserService.invalidate(user_id)
@@ -0,0 +1,10 @@
+import random
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with jitter for the given (0-based) attempt.
+    Half of the delay is fixed and half random, so retries neither hammer nor synchronize.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+
+class ScoreMatrix:
+    """
+    Scores of benchmarked sites, one row per site and one column per category.
+    Your site's standing (rank, percentile, leader) is kept up to date incrementally as rows
+    arrive; distribution statistics and full rank tables are array operations over the matrix.
+    """
+
+    def __init__(self, categories: Sequence[str], capacity: int = 64):
+        self.categories = list(categories)
+        self.urls: List[str] = []
+        self._scores = np.zeros((capacity, len(self.categories)))
+        self._sums = np.zeros(len(self.categories))
+        self._leader = np.full(len(self.categories), -np.inf)
+        self._leader_row = np.zeros(len(self.categories), dtype=np.int64)
+        self._yours: Optional[int] = None
+        # Sites scoring strictly above / below yours, per category
+        self._above = np.zeros(len(self.categories), dtype=np.int64)
+        self._below = np.zeros(len(self.categories), dtype=np.int64)
+
+    @property
+    def size(self) -> int:
+        return len(self.urls)
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._scores[:self.size]
+
+    def add(self, url: str, row: Sequence[float], is_yours: bool = False) -> int:
+        """Append a site's scores (in category order); returns its row index"""
+        row = np.asarray(row, dtype=float)
+        index = self.size
+        if index == len(self._scores):
+            self._scores = np.concatenate([self._scores, np.zeros_like(self._scores)])
+
+        self._scores[index] = row
+        self.urls.append(url)
+        self._sums += row
+
+        # Earlier sites keep the lead on ties
+        improved = row > self._leader
+        self._leader = np.where(improved, row, self._leader)
+        self._leader_row = np.where(improved, index, self._leader_row)
+
+        if is_yours:
+            self._yours = index
+            others = self._scores[:index]
+            self._above = (others > row).sum(axis=0)
+            self._below = (others < row).sum(axis=0)
+        elif self._yours is not None:
+            yours = self._scores[self._yours]
+            self._above += row > yours
+            self._below += row < yours
+        return index
+
+    def ranks(self) -> np.ndarray:
+        """Competition rank (1 + sites scoring higher) of every site in every category"""
+        scores = self.scores
+        ordered = np.sort(scores, axis=0)
+        higher = np.column_stack([
+            self.size - np.searchsorted(ordered[:, j], scores[:, j], side="right")
+            for j in range(len(self.categories))
+        ])
+        return higher + 1
+
+    def percentiles(self) -> np.ndarray:
+        """Share of the other sites that each site outscores, per category (0-100)"""
+        scores = self.scores
+        ordered = np.sort(scores, axis=0)
+        lower = np.column_stack([
+            np.searchsorted(ordered[:, j], scores[:, j], side="left")
+            for j in range(len(self.categories))
+        ])
+        return lower / max(self.size - 1, 1) * 100
+
+    def leaderboard(self, size: int) -> Dict[str, List[Dict]]:
+        """Top `size` sites per category, ties in arrival order"""
+        scores = self.scores
+        top = np.argsort(-scores, axis=0, kind="stable")[:size]
+        return {
+            category: [
+                {"url": self.urls[i], "score": round(float(scores[i, j]), 1), "is_yours": int(i) == self._yours}
+                for i in top[:, j]
+            ]
+            for j, category in enumerate(self.categories)
+        }
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-category average, quartiles and leader, plus your rank, percentile and gaps"""
+        if self.size == 0:
+            return {}
+
+        average = self._sums / self.size
+        p25, median, p75 = np.percentile(self.scores, [25, 50, 75], axis=0)
+        summary = {
+            category: {
+                "sites": self.size,
+                "average": round(float(average[j]), 1),
+                "median": round(float(median[j]), 1),
+                "p25": round(float(p25[j]), 1),
+                "p75": round(float(p75[j]), 1),
+                "leader_score": round(float(self._leader[j]), 1),
+                "leader_url": self.urls[self._leader_row[j]]
+            }
+            for j, category in enumerate(self.categories)
+        }
+
+        if self._yours is not None:
+            yours = self._scores[self._yours]
+            percentile = self._below / max(self.size - 1, 1) * 100
+            gap_to_leader = self._leader - yours
+            gap_to_average = yours - average
+            for j, category in enumerate(self.categories):
+                summary[category].update({
+                    "your_score": round(float(yours[j]), 1),
+                    "rank": int(self._above[j]) + 1,
+                    "percentile": round(float(percentile[j]), 1),
+                    "gap_to_leader": round(float(gap_to_leader[j]), 1),
+                    "gap_to_average": round(float(gap_to_average[j]), 1)
+                })
+        return summary
@@ -0,0 +1,6 @@
+import json
+
+
+def sse_event(event: str, data: dict) -> str:
+    """One Server-Sent Events frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
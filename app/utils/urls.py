@@ -0,0 +1,9 @@
+from urllib.parse import urlparse
+
+
+def normalize_domain(url_or_host: str) -> str:
+    """Lowercase host name without port or leading www., from a URL or a bare host"""
+    value = url_or_host.strip().lower()
+    host = urlparse(value).hostname if "://" in value else value.split("/")[0].split(":")[0]
+    host = host or ""
+    return host[4:] if host.startswith("www.") else host
@@ -0,0 +1,142 @@
+"""
+Benchmark login latency under concurrent load
+Run against a running server:
+    python scripts/benchmark_login.py --url http://localhost:8000 --email basic@example.com --password Basic@123
+Run in-process (no server or database needed), comparing inline bcrypt with the executor:
+    python scripts/benchmark_login.py --local
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(name: str, samples):
+    print(
+        f"{name:<28} n={len(samples):<5} "
+        f"p50={percentile(samples, 50) * 1000:8.1f} ms  "
+        f"p95={percentile(samples, 95) * 1000:8.1f} ms  "
+        f"p99={percentile(samples, 99) * 1000:8.1f} ms  "
+        f"mean={statistics.mean(samples) * 1000:8.1f} ms"
+    )
+
+
+async def benchmark_server(url: str, email: str, password: str, concurrency: int, total: int):
+    """Fire `total` logins with `concurrency` in flight while polling /health"""
+    import httpx
+
+    login_latencies = []
+    health_latencies = []
+    status_counts = {}
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=url, timeout=60.0) as client:
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        async def login_worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": email, "password": password}
+                )
+                login_latencies.append(time.perf_counter() - start)
+                status_counts[response.status_code] = status_counts.get(response.status_code, 0) + 1
+
+        async def health_probe():
+            # Cheap requests that only suffer if the event loop is blocked
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        probe = asyncio.create_task(health_probe())
+        started = time.perf_counter()
+        await asyncio.gather(*[login_worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    print(f"\n{total} logins, concurrency={concurrency}, {total / elapsed:.1f} logins/s, status={status_counts}")
+    report("login", login_latencies)
+    if health_latencies:
+        report("/health during logins", health_latencies)
+
+
+async def benchmark_local(concurrency: int, total: int):
+    """Compare inline hashing with the executor by measuring event loop stalls"""
+    from app.core.security import get_password_hash, verify_password, verify_password_async
+
+    hashed = get_password_hash("Benchmark@123")
+
+    async def run(mode: str):
+        latencies = []
+        loop_lag = []
+        done = asyncio.Event()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                start = time.perf_counter()
+                if mode == "inline":
+                    verify_password("Benchmark@123", hashed)
+                else:
+                    await verify_password_async("Benchmark@123", hashed)
+                latencies.append(time.perf_counter() - start)
+
+        async def lag_probe():
+            # Measures how late a 10 ms timer fires, i.e. how long the loop was blocked
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                loop_lag.append(time.perf_counter() - start - 0.01)
+
+        probe = asyncio.create_task(lag_probe())
+        started = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(total)])
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+        print(f"\n[{mode}] {total} verifications, concurrency={concurrency}, {total / elapsed:.1f}/s")
+        report(f"{mode} verify", latencies)
+        report(f"{mode} event loop lag", loop_lag)
+
+    await run("inline")
+    await run("executor")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login latency under concurrent load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="basic@example.com")
+    parser.add_argument("--password", default="Basic@123")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--local", action="store_true", help="Benchmark hashing in-process only")
+    args = parser.parse_args()
+
+    if args.local:
+        asyncio.run(benchmark_local(args.concurrency, args.requests))
+    else:
+        asyncio.run(benchmark_server(args.url, args.email, args.password, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
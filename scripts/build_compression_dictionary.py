@@ -0,0 +1,72 @@
+"""
+Build a preset zlib dictionary for stored analysis results from the
+issue and recommendation messages the analyzers emit.
+Run with: python scripts/build_compression_dictionary.py <version>
+
+Writes app/utils/compression_dictionaries/v<version>.txt. Stored results
+reference the dictionary version they were compressed with, so an existing
+version file must never be edited - build a new version instead and point
+RESULT_COMPRESSION_DICTIONARY at it.
+"""
+import ast
+import sys
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+ANALYZERS_DIR = ROOT / "app" / "analyzers"
+OUTPUT_DIR = ROOT / "app" / "utils" / "compression_dictionaries"
+
+# zlib only looks back 32 KB, so anything beyond that is dead weight
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+# Keys present in nearly every analyzer result
+COMMON_KEYS = [
+    "score", "grade", "issues", "recommendations", "metrics", "details",
+    "score_breakdown", "priority", "impact", "effort", "category", "title", "description"
+]
+
+
+def analyzer_messages() -> Counter:
+    """Literal parts of every string the analyzers append to issues/recommendations"""
+    messages = Counter()
+    for path in sorted(ANALYZERS_DIR.glob("*_analyzer.py")):
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if not (isinstance(node, ast.Call) and getattr(node.func, "attr", None) == "append" and node.args):
+                continue
+            argument = node.args[0]
+            if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+                messages[argument.value] += 1
+            elif isinstance(argument, ast.JoinedStr):
+                for part in argument.values:
+                    if isinstance(part, ast.Constant) and len(part.value) > 8:
+                        messages[part.value] += 1
+    return messages
+
+
+def build() -> bytes:
+    """Most frequent strings go last: zlib finds nearby matches cheapest"""
+    messages = analyzer_messages()
+    ordered = [message for message, _ in sorted(messages.items(), key=lambda item: (item[1], item[0]))]
+    dictionary = "".join(ordered + COMMON_KEYS).encode("utf-8")
+    return dictionary[-MAX_DICTIONARY_SIZE:]
+
+
+def main():
+    if len(sys.argv) != 2 or not sys.argv[1].isdigit():
+        print("Usage: python scripts/build_compression_dictionary.py <version>")
+        sys.exit(1)
+
+    path = OUTPUT_DIR / f"v{sys.argv[1]}.txt"
+    if path.exists():
+        print(f"✗ {path} already exists - dictionary versions are immutable")
+        sys.exit(1)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    dictionary = build()
+    path.write_bytes(dictionary)
+    print(f"✓ Wrote {len(dictionary)} bytes to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Rebuild the industry score histograms (score_sketches) from all completed analyses.
+Run with: python scripts/build_score_sketches.py
+Needed once for analyses completed before the histograms existed; afterwards they are
+kept up to date as analyses complete. Re-running replaces the stored histograms.
+"""
+import asyncio
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.services.analysis_store import ANALYZER_SECTIONS, AnalysisStore
+from app.services.percentile_service import METRICS, PercentileService, score_bucket
+
+
+async def build():
+    """
+    Count every completed analysis into each segment it belongs to, leaving out what
+    live recording leaves out (quick scans, the overall score of analyzer subsets)
+    """
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.MONGODB_DB_NAME]
+
+    histograms = defaultdict(lambda: {metric: defaultdict(int) for metric in METRICS})
+    analyses = 0
+
+    async for analysis in db.analyses.find(
+        {"status": "completed", "overall_score": {"$ne": None}},
+        {
+            "overall_score": 1, "scores": 1, "domain": 1, "plan": 1, "profile": 1,
+            # Analyses stored before the section split carry their sections inline
+            **{f"{section}.score": 1 for section in ANALYZER_SECTIONS}
+        }
+    ):
+        scores = analysis.get("scores") or AnalysisStore.header_fields(analysis)["scores"]
+        if not scores:
+            sections = await AnalysisStore.load_sections(db, str(analysis["_id"]), ANALYZER_SECTIONS)
+            scores = AnalysisStore.header_fields(sections)["scores"]
+
+        ranked = PercentileService.ranked_scores(analysis["overall_score"], scores, analysis.get("profile"))
+        if ranked is None:
+            continue
+        overall_score, scores = ranked
+        values = {"overall": overall_score, **scores}
+        for segment in PercentileService.segments(analysis.get("domain"), analysis.get("plan")):
+            for metric in METRICS:
+                if isinstance(values.get(metric), (int, float)):
+                    histograms[segment][metric][str(score_bucket(values[metric]))] += 1
+        analyses += 1
+
+    for segment, metrics in histograms.items():
+        await db.score_sketches.replace_one(
+            {"_id": segment},
+            {
+                "histograms": {metric: dict(counts) for metric, counts in metrics.items() if counts},
+                "totals": {metric: sum(counts.values()) for metric, counts in metrics.items() if counts},
+                "updated_at": datetime.utcnow()
+            },
+            upsert=True
+        )
+
+    client.close()
+    print(f"\n✓ Built {len(histograms)} segment histograms from {analyses} analyses")
+
+
+if __name__ == "__main__":
+    asyncio.run(build())
@@ -0,0 +1,76 @@
+"""
+Move result sections of existing analyses out of the analyses documents
+into analysis_sections, leaving slim header documents behind, and backfill the
+normalized domain that history filters on (set at creation only for newer analyses).
+Run with: python scripts/migrate_analysis_sections.py
+Safe to re-run; analyses that are already split or have a domain are skipped.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.core.write_batcher import bulk_write
+from app.services.analysis_store import AnalysisStore, SECTIONS
+from app.utils.urls import normalize_domain
+
+
+async def migrate():
+    """Split every analysis that still stores its sections inline"""
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.MONGODB_DB_NAME]
+
+    inline = {"$or": [{section: {"$exists": True}} for section in SECTIONS]}
+    migrated = 0
+
+    async for analysis in db.analyses.find(inline):
+        analysis_id = str(analysis["_id"])
+        results = {section: analysis[section] for section in SECTIONS if section in analysis}
+
+        # Sections first, so an interrupted run never loses data
+        await AnalysisStore.save_sections(db, analysis_id, results)
+        await db.analyses.update_one(
+            {"_id": analysis["_id"]},
+            {
+                "$set": AnalysisStore.header_fields(results),
+                "$unset": {section: "" for section in results}
+            }
+        )
+        migrated += 1
+        if migrated % 500 == 0:
+            print(f"  {migrated} analyses migrated...")
+
+    print(f"\n✓ Migrated {migrated} analyses")
+
+    await backfill_domains(db)
+    client.close()
+
+
+async def backfill_domains(db):
+    """Set the normalized domain on analyses created before it was stored"""
+    operations = []
+    backfilled = 0
+    async for analysis in db.analyses.find(
+        {"domain": {"$exists": False}, "website_url": {"$type": "string"}}, {"website_url": 1}
+    ):
+        operations.append(UpdateOne(
+            {"_id": analysis["_id"]},
+            {"$set": {"domain": normalize_domain(analysis["website_url"])}}
+        ))
+        if len(operations) >= settings.WRITE_BATCH_MAX_SIZE:
+            backfilled += await bulk_write(db.analyses, operations)
+            operations = []
+            print(f"  {backfilled} domains backfilled...")
+    if operations:
+        backfilled += await bulk_write(db.analyses, operations)
+
+    print(f"✓ Backfilled the domain of {backfilled} analyses")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
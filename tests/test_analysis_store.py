@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import bson
+
+from app.services.analysis_store import AnalysisStore
+from app.utils.compression import decode_value, encode_value
+
+
+def test_header_fields_keep_only_analyzer_scores():
+    """The header carries per-analyzer scores, never issue lists or AI sections"""
+    results = {
+        "ux_analysis": {"score": 72.5, "issues": ["Missing viewport meta tag"]},
+        "seo_analysis": {"score": 90, "recommendations": []},
+        "image_analysis": Exception("analyzer crashed"),
+        "ai_summary": "Solid site overall"
+    }
+    assert AnalysisStore.header_fields(results) == {
+        "scores": {"ux_analysis": 72.5, "seo_analysis": 90}
+    }
+
+
+def test_compressed_section_round_trip():
+    """Large sections are compressed and decode back to identical values, dates included"""
+    section = {
+        "score": 64.5,
+        "issues": [f"⚡ {n} render-blocking scripts - Add 'async' or 'defer' attributes" for n in range(20)],
+        "recommendations": ["Enable compression (gzip or brotli) for text resources"] * 10,
+        "metrics": {"checked_at": datetime(2024, 5, 1, 12, 0)}
+    }
+    stored = encode_value(section)
+    assert stored["codec"].startswith("zlib-d")
+    assert len(stored["blob"]) < len(bson.encode({"v": section})) / 3
+    assert decode_value(stored) == section
+
+
+def test_small_and_legacy_values_stay_plain():
+    """Tiny values skip compression; documents without a codec are read as-is"""
+    assert encode_value("Short summary") == {"data": "Short summary"}
+    assert decode_value({"data": {"score": 10}}) == {"score": 10}
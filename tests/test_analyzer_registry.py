@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.analyzers.executor import run_analyzers, weighted_overall_score
+from app.analyzers.registry import (
+    ANALYZERS, STAGES, register_analyzer, register_stage, required_stages, select_analyzers
+)
+
+
+def test_select_analyzers_by_key_or_section():
+    sections = [spec.section for spec in select_analyzers(["seo", "ux_analysis"])]
+    assert sections == ["ux_analysis", "seo_analysis"]
+    with pytest.raises(ValueError):
+        select_analyzers(["lighthouse"])
+
+
+def test_required_stages_orders_dependencies_first():
+    order = required_stages(select_analyzers(["image", "security"]))
+    assert order.index("page") < order.index("dom") < order.index("subresources")
+    assert "tls" in order and "content_dom" not in order
+
+
+def test_weighted_overall_score_renormalizes_subsets():
+    weights = {"a_analysis": 0.75, "b_analysis": 0.25}
+    assert weighted_overall_score({"a_analysis": {"score": 80}}, weights) == 80
+    assert weighted_overall_score({"a_analysis": {"score": 80}, "b_analysis": {"score": 40}}, weights) == 70
+
+
+def test_stage_shared_once_and_failures_fall_back():
+    calls = []
+
+    @register_stage("test_words")
+    async def words(url):
+        calls.append(url)
+        return url.split("/")
+
+    @register_stage("test_broken", inputs=["test_words"], executor="cpu")
+    def broken(url, test_words):
+        raise RuntimeError("no parser")
+
+    @register_analyzer("test_count_analysis", "Count", 0.5, ["test_words"])
+    class CountAnalyzer:
+        async def analyze(self, url, test_words):
+            return {"score": len(test_words)}
+
+    @register_analyzer("test_length_analysis", "Length", 0.5, ["test_words"])
+    class LengthAnalyzer:
+        async def analyze(self, url, test_words):
+            return {"score": len(url)}
+
+    @register_analyzer("test_broken_analysis", "Broken", 0.5, ["test_broken"])
+    class BrokenAnalyzer:
+        async def analyze(self, url, test_broken):
+            return {"score": 100}
+
+    try:
+        results, stages = asyncio.run(run_analyzers("a/b/c", ["test_count", "test_length", "test_broken"]))
+        assert calls == ["a/b/c"]
+        assert results["test_count_analysis"] == {"score": 3}
+        assert results["test_length_analysis"] == {"score": 5}
+        assert results["test_broken_analysis"]["score"] == 0
+        assert isinstance(stages["test_broken"], RuntimeError)
+        with pytest.raises(ValueError):
+            required_stages([ANALYZERS["test_count_analysis"]], extra=["missing"])
+    finally:
+        for section in ("test_count_analysis", "test_length_analysis", "test_broken_analysis"):
+            ANALYZERS.pop(section, None)
+        for name in ("test_words", "test_broken"):
+            STAGES.pop(name, None)
+
+
+def test_rendered_stage_only_runs_when_selected():
+    assert "rendered" not in required_stages(select_analyzers())
+    assert STAGES["rendered"].executor == "io"
+    assert "rendered" in required_stages(select_analyzers(["rendered"]))
+
+    from app.analyzers.rendered_analyzer import RenderedAnalyzer
+    result = asyncio.run(RenderedAnalyzer().analyze(
+        "https://example.com", {"first_contentful_paint_ms": 2500, "load_ms": 1200, "requests": 30}
+    ))
+    assert result["score"] == 85 and len(result["issues"]) == 1
+
+    # No browser is started once the budget cannot cover a render
+    from app.analyzers.rendered_analyzer import render_page
+    from app.utils.budget import Budget
+    budget = Budget(0)
+    with pytest.raises(TimeoutError):
+        render_page("https://example.com", budget)
+    assert budget.degraded == ["no headless-browser render"]
@@ -0,0 +1,41 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.batch_service import BatchScheduler, interleave_by_host, parse_urls, read_csv_urls
+from app.services.job_scheduler import plan_in_flight
+
+
+def test_parse_urls_dedupes_and_reports_rejects():
+    urls, rejected = parse_urls(["https://a.com", " https://a.com ", "not a url", "", "ftp://b.com", "http://b.com/x"])
+    assert urls == ["https://a.com/", "http://b.com/x"]
+    assert rejected == ["not a url", "ftp://b.com"]
+
+
+def test_read_csv_urls_uses_url_column_or_first_column():
+    assert read_csv_urls("name,URL\nA,https://a.com\nB,https://b.com\n") == ["https://a.com", "https://b.com"]
+    assert read_csv_urls("https://a.com,x\n\nhttps://b.com\n") == ["https://a.com", "https://b.com"]
+    assert read_csv_urls("") == []
+
+
+def test_interleave_by_host_round_robins():
+    urls = ["https://a.com/1", "https://a.com/2", "https://a.com/3", "https://b.com/1", "https://c.com/1"]
+    assert interleave_by_host(urls) == [
+        "https://a.com/1", "https://b.com/1", "https://c.com/1", "https://a.com/2", "https://a.com/3"
+    ]
+
+
+def test_batch_slots_respect_the_user_in_flight_cap():
+    async def scenario():
+        scheduler = BatchScheduler()
+        cap = plan_in_flight("free")
+        pending = [{"host": f"site{i}.com", "user_id": "u1", "plan": "free"} for i in range(cap + 1)]
+        pending.append({"host": "other.com", "user_id": "u2", "plan": "free"})
+        taken = [await scheduler.acquire(pending) for _ in range(cap)]
+        # u1 is at its cap: the next slot goes to u2 instead of waiting behind u1
+        assert (await scheduler.acquire(pending))["user_id"] == "u2"
+        assert [item["user_id"] for item in pending] == ["u1"]
+        await scheduler.release(taken[0])
+        assert (await scheduler.acquire(pending))["user_id"] == "u1"
+
+    assert settings.BATCH_GLOBAL_CONCURRENCY > plan_in_flight("free") + 1
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+import asyncio
+
+from app.analyzers.executor import run_analyzers
+from app.analyzers.page import probe_count
+from app.analyzers.registry import ANALYZERS, STAGES, register_analyzer, register_stage
+from app.core.config import settings
+from app.utils.budget import Budget
+
+
+def test_budget_bounds_waits_and_degrades_probes():
+    budget = Budget(settings.BUDGET_LOW_SECONDS + 30)
+    assert budget.timeout(10) == 10
+    assert budget.timeout(reserve=budget.seconds * 2) == 0
+    assert probe_count(budget, 20, "image") == 20 and not budget.degraded
+
+    low = Budget(settings.BUDGET_LOW_SECONDS / 2)
+    assert probe_count(low, 20, "image") == settings.BUDGET_REDUCED_PROBES
+    assert low.degraded == ["fewer image probes"]
+
+
+def test_steps_past_the_deadline_fall_back():
+    @register_stage("test_slow")
+    async def slow(url):
+        await asyncio.sleep(5)
+
+    @register_analyzer("test_slow_analysis", "Slow", 0.5, ["test_slow"])
+    class SlowAnalyzer:
+        async def analyze(self, url, test_slow):
+            return {"score": 100}
+
+    try:
+        results, stages = asyncio.run(run_analyzers("https://example.com", ["test_slow"], budget=Budget(0.05)))
+        assert results["test_slow_analysis"]["score"] == 0
+        assert "time budget" in results["test_slow_analysis"]["error"]
+    finally:
+        ANALYZERS.pop("test_slow_analysis", None)
+        STAGES.pop("test_slow", None)
+
+
+def test_priority_recommendations_are_rule_based_unless_the_llm_works(monkeypatch):
+    from app.services.ai_service import AIService
+
+    analysis = {
+        "overall_score": 55,
+        "seo_analysis": {
+            "score": 40, "issues": ["Missing meta description"], "recommendations": ["Add a meta description"]
+        },
+        "security_analysis": {"score": 90, "issues": [], "recommendations": ["Add a CSP header"]},
+    }
+    ai_service = AIService()
+
+    def unavailable(prompt):
+        raise RuntimeError("API key not valid")
+
+    monkeypatch.setattr(ai_service.model, "generate_content", unavailable)
+    budget = Budget(60)
+    recommendations = asyncio.run(ai_service.generate_priority_recommendations(analysis, budget))
+    assert [rec["title"] for rec in recommendations] == ["Add a meta description", "Add a CSP header"]
+    assert recommendations[0]["priority"] == "High" and recommendations[1]["priority"] == "Low"
+
+    # Enabled, a failing LLM call still leaves the analysis with rule-based recommendations
+    monkeypatch.setattr(settings, "AI_PRIORITY_RECOMMENDATIONS", True)
+    assert asyncio.run(ai_service.generate_priority_recommendations(analysis, budget)) == recommendations
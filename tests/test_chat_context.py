@@ -0,0 +1,24 @@
+from app.core.config import settings
+from app.services.chat_context_service import ChatContextService
+
+
+def test_should_fold_once_a_batch_ages_out():
+    """Summaries are only produced when a full batch sits outside the recent window"""
+    window = settings.CHAT_RECENT_MESSAGES
+    batch = settings.CHAT_SUMMARY_BATCH
+    assert not ChatContextService.should_fold(window)
+    assert not ChatContextService.should_fold(window + batch - 1)
+    assert ChatContextService.should_fold(window + batch)
+
+
+def test_score_view_is_analysis_shaped():
+    """Fallback responses can read scores from the cached context like from an analysis"""
+    view = ChatContextService.score_view({
+        "website_url": "https://example.com",
+        "overall_score": 71.3,
+        "scores": {"ux_analysis": 80, "seo_analysis": None}
+    })
+    assert view["overall_score"] == 71.3
+    assert view["ux_analysis"] == {"score": 80}
+    assert view["seo_analysis"] == {"score": 0}
+    assert view["image_analysis"] == {"score": 0}
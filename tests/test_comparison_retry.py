@@ -0,0 +1,49 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.comparison_service import ComparisonService
+from app.utils.retry import backoff_delay
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    """Delays grow per attempt, stay within [delay/2, delay] and never exceed the cap"""
+    for attempt in range(6):
+        delay = min(8.0, 1.0 * 2 ** attempt)
+        value = backoff_delay(attempt, 1.0, cap=8.0)
+        assert delay / 2 <= value <= delay
+
+
+def _service():
+    return ComparisonService.__new__(ComparisonService)
+
+
+async def test_only_the_failing_step_is_retried(monkeypatch):
+    """A flaky step is retried on its own until it succeeds"""
+    monkeypatch.setattr(settings, "COMPARISON_RETRY_BASE_DELAY_SECONDS", 0.001)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            return {"score": 0, "error": "probe failed"}
+        return {"score": 90}
+
+    deadline = asyncio.get_running_loop().time() + 5
+    result = await _service()._retry_within_budget("Image", "https://example.com", flaky, deadline)
+    assert result == {"score": 90}
+    assert len(calls) == 2
+
+
+async def test_retries_stop_at_the_site_deadline(monkeypatch):
+    """No attempt starts once the site budget is spent; the last failure is returned"""
+    monkeypatch.setattr(settings, "COMPARISON_RETRY_BASE_DELAY_SECONDS", 10.0)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise ValueError("boom")
+
+    deadline = asyncio.get_running_loop().time() + 1
+    result = await _service()._retry_within_budget("SEO", "https://example.com", failing, deadline)
+    assert isinstance(result, ValueError)
+    assert len(calls) == 1
@@ -0,0 +1,61 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.job_scheduler import AnalysisScheduler
+
+
+def _admission_order(scheduler, jobs):
+    """(plan, user) of the jobs in the order they were admitted, all queued behind one busy slot"""
+    order = []
+
+    async def scenario():
+        blocker = await scheduler.acquire("enterprise", "blocker")
+
+        async def job(plan, user_id):
+            await scheduler.run(plan, user_id, lambda: asyncio.sleep(0))
+            order.append((plan, user_id))
+
+        tasks = [asyncio.create_task(job(plan, user_id)) for plan, user_id in jobs]
+        await asyncio.sleep(0)
+        scheduler.release(blocker)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_plans_share_slots_by_weight(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_CONCURRENCY", 1)
+    jobs = [("free", f"f{i}") for i in range(6)] + [("pro", f"p{i}") for i in range(6)]
+    order = [plan for plan, _ in _admission_order(AnalysisScheduler(), jobs)]
+    # Pro weighs 4x free: it gets most early slots, but free is not shut out
+    assert order[:5].count("pro") == 4
+    assert order.index("free") < 5
+
+
+def test_starving_jobs_go_first(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "SCHEDULER_STARVATION_SECONDS", 0)
+    jobs = [("free", "f")] + [("enterprise", f"e{i}") for i in range(3)]
+    assert _admission_order(AnalysisScheduler(), jobs)[0] == ("free", "f")
+
+
+def test_user_in_flight_cap(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_CONCURRENCY", 4)
+    monkeypatch.setattr(settings, "SCHEDULER_USER_IN_FLIGHT_FREE", 1)
+    scheduler = AnalysisScheduler()
+
+    async def scenario():
+        first = await scheduler.acquire("free", "user")
+        second = asyncio.create_task(scheduler.acquire("free", "user"))
+        other = await scheduler.acquire("free", "other")
+        await asyncio.sleep(0)
+        assert not second.done()
+        assert scheduler.metrics()["plans"]["free"] == {**scheduler.metrics()["plans"]["free"], "queued": 1, "running": 2}
+
+        scheduler.release(first)
+        scheduler.release(await second)
+        scheduler.release(other)
+        assert scheduler.metrics()["running"] == 0
+
+    asyncio.run(scenario())
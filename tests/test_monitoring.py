@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.services.monitor_service import next_run_at
+from app.utils.fingerprint import content_fingerprint, fingerprint_distance, significant_change
+
+ARTICLE = " ".join(f"Paragraph {i} explains how our product helps small shops sell online." for i in range(40))
+
+
+def test_fingerprint_ignores_markup_and_tracks_content():
+    page = f"<html><body><p>{ARTICLE}</p><script>var t = {{}};</script></body></html>"
+    restyled = f"<html><head><style>p {{color: red}}</style></head><body><div><p>{ARTICLE}</p></div></body></html>"
+    edited = page.replace("Paragraph 7 explains", "Paragraph 7 describes")
+    rewritten = "<p>Completely new landing page about garden furniture, delivery and returns.</p>"
+
+    assert content_fingerprint(page) == content_fingerprint(restyled)
+    assert fingerprint_distance(content_fingerprint(page), content_fingerprint(edited)) <= 3
+    assert fingerprint_distance(content_fingerprint(page), content_fingerprint(rewritten)) > 3
+
+
+def test_significant_change_uses_thresholds():
+    previous = {"fingerprint": "00000000000000ff", "overall_score": 70.0, "scores": {"seo_analysis": 80}}
+
+    def check(overall, seo, fingerprint):
+        return significant_change(
+            previous, overall, {"seo_analysis": seo}, fingerprint, score_threshold=5, fingerprint_threshold=3
+        )
+
+    assert check(72.0, 83, "00000000000000fe") is None
+    assert check(76.0, 80, "00000000000000ff") == "overall score changed"
+    assert check(70.0, 74, "00000000000000ff") == "seo_analysis score changed"
+    assert check(70.0, 80, "000000000000000f").startswith("content changed")
+    assert check(70.0, 80, None) == "no fingerprint"
+
+
+def test_runs_are_spread_within_jitter():
+    now = datetime(2024, 1, 1)
+    cadence = timedelta(hours=24)
+    spread = cadence * settings.MONITOR_JITTER
+    for _ in range(50):
+        assert now <= next_run_at(now, 24, first=True) <= now + spread
+        assert now + cadence - spread <= next_run_at(now, 24) <= now + cadence + spread
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.utils.urls import normalize_domain
+
+
+def test_cursor_round_trip():
+    """A cursor decodes back to the (created_at, _id) it was built from"""
+    document = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1, 12, 30, 15, 123000)}
+    assert decode_cursor(encode_cursor(document)) == (document["created_at"], document["_id"])
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    """Documents sharing the cursor timestamp are continued by _id"""
+    document = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1)}
+    assert keyset_filter(encode_cursor(document)) == {
+        "$or": [
+            {"created_at": {"$lt": document["created_at"]}},
+            {"created_at": document["created_at"], "_id": {"$lt": document["_id"]}}
+        ]
+    }
+    assert keyset_filter(None) == {}
+
+
+def test_invalid_cursor_is_rejected():
+    """Tampered tokens are a client error, not a server error"""
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+def test_normalize_domain():
+    """Scheme, port, case and www. do not split a site into several domains"""
+    assert normalize_domain("https://WWW.Example.com:8443/path") == "example.com"
+    assert normalize_domain("shop.example.com") == "shop.example.com"
@@ -0,0 +1,34 @@
+from app.core.config import settings
+from app.services.percentile_service import BUCKETS, PercentileService, ScoreSketch, score_bucket
+
+
+def test_score_bucket_clamps_to_range():
+    assert score_bucket(-3) == 0
+    assert score_bucket(72.9) == 72
+    assert score_bucket(100) == BUCKETS - 1
+    assert score_bucket(140) == BUCKETS - 1
+
+
+def test_percentile_rank_counts_own_bucket_half():
+    """Scores below count fully, ties in the same bucket count half"""
+    sketch = ScoreSketch.from_document({"40": 2, "60": 4, "80": 4})
+    assert sketch.total == 10
+    assert sketch.percentile_rank(10) == 0.0
+    assert sketch.percentile_rank(60.4) == 40.0
+    assert sketch.percentile_rank(90) == 100.0
+    assert ScoreSketch([0] * BUCKETS).percentile_rank(50) is None
+
+
+def test_segments_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "PERCENTILE_SEGMENTS", "tld,plan")
+    assert PercentileService.segments("shop.example.co.uk", "pro") == ["all", "tld:uk", "plan:pro"]
+    monkeypatch.setattr(settings, "PERCENTILE_SEGMENTS", "")
+    assert PercentileService.segments("example.com", "pro") == ["all"]
+
+
+def test_ranked_scores_match_live_recording_rules():
+    full = {section: 70 for section in ["ux_analysis", "seo_analysis", "performance_analysis",
+                                        "content_analysis", "security_analysis", "image_analysis"]}
+    assert PercentileService.ranked_scores(70, full) == (70, full)
+    assert PercentileService.ranked_scores(70, {"seo_analysis": 70}, "standard") == (None, {"seo_analysis": 70})
+    assert PercentileService.ranked_scores(70, full, "quick") is None
@@ -0,0 +1,32 @@
+import pytest
+
+from app.analyzers.profiles import get_profile, profile_cost
+from app.analyzers.registry import select_analyzers
+from app.core.config import settings
+
+
+def test_profiles_select_analyzers():
+    defaults = [spec.key for spec in select_analyzers()]
+    assert "links" not in defaults and "rendered" not in defaults
+    assert get_profile("standard").analyzer_names() is None
+    assert get_profile("deep").analyzer_names() == defaults + ["links", "rendered"]
+    assert get_profile("quick").analyzer_names() == ["seo", "security"]
+    assert get_profile("quick").analyzer_names(["seo"]) == ["seo"]
+    assert get_profile("deep").analyzer_names(["links_analysis"]) == ["links_analysis"]
+    with pytest.raises(ValueError):
+        get_profile("turbo")
+
+
+def test_selection_cannot_go_beyond_the_profile():
+    # The quota is charged by profile: a quick scan must not run the standard analyzers
+    with pytest.raises(ValueError):
+        get_profile("quick").analyzer_names(["seo", "ux", "performance"])
+    with pytest.raises(ValueError):
+        get_profile("standard").analyzer_names(["links"])
+
+
+def test_quick_profile_is_cheap_and_truncated():
+    quick = get_profile("quick")
+    assert not quick.reports and not quick.comparable
+    assert set(quick.stage_overrides()) == {"page", "tls"}
+    assert profile_cost("quick") < profile_cost("standard") == settings.PROFILE_COST_STANDARD < profile_cost("deep")
@@ -0,0 +1,43 @@
+import numpy as np
+
+from app.utils.score_matrix import ScoreMatrix
+
+
+def _matrix(yours_at: int) -> ScoreMatrix:
+    rows = [("a", [60, 90]), ("b", [80, 50]), ("c", [80, 70]), ("d", [40, 70])]
+    matrix = ScoreMatrix(["overall", "seo"], capacity=2)
+    rows.insert(yours_at, ("you", [70, 70]))
+    for url, row in rows:
+        matrix.add(url, row, is_yours=url == "you")
+    return matrix
+
+
+def test_incremental_standing_matches_full_recompute():
+    """Your rank and percentile are the same whether your row arrives first or last"""
+    for yours_at in (0, 2, 4):
+        matrix = _matrix(yours_at)
+        summary = matrix.summary()
+        yours = matrix.urls.index("you")
+        assert summary["overall"]["rank"] == matrix.ranks()[yours, 0] == 3
+        assert summary["seo"]["rank"] == matrix.ranks()[yours, 1] == 2
+        assert summary["overall"]["percentile"] == matrix.percentiles()[yours, 0] == 50.0
+        assert summary["seo"]["percentile"] == 25.0
+
+
+def test_summary_statistics_and_gaps():
+    summary = _matrix(0).summary()
+    assert summary["overall"]["average"] == 66.0
+    assert summary["overall"]["median"] == 70.0
+    assert summary["overall"]["leader_score"] == 80.0
+    # Ties keep the first site to reach the score as leader
+    assert summary["overall"]["leader_url"] == "b"
+    assert summary["overall"]["gap_to_leader"] == 10.0
+    assert summary["seo"]["gap_to_average"] == 0.0
+
+
+def test_ranks_share_ties_and_leaderboard_keeps_arrival_order():
+    matrix = _matrix(0)
+    assert np.array_equal(matrix.ranks()[:, 0], [3, 4, 1, 1, 5])
+    top = matrix.leaderboard(2)["overall"]
+    assert [entry["url"] for entry in top] == ["b", "c"]
+    assert matrix.size == 5
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.stats_service import UserStatsService
+
+
+def test_score_bucket_matches_bucket_boundaries():
+    """Scores map to the lower bound of their bucket, 100 falls outside"""
+    assert UserStatsService.score_bucket(0) == 0
+    assert UserStatsService.score_bucket(19.9) == 0
+    assert UserStatsService.score_bucket(20) == 20
+    assert UserStatsService.score_bucket(99.5) == 80
+    assert UserStatsService.score_bucket(100) == "Other"
+
+
+def test_score_distribution_shape():
+    """Only non-empty buckets are returned, ordered, with Other last"""
+    stats = {"score_buckets": {"Other": 1, "60": 3, "20": 0, "0": 2}}
+    assert UserStatsService.score_distribution(stats) == [
+        {"_id": 0, "count": 2},
+        {"_id": 60, "count": 3},
+        {"_id": "Other", "count": 1}
+    ]
+
+
+def test_daily_counts_window():
+    """Days older than the window are dropped"""
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    old = (datetime.utcnow() - timedelta(days=45)).strftime("%Y-%m-%d")
+    stats = {"daily": {old: 4, today: 2}}
+    assert UserStatsService.daily_counts(stats, days=30) == [{"date": today, "count": 2}]
+
+
+def test_average_score():
+    """Average is derived from the running sum and count"""
+    assert UserStatsService.average_score({}) == 0
+    assert UserStatsService.average_score({"score_sum": 150.0, "score_count": 2}) == 75.0
+
+
+class FakeStats:
+    """user_stats with just the version compare-and-set rebuild relies on"""
+
+    def __init__(self, document):
+        self.document = document
+        self.writes = 0
+
+    async def find_one(self, query, projection=None):
+        return self.document
+
+    async def update_one(self, query, update, upsert=False):
+        version = (self.document or {}).get("version")
+        expected = query["version"]
+        matched = self.document is not None and (version is None if isinstance(expected, dict) else version == expected)
+        if matched:
+            self.document = {**self.document, **update["$set"]}
+            self.writes += 1
+        return SimpleNamespace(matched_count=int(matched), upserted_id=None)
+
+
+def test_rebuild_recomputes_when_updates_land_mid_aggregation(monkeypatch):
+    """A $inc between the aggregation and the write is not overwritten"""
+    user_stats = FakeStats({"_id": "u1", "version": 4})
+    db = SimpleNamespace(user_stats=user_stats)
+    totals = iter([1, 2])
+
+    async def aggregate(db, user_id):
+        if user_stats.document["version"] == 4:
+            user_stats.document["version"] = 5  # record_created during the first pass
+        return {"total": next(totals), "initialized": True}
+
+    monkeypatch.setattr(UserStatsService, "_aggregate", aggregate)
+    stats = asyncio.run(UserStatsService.rebuild(db, "u1"))
+    assert stats["total"] == 2 and user_stats.writes == 1
+    assert user_stats.document["version"] == 6
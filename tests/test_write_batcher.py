@@ -0,0 +1,46 @@
+import asyncio
+
+from pymongo import InsertOne
+
+from app.core import write_batcher
+from app.core.write_batcher import WriteBehindQueue, bulk_write
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.calls.append((len(operations), ordered))
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection(name)
+        return self[name]
+
+
+def test_bulk_write_chunks_unordered():
+    """Large batches are split into unordered bulk writes"""
+    collection = FakeCollection("subscriptions")
+    sent = asyncio.run(bulk_write(collection, [InsertOne({"n": n}) for n in range(5)], batch_size=2))
+    assert sent == 5
+    assert collection.calls == [(2, False), (2, False), (1, False)]
+
+
+def test_write_behind_flushes_on_stop(monkeypatch):
+    """Buffered writes are grouped per collection and written out on shutdown"""
+    database = FakeDatabase()
+    monkeypatch.setattr(write_batcher, "get_database", lambda: database)
+
+    async def scenario():
+        queue = WriteBehindQueue()
+        await queue.start()
+        await queue.insert_many("chat_messages", [{"role": "user"}, {"role": "assistant"}])
+        await queue.insert_many("chat_messages", [{"role": "user"}, {"role": "assistant"}])
+        assert database["chat_messages"].calls == []
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert database["chat_messages"].calls == [(4, False)]